@@ -0,0 +1,104 @@
+"""Compare two benchmark result files.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+
+Prints the change in throughput, median and p99 latency and memory of every
+benchmark present in both files. Exits with status 1 if the throughput of
+any benchmark dropped by more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Key = Tuple[str, int]
+
+
+def _load(path: str) -> Dict[Key, Dict[str, Any]]:
+    with open(path, encoding="utf-8") as fp:
+        data = json.load(fp)
+    return {
+        (result["benchmark"], result["size"]): result
+        for result in data["results"]
+    }
+
+
+def _change(before: float, after: float) -> float:
+    if before == 0:
+        return 0.0
+    return 100 * (after - before) / before
+
+
+def compare(
+    baseline: Dict[Key, Dict[str, Any]],
+    current: Dict[Key, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Return the relative change, in percent, of each shared benchmark."""
+    changes = []
+    for key in sorted(set(baseline) & set(current)):
+        before, after = baseline[key], current[key]
+        changes.append(
+            {
+                "benchmark": key[0],
+                "size": key[1],
+                "throughput": _change(
+                    before["throughput_per_s"],
+                    after["throughput_per_s"],
+                ),
+                "p50": _change(
+                    before["latency_us"]["p50"],
+                    after["latency_us"]["p50"],
+                ),
+                "p99": _change(
+                    before["latency_us"]["p99"],
+                    after["latency_us"]["p99"],
+                ),
+                "memory": _change(
+                    before["memory_per_record_bytes"],
+                    after["memory_per_record_bytes"],
+                ),
+            }
+        )
+    return changes
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Compare two result files from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.compare",
+        description="Compare two benchmark result files.",
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Maximum allowed throughput drop, in percent. Defaults to 10.",
+    )
+    args = parser.parse_args(argv)
+
+    changes = compare(_load(args.baseline), _load(args.current))
+
+    print(
+        f"{'benchmark':<18} {'size':>8} {'throughput':>11} "
+        f"{'p50':>8} {'p99':>8} {'memory':>8}"
+    )
+    regressions = 0
+    for change in changes:
+        if change["throughput"] < -args.threshold:
+            regressions += 1
+        print(
+            f"{change['benchmark']:<18} {change['size']:>8d} "
+            f"{change['throughput']:>+10.1f}% {change['p50']:>+7.1f}% "
+            f"{change['p99']:>+7.1f}% {change['memory']:>+7.1f}%"
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Synthetic corpus of AudioMoth recordings for benchmarks.
+
+Comments are built with the firmware generators used by the test suite, in
+``tests/firmwares.py``, with random configurations drawn from a seeded
+generator, so the same seed always produces the same corpus. Every firmware
+version with a parser in :py:data:`metamoth.parsing.parsers` is represented
+in equal proportion.
+"""
+
+import datetime
+import random
+from typing import Callable, Dict, Iterator, Tuple
+
+from metamoth.config import (
+    Config1_0,
+    Config1_2_0,
+    Config1_2_1,
+    Config1_2_2,
+    Config1_4_0,
+    Config1_6_0,
+)
+from metamoth.enums import BatteryState, ExtendedBatteryState, RecordingState
+
+from tests.firmwares import (
+    generate_comment_v1_0,
+    generate_comment_v1_0_1,
+    generate_comment_v1_2_0,
+    generate_comment_v1_2_1,
+    generate_comment_v1_2_2,
+    generate_comment_v1_4_0,
+    generate_comment_v1_4_2,
+    generate_comment_v1_6_0,
+)
+from tests.records import make_header
+
+__all__ = [
+    "FIRMWARE_VERSIONS",
+    "generate_comments",
+    "generate_headers",
+]
+
+SAMPLERATES = (8000, 16000, 32000, 48000, 96000, 192000, 250000, 384000)
+
+_START = datetime.datetime(2018, 1, 1)
+
+_STATES = [
+    RecordingState.RECORDING_OKAY,
+    RecordingState.SWITCH_CHANGED,
+    RecordingState.SUPPLY_VOLTAGE_LOW,
+]
+
+
+def _common(rng: random.Random) -> dict:
+    return {
+        "time": _START + datetime.timedelta(seconds=rng.randrange(2**27)),
+        "serial_number": rng.getrandbits(64),
+    }
+
+
+def _comment_1_0(rng: random.Random) -> str:
+    return generate_comment_v1_0(
+        battery_state=rng.choice(list(BatteryState)),
+        config=Config1_0(gain=rng.randrange(5)),
+        **_common(rng),
+    )
+
+
+def _comment_1_0_1(rng: random.Random) -> str:
+    return generate_comment_v1_0_1(
+        battery_state=rng.choice(list(BatteryState)),
+        config=Config1_0(gain=rng.randrange(5)),
+        **_common(rng),
+    )
+
+
+def _comment_1_2_0(rng: random.Random) -> str:
+    return generate_comment_v1_2_0(
+        battery_state=rng.choice(list(BatteryState)),
+        config=Config1_2_0(
+            gain=rng.randrange(5),
+            timezone=rng.randint(-12, 12),
+        ),
+        **_common(rng),
+    )
+
+
+def _comment_1_2_1(rng: random.Random) -> str:
+    return generate_comment_v1_2_1(
+        battery_state=rng.choice(list(BatteryState)),
+        config=Config1_2_1(
+            gain=rng.randrange(5),
+            timezone=rng.randint(-12, 12),
+        ),
+        recording_state=rng.choice(_STATES),
+        **_common(rng),
+    )
+
+
+def _comment_1_2_2(rng: random.Random) -> str:
+    return generate_comment_v1_2_2(
+        battery_state=rng.choice(list(BatteryState)),
+        config=Config1_2_2(
+            gain=rng.randrange(5),
+            timezone_hours=rng.randint(-12, 12),
+            timezone_minutes=rng.choice([0, 30]),
+        ),
+        recording_state=rng.choice(_STATES),
+        **_common(rng),
+    )
+
+
+def _config_1_4_0(rng: random.Random) -> Config1_4_0:
+    return Config1_4_0(
+        gain=rng.randrange(5),
+        timezone_hours=rng.randint(-12, 12),
+        timezone_minutes=rng.choice([0, 30]),
+        amplitude_threshold=rng.choice([0, 0, rng.randint(1, 100)]),
+        lower_filter_freq=rng.choice([0, 0, rng.randint(1, 20000)]),
+        higher_filter_freq=rng.choice([0, 0, rng.randint(1, 20000)]),
+    )
+
+
+def _comment_1_4_0(rng: random.Random) -> str:
+    return generate_comment_v1_4_0(
+        extended_battery_state=rng.choice(list(ExtendedBatteryState)),
+        config=_config_1_4_0(rng),
+        recording_state=rng.choice(_STATES),
+        temperature=rng.randint(-10, 50),
+        **_common(rng),
+    )
+
+
+def _comment_1_4_2(rng: random.Random) -> str:
+    return generate_comment_v1_4_2(
+        extended_battery_state=rng.choice(list(ExtendedBatteryState)),
+        config=_config_1_4_0(rng),
+        recording_state=rng.choice(
+            _STATES + [RecordingState.FILE_SIZE_LIMITED]
+        ),
+        temperature=rng.randint(-10, 50),
+        **_common(rng),
+    )
+
+
+def _comment_1_6_0(rng: random.Random) -> str:
+    scale = rng.choice(["amplitude", "decibels", "percentage"])
+    return generate_comment_v1_6_0(
+        extended_battery_state=rng.choice(list(ExtendedBatteryState)),
+        config=Config1_6_0(
+            gain=rng.randrange(5),
+            timezone_hours=rng.randint(-12, 12),
+            timezone_minutes=rng.choice([0, 30]),
+            amplitude_threshold=rng.choice([0, 0, rng.randint(1, 100)]),
+            lower_filter_freq=rng.choice([0, 0, rng.randint(1, 20000)]),
+            higher_filter_freq=rng.choice([0, 0, rng.randint(1, 20000)]),
+            minimum_trigger_duration=rng.randint(0, 60),
+            enable_amplitude_threshold_decibel_scale=scale == "decibels",
+            amplitude_threshold_decibels=rng.randint(0, 100),
+            enable_amplitude_threshold_percentage_scale=(
+                scale == "percentage"
+            ),
+            amplitude_threshold_percentage_mantissa=rng.randint(0, 100),
+            amplitude_threshold_percentage_exponent=rng.randint(-2, 4),
+        ),
+        recording_state=rng.choice(
+            _STATES + [RecordingState.FILE_SIZE_LIMITED]
+        ),
+        temperature=rng.randint(-10, 50),
+        deployment_id=rng.choice([None, rng.getrandbits(32)]),
+        external_microphone=rng.random() < 0.5,
+        **_common(rng),
+    )
+
+
+FIRMWARE_VERSIONS: Dict[str, Callable[[random.Random], str]] = {
+    "1.0": _comment_1_0,
+    "1.0.1": _comment_1_0_1,
+    "1.2.0": _comment_1_2_0,
+    "1.2.1": _comment_1_2_1,
+    "1.2.2": _comment_1_2_2,
+    "1.4.0": _comment_1_4_0,
+    "1.4.2": _comment_1_4_2,
+    "1.6.0": _comment_1_6_0,
+}
+"""Comment generator of every firmware version in the corpus."""
+
+
+def generate_comments(count: int, seed: int = 0) -> Iterator[Tuple[str, str]]:
+    """Yield ``(firmware_version, comment)`` pairs.
+
+    Versions are drawn uniformly at random, so the parsers are not always
+    tried against the versions in the same order.
+    """
+    rng = random.Random(seed)
+    versions = list(FIRMWARE_VERSIONS)
+    for _ in range(count):
+        version = rng.choice(versions)
+        yield version, FIRMWARE_VERSIONS[version](rng)
+
+
+def generate_headers(count: int, seed: int = 0) -> Iterator[bytes]:
+    """Yield WAV headers, up to and including the data chunk header.
+
+    The declared length of the audio corresponds to one minute of audio,
+    but no samples are included.
+    """
+    rng = random.Random(seed)
+    for _, comment in generate_comments(count, seed=seed):
+        samplerate_hz = rng.choice(SAMPLERATES)
+        yield make_header(
+            comment,
+            samplerate_hz=samplerate_hz,
+            samples=samplerate_hz * 60,
+        )
+
@@ -0,0 +1,142 @@
+"""Measure the time taken to import metamoth in a new interpreter.
+
+Usage::
+
+    python -m benchmarks.imports --runs 20 -o imports.json
+
+Short lived processes, such as serverless functions, import metamoth on
+every invocation, so the import time is paid once per file. Each run
+starts a new Python interpreter and times the import statement only, not
+the start of the interpreter. The results have the format of
+``python -m benchmarks.run``, with one result per imported module, so
+``python -m benchmarks.compare`` can compare them.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.run import _percentiles, get_environment
+
+DEFAULT_MODULES = (
+    "metamoth",
+    "metamoth.metamoth",
+    "metamoth.cli",
+)
+
+DEFAULT_RUNS = 20
+
+_TIMER = """\
+import time
+start = time.perf_counter_ns()
+import {module}
+print(time.perf_counter_ns() - start)
+"""
+
+_MEMORY = """\
+import tracemalloc
+tracemalloc.start()
+import {module}
+print(tracemalloc.get_traced_memory()[0])
+"""
+
+
+def _run(code: str) -> str:
+    """Run Python code in a new interpreter and return its output."""
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def bench_import(module: str, runs: int = DEFAULT_RUNS) -> Dict[str, Any]:
+    """Measure the import time and memory of a module.
+
+    The bytecode cache is assumed to be written already, as it is in an
+    installed package, so one untimed import is run first.
+    """
+    _run(f"import {module}")
+
+    code = _TIMER.format(module=module)
+    times_ns = array("q", (int(_run(code)) for _ in range(runs)))
+    elapsed_s = sum(times_ns) / 1e9
+    return {
+        "count": runs,
+        "elapsed_s": elapsed_s,
+        "throughput_per_s": runs / elapsed_s,
+        "latency_us": {
+            "mean": sum(times_ns) / runs / 1000,
+            **_percentiles(times_ns),
+        },
+        "memory_per_record_bytes": int(_run(_MEMORY.format(module=module))),
+    }
+
+
+def run(
+    modules: Sequence[str] = DEFAULT_MODULES,
+    runs: int = DEFAULT_RUNS,
+) -> Dict[str, Any]:
+    """Measure the import of each module and return the results."""
+    results: List[Dict[str, Any]] = []
+    for module in modules:
+        results.append(
+            {
+                "benchmark": f"import {module}",
+                "size": runs,
+                **bench_import(module, runs),
+            }
+        )
+    return {
+        "environment": get_environment(),
+        "results": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Measure import times from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.imports",
+        description="Measure the time taken to import metamoth.",
+    )
+    parser.add_argument(
+        "--modules",
+        type=lambda value: value.split(","),
+        default=list(DEFAULT_MODULES),
+        help=f"Comma separated modules. Defaults to {DEFAULT_MODULES}.",
+    )
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="JSON file for the results. Defaults to stdout.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.modules, args.runs)
+    for result in results["results"]:
+        print(
+            f"{result['benchmark']:<24} "
+            f"p50 {result['latency_us']['p50'] / 1000:>7.1f}ms "
+            f"p99 {result['latency_us']['p99'] / 1000:>7.1f}ms "
+            f"{result['memory_per_record_bytes'] / 1024:>8.0f} kB",
+            file=sys.stderr,
+        )
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
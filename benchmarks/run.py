@@ -0,0 +1,282 @@
+"""Run the metamoth benchmarks and save the results as JSON.
+
+Usage::
+
+    python -m benchmarks.run --sizes 1000,10000,100000 -o results.json
+
+Run from the root of the repository. Three stages are measured over a
+synthetic corpus covering every supported firmware version:
+
+``parse_comment``
+    Parsing comment strings into metadata dictionaries.
+``parse_into_chunks``
+    Parsing the RIFF chunks of in-memory WAV headers.
+``parse_metadata``
+    Parsing recordings on disk end to end.
+
+For each stage and corpus size the results include the throughput, the
+latency percentiles of single calls and the memory retained per parsed
+record. Use ``python -m benchmarks.compare`` to compare two result files.
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from itertools import cycle, islice
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import metamoth
+from metamoth.chunks import parse_into_chunks
+from metamoth.metamoth import parse_metadata
+from metamoth.parsing import parse_comment
+
+from benchmarks.corpus import generate_comments, generate_headers
+from benchmarks.sparse import write_corpus
+
+DEFAULT_SIZES = (1000, 10000)
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+# In-memory inputs are drawn from a pool of distinct items, so that large
+# sizes do not need gigabytes of memory to hold the corpus.
+POOL_SIZE = 10000
+
+# Number of records used to measure the memory retained per record.
+MEMORY_SAMPLE_SIZE = 1000
+
+
+def _percentiles(latencies_ns: "array[int]") -> Dict[str, float]:
+    ordered = sorted(latencies_ns)
+    last = len(ordered) - 1
+    return {
+        f"p{percentile:g}": ordered[round(last * percentile / 100)] / 1000
+        for percentile in PERCENTILES
+    }
+
+
+def _measure(
+    function: Callable[[Any], Any],
+    inputs: Sequence[Any],
+    count: int,
+) -> Dict[str, Any]:
+    """Call ``function`` on ``count`` inputs and measure its performance."""
+    latencies_ns = array("q")
+    clock = time.perf_counter_ns
+
+    gc.collect()
+    start = clock()
+    for item in islice(cycle(inputs), count):
+        call_start = clock()
+        function(item)
+        latencies_ns.append(clock() - call_start)
+    elapsed_s = (clock() - start) / 1e9
+
+    sample = list(islice(cycle(inputs), min(count, MEMORY_SAMPLE_SIZE)))
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    results = [function(item) for item in sample]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+
+    return {
+        "count": count,
+        "elapsed_s": elapsed_s,
+        "throughput_per_s": count / elapsed_s,
+        "latency_us": {
+            "mean": sum(latencies_ns) / count / 1000,
+            **_percentiles(latencies_ns),
+        },
+        "memory_per_record_bytes": (after - before) / len(sample),
+    }
+
+
+def bench_parse_comment(count: int, seed: int) -> Dict[str, Any]:
+    """Benchmark :py:func:`metamoth.parsing.parse_comment`."""
+    comments = [
+        comment
+        for _, comment in generate_comments(min(count, POOL_SIZE), seed)
+    ]
+    return _measure(parse_comment, comments, count)
+
+
+def bench_parse_into_chunks(count: int, seed: int) -> Dict[str, Any]:
+    """Benchmark :py:func:`metamoth.chunks.parse_into_chunks`."""
+    headers = [
+        io.BytesIO(header)
+        for header in generate_headers(min(count, POOL_SIZE), seed)
+    ]
+
+    def parse(header: io.BytesIO):
+        header.seek(0)
+        return parse_into_chunks(header)
+
+    return _measure(parse, headers, count)
+
+
+def bench_parse_metadata(
+    count: int,
+    seed: int,
+    corpus_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Benchmark :py:func:`metamoth.parse_metadata` on files on disk.
+
+    The recordings are sparse files declaring one minute of audio, written
+    to ``corpus_dir`` and reused between runs. They are likely in the page
+    cache, so this measures parsing rather than disk reads.
+    """
+    if corpus_dir is None:
+        corpus_dir = os.path.join(tempfile.gettempdir(), "metamoth-corpus")
+    paths = write_corpus(corpus_dir, count, seed=seed)
+    return _measure(parse_metadata, paths, count)
+
+
+BENCHMARKS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "parse_comment": bench_parse_comment,
+    "parse_into_chunks": bench_parse_into_chunks,
+    "parse_metadata": bench_parse_metadata,
+}
+
+
+def get_environment() -> Dict[str, Any]:
+    """Return a description of the machine and software versions."""
+    return {
+        "metamoth_version": metamoth.__version__,
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    benchmarks: Optional[Sequence[str]] = None,
+    seed: int = 0,
+    corpus_dir: Optional[str] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Run the benchmarks and return the results.
+
+    Parameters
+    ----------
+    sizes : list of int, optional
+        Number of records parsed in each run.
+    benchmarks : list of str, optional
+        Names of the benchmarks to run. Defaults to all.
+    seed : int, optional
+        Seed of the synthetic corpus.
+    corpus_dir : str, optional
+        Directory where the recordings of ``parse_metadata`` are written.
+    log : callable, optional
+        Called with a line of text after each run.
+
+    Returns
+    -------
+    dict
+        The environment and a list of results, one per benchmark and size.
+    """
+    if benchmarks is None:
+        benchmarks = list(BENCHMARKS)
+
+    results: List[Dict[str, Any]] = []
+    for name in benchmarks:
+        for size in sizes:
+            kwargs = {}
+            if name == "parse_metadata":
+                kwargs["corpus_dir"] = corpus_dir
+            result = {
+                "benchmark": name,
+                "size": size,
+                **BENCHMARKS[name](size, seed, **kwargs),
+            }
+            results.append(result)
+
+            if log is not None:
+                log(
+                    f"{name:<18} {size:>8d} "
+                    f"{result['throughput_per_s']:>12.0f}/s "
+                    f"p50 {result['latency_us']['p50']:>8.1f}us "
+                    f"p99 {result['latency_us']['p99']:>8.1f}us "
+                    f"{result['memory_per_record_bytes']:>8.0f} B/record"
+                )
+
+    return {
+        "environment": get_environment(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def _parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",")]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark metamoth over a synthetic corpus.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=_parse_sizes,
+        default=list(DEFAULT_SIZES),
+        help="Comma separated corpus sizes. Defaults to 1000,10000.",
+    )
+    parser.add_argument(
+        "--benchmarks",
+        type=lambda value: value.split(","),
+        default=None,
+        help=f"Comma separated benchmarks: {', '.join(BENCHMARKS)}.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--corpus-dir",
+        default=None,
+        help="Where to write the recordings. Defaults to a temporary folder.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="JSON file for the results. Defaults to stdout.",
+    )
+    args = parser.parse_args(argv)
+
+    for name in args.benchmarks or []:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+
+    results = run(
+        sizes=args.sizes,
+        benchmarks=args.benchmarks,
+        seed=args.seed,
+        corpus_dir=args.corpus_dir,
+        log=lambda line: print(line, file=sys.stderr),
+    )
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
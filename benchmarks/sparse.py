@@ -0,0 +1,274 @@
+"""Write synthetic AudioMoth recordings as sparse files.
+
+Every file has a real AudioMoth header, with a comment built by the firmware
+generators of the test suite and an artist chunk for the firmware versions
+that write one, followed by a ``data`` chunk that declares hours of audio.
+The audio is not written: the file is extended with
+:py:meth:`io.IOBase.truncate`, which creates a hole that occupies no disk
+blocks on most Unix filesystems. Millions of recordings with the sizes of
+real ones can then be stored in a few gigabytes.
+
+For benchmarks that read the audio, ``audio="noise"`` writes low level
+Gaussian noise instead, which takes real disk space.
+
+Usage::
+
+    python -m benchmarks.sparse /data/load-test --count 1000000 --hours 4
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+from array import array
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from benchmarks.corpus import SAMPLERATES, generate_comments
+from tests.records import make_header
+
+__all__ = [
+    "allocated_bytes",
+    "generate_recordings",
+    "write_corpus",
+    "write_recording",
+    "write_recordings",
+]
+
+AUDIO_CONTENT = ("sparse", "noise")
+
+MAX_DATA_SIZE = 2**32 - 1 - 1024
+"""Largest data chunk that fits in a RIFF file, leaving room for the header."""
+
+# The device ID is not written in the comments of deployments, which
+# stand in their deployment ID.
+_SERIAL_NUMBER = re.compile(
+    r"(?:AudioMoth|during deployment) ([0-9A-F]{16})",
+    re.IGNORECASE,
+)
+
+# Firmware versions that write the serial number in the artist chunk.
+_VERSIONS_WITH_ARTIST = ("1.4.0", "1.4.2", "1.6.0")
+
+
+def _get_artist(version: str, comment: str) -> Optional[str]:
+    if version not in _VERSIONS_WITH_ARTIST:
+        return None
+
+    match = _SERIAL_NUMBER.search(comment)
+    if match is None:
+        return None
+    return f"AudioMoth {match.group(1).upper()}"
+
+
+def _write_noise(fp, size: int, rng: random.Random) -> None:
+    """Write ``size`` bytes of 16 bit Gaussian noise."""
+    block = array("h", (int(rng.gauss(0, 300)) for _ in range(32768)))
+    if sys.byteorder != "little":
+        block.byteswap()
+    data = block.tobytes()
+
+    while size > 0:
+        fp.write(data[:size])
+        size -= len(data)
+
+
+def write_recording(
+    path: "os.PathLike[str]",
+    comment: str,
+    samplerate_hz: int = 48000,
+    duration_s: float = 3600,
+    artist: Optional[str] = None,
+    audio: str = "sparse",
+    seed: int = 0,
+) -> int:
+    """Write a single recording.
+
+    Parameters
+    ----------
+    path : PathLike
+        Path of the file to create.
+    comment : str
+        Comment of the recording.
+    samplerate_hz : int, optional
+        Sample rate written in the ``fmt`` chunk.
+    duration_s : float, optional
+        Declared duration of the audio. The data chunk is limited to 4 GB,
+        which is about 12 hours of mono audio at 48 kHz.
+    artist : str, optional
+        Content of the ``IART`` chunk, if any.
+    audio : str, optional
+        ``"sparse"`` (default) leaves a hole instead of the audio,
+        ``"noise"`` writes Gaussian noise.
+    seed : int, optional
+        Seed of the noise.
+
+    Returns
+    -------
+    int
+        Size of the file in bytes.
+    """
+    if audio not in AUDIO_CONTENT:
+        raise ValueError(
+            f"Unknown audio content {audio!r}, expected one of "
+            f"{AUDIO_CONTENT}."
+        )
+
+    samples = int(samplerate_hz * duration_s)
+    if samples * 2 > MAX_DATA_SIZE:
+        raise ValueError(
+            f"{duration_s}s of audio at {samplerate_hz} Hz does not fit "
+            "in a WAV file."
+        )
+
+    header = make_header(
+        comment,
+        samplerate_hz=samplerate_hz,
+        samples=samples,
+        artist=artist,
+    )
+    size = len(header) + samples * 2
+
+    with open(path, "wb") as wav:
+        wav.write(header)
+        if audio == "sparse":
+            wav.truncate(size)
+        else:
+            _write_noise(wav, samples * 2, random.Random(seed))
+
+    return size
+
+
+def generate_recordings(
+    count: int,
+    seed: int = 0,
+) -> Iterator[Tuple[str, int, Optional[str]]]:
+    """Yield the ``(comment, samplerate_hz, artist)`` of each recording."""
+    rng = random.Random(seed)
+    for version, comment in generate_comments(count, seed=seed):
+        yield comment, rng.choice(SAMPLERATES), _get_artist(version, comment)
+
+
+def write_recordings(
+    directory: "os.PathLike[str]",
+    count: int,
+    seed: int = 0,
+    duration_s: float = 3600,
+    audio: str = "sparse",
+    files_per_folder: int = 1000,
+) -> List[str]:
+    """Write a corpus of recordings into a directory.
+
+    The recordings are split into folders of ``files_per_folder`` files.
+    Long durations are shortened for high sample rates, so that every file
+    fits in the 4 GB limit of WAV files.
+
+    Returns
+    -------
+    paths : list of str
+        Paths of the recordings, in the order they were generated.
+    """
+    directory = os.fspath(directory)
+    paths = []
+    for index, (comment, samplerate_hz, artist) in enumerate(
+        generate_recordings(count, seed=seed)
+    ):
+        path = os.path.join(
+            directory,
+            f"{index // files_per_folder:04d}",
+            f"{index:07d}.WAV",
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_recording(
+            path,
+            comment,
+            samplerate_hz=samplerate_hz,
+            duration_s=min(duration_s, MAX_DATA_SIZE // 2 // samplerate_hz),
+            artist=artist,
+            audio=audio,
+            seed=seed + index,
+        )
+        paths.append(path)
+    return paths
+
+
+def write_corpus(
+    directory: "os.PathLike[str]",
+    count: int,
+    seed: int = 0,
+    duration_s: float = 60,
+) -> List[str]:
+    """Write a corpus of sparse recordings, reusing it if it already exists.
+
+    The corpus is written to a subdirectory named after ``count``, ``seed``
+    and ``duration_s``, so that benchmark runs can share it.
+
+    Returns
+    -------
+    paths : list of str
+        Paths of the recordings, in the order they were generated.
+    """
+    directory = os.path.join(
+        os.fspath(directory),
+        f"{count}-{seed}-{duration_s:g}",
+    )
+    done = os.path.join(directory, ".complete")
+
+    if os.path.exists(done):
+        with open(done, encoding="utf-8") as fp:
+            return fp.read().splitlines()
+
+    paths = write_recordings(
+        directory,
+        count,
+        seed=seed,
+        duration_s=duration_s,
+    )
+
+    with open(done, "w", encoding="utf-8") as fp:
+        fp.write("\n".join(paths))
+
+    return paths
+
+
+def allocated_bytes(path: "os.PathLike[str]") -> int:
+    """Return the disk space used by a file.
+
+    Only available on Unix, where it is usually much smaller than the file
+    size for sparse files.
+    """
+    return os.stat(path).st_blocks * 512
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Write a corpus of sparse recordings from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.sparse",
+        description="Write synthetic AudioMoth recordings as sparse files.",
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument(
+        "--hours",
+        type=float,
+        default=1.0,
+        help="Declared duration of each recording. Defaults to 1.",
+    )
+    parser.add_argument("--audio", choices=AUDIO_CONTENT, default="sparse")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    paths = write_recordings(
+        args.directory,
+        args.count,
+        seed=args.seed,
+        duration_s=args.hours * 3600,
+        audio=args.audio,
+    )
+    size = sum(os.path.getsize(path) for path in paths)
+    print(f"Wrote {len(paths)} recordings, {size / 1e9:.1f} GB apparent size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,15 @@
 Metamoth is a Python package for parsing metadata from AudioMoth recordings. It
 provides a function to parse the metadata from a WAV file and returns an
 object with the metadata as attributes.
+
+The submodules are imported on first use of :py:func:`parse_metadata`, so
+that ``import metamoth`` is cheap for short lived processes.
 """
 
-from metamoth.metamoth import parse_metadata
+# Avoid importing typing, which is slower to import than this package.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from metamoth.metamoth import parse_metadata
 
 __author__ = """Santiago Martinez Balvanera"""
 __email__ = "santiago.balvanera.20@ucl.ac.uk"
@@ -13,3 +19,20 @@ __version__ = "1.2.2"
 
 
 __all__ = ["parse_metadata"]
+
+
+def __getattr__(name: str) -> object:
+    """Import the public functions when first accessed."""
+    if name == "parse_metadata":
+        # pylint: disable=import-outside-toplevel
+        from metamoth.metamoth import parse_metadata
+
+        globals()[name] = parse_metadata
+        return parse_metadata
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> "list[str]":
+    """List the module attributes, including the lazy ones."""
+    return sorted(set(globals()) | set(__all__))
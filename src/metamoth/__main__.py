@@ -0,0 +1,7 @@
+"""Run the metamoth command line interface with ``python -m metamoth``."""
+
+import sys
+
+from metamoth.cli import main
+
+sys.exit(main())
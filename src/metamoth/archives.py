@@ -0,0 +1,174 @@
+"""Parse the metadata of recordings inside zip and tar archives.
+
+Recordings are not extracted. Only the first :py:data:`HEADER_SIZE` bytes
+of each WAV member are read and parsed with
+:py:func:`metamoth.metamoth.parse_header`::
+
+    for metadata in scan_archive("deployment.zip"):
+        print(metadata.path, metadata.datetime)
+
+The audio data is never read. In zip archives, the central directory
+gives the position of every member, so reading a stored member seeks
+straight to its header, and a compressed member is only decompressed up to
+its header. Tar archives are read in one forward pass over the member
+headers, seeking over the data blocks.
+
+The path of each recording is the path of the archive joined with the name
+of the member, e.g. ``deployment.zip/site_1/20230101_000000.WAV``.
+"""
+
+import os
+import tarfile
+import zipfile
+from typing import Callable, Iterator, Optional, Tuple, Union
+
+from metamoth.audio import is_wav_filename
+from metamoth.metadata import AMMetadata
+from metamoth.metamoth import parse_header
+from metamoth.parsing import CommentParser
+from metamoth.scan import ERROR_MODES, ScanError
+
+__all__ = [
+    "HEADER_SIZE",
+    "iter_archive_headers",
+    "scan_archive",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+HEADER_SIZE = 4096
+"""Number of bytes read from each member.
+
+The header of an AudioMoth recording, up to its data chunk, is about 500
+bytes long, and at most :py:data:`metamoth.parsing.MAX_COMMENT_SIZE`
+bytes of the comment are read.
+"""
+
+
+def _iter_zip_headers(path: PathLike) -> Iterator[Tuple[str, bytes]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not is_wav_filename(info.filename):
+                continue
+
+            with archive.open(info) as member:
+                yield info.filename, member.read(HEADER_SIZE)
+
+
+def _iter_tar_headers(path: PathLike) -> Iterator[Tuple[str, bytes]]:
+    with tarfile.open(path, "r:*") as archive:
+        while True:
+            info = archive.next()
+            if info is None:
+                return
+
+            # Do not keep the headers of the members already read.
+            archive.members = []
+
+            if not info.isfile() or not is_wav_filename(info.name):
+                continue
+
+            member = archive.extractfile(info)
+            if member is not None:
+                yield info.name, member.read(HEADER_SIZE)
+
+
+def iter_archive_headers(path: PathLike) -> Iterator[Tuple[str, bytes]]:
+    """Yield the name and the header of every WAV member of an archive.
+
+    Parameters
+    ----------
+    path : PathLike
+        Path to a zip or tar archive. Tar archives may be compressed.
+
+    Yields
+    ------
+    name : str
+        Name of the member in the archive.
+    header : bytes
+        The first :py:data:`HEADER_SIZE` bytes of the member.
+
+    Raises
+    ------
+    ValueError
+        If the file is neither a zip nor a tar archive.
+    """
+    if zipfile.is_zipfile(path):
+        yield from _iter_zip_headers(path)
+        return
+
+    if tarfile.is_tarfile(path):
+        yield from _iter_tar_headers(path)
+        return
+
+    raise ValueError(f"{os.fspath(path)} is not a zip or tar archive.")
+
+
+def scan_archive(
+    path: PathLike,
+    errors: str = "raise",
+    on_error: Optional[Callable[[ScanError], None]] = None,
+    comment_parser: Optional[CommentParser] = None,
+) -> Iterator[AMMetadata]:
+    """Parse the metadata of all WAV files in an archive.
+
+    Parameters
+    ----------
+    path : PathLike
+        Path to a zip or tar archive.
+    errors : str, optional
+        What to do when a member cannot be parsed. ``"raise"`` (default)
+        raises a :py:class:`ValueError`, ``"skip"`` ignores the member.
+    on_error : callable, optional
+        Called with a :py:class:`metamoth.scan.ScanError` for every member
+        that could not be parsed, before the ``errors`` policy is applied.
+    comment_parser : CommentParser, optional
+        Parser of the comment strings. Defaults to a new
+        :py:class:`metamoth.parsing.CommentParser`, which tries the most
+        common firmware formats of the archive first.
+
+    Yields
+    ------
+    metadata : AMMetadata
+        The metadata of each recording, in the order of the archive.
+
+    Raises
+    ------
+    ValueError
+        If a member cannot be parsed and ``errors`` is ``"raise"``.
+    """
+    if errors not in ERROR_MODES:
+        raise ValueError(
+            f"Unknown error mode {errors!r}, expected one of {ERROR_MODES}."
+        )
+
+    if comment_parser is None:
+        comment_parser = CommentParser()
+
+    archive = os.fspath(path)
+    for name, header in iter_archive_headers(path):
+        member_path = os.path.join(archive, name)
+        try:
+            metadata = parse_header(
+                header,
+                member_path,
+                comment_parser=comment_parser,
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            result = ScanError(
+                path=member_path,
+                error=type(error).__name__,
+                message=str(error),
+            )
+
+            if on_error is not None:
+                on_error(result)
+
+            if errors == "raise":
+                raise ValueError(
+                    f"Could not parse {result.path}: "
+                    f"{result.error}: {result.message}"
+                ) from error
+            continue
+
+        yield metadata
@@ -0,0 +1,358 @@
+"""Export AudioMoth metadata to Apache Arrow and Parquet.
+
+This module requires the optional ``pyarrow`` dependency, which can be
+installed with::
+
+    pip install metamoth[arrow]
+
+The Arrow schema is derived from :py:class:`metamoth.metadata.AMMetadata`:
+
+* Enum fields (``gain``, ``recording_state``) and the ``timezone`` are
+  dictionary encoded strings, using the same representation as
+  :py:mod:`metamoth.serialization`.
+* Nested fields (``amplitude_threshold``, ``frequency_filter`` and
+  ``frequency_trigger``) are flattened into one typed column per
+  attribute, named ``<field>_<attribute>``, e.g.
+  ``frequency_filter_lower_frequency_hz``.
+
+Records are converted column by column, so large scans can be streamed
+into Parquet one row group at a time with :py:class:`ParquetWriter`.
+"""
+
+from dataclasses import is_dataclass
+from datetime import datetime as dt
+from datetime import timezone as tz
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from metamoth.metadata import AMMetadata
+from metamoth.serialization import (
+    encode_timezone,
+    get_serialized_fields,
+    unwrap_optional,
+)
+
+__all__ = [
+    "get_schema",
+    "to_record_batch",
+    "to_table",
+    "iter_record_batches",
+    "ParquetWriter",
+    "write_parquet",
+]
+
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+Getter = Callable[[Any], Any]
+
+_columns: Optional[List[Tuple[str, Any, Getter]]] = None
+
+_schema: Any = None
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise ImportError(
+            "pyarrow is required for Arrow and Parquet export. "
+            "Install it with `pip install metamoth[arrow]`."
+        ) from error
+    return pyarrow
+
+
+def _import_parquet():
+    _import_pyarrow()
+    import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+
+    return pyarrow.parquet
+
+
+def _get_arrow_type(pa, field_type: Any) -> Tuple[Any, Optional[Getter]]:
+    """Return the Arrow type and value converter of a field type."""
+    if field_type is bool:
+        return pa.bool_(), None
+
+    if field_type is int:
+        return pa.int64(), None
+
+    if field_type is float:
+        return pa.float64(), None
+
+    if field_type is str:
+        return pa.string(), None
+
+    if field_type is dt:
+        return pa.timestamp("s"), None
+
+    if field_type is tz:
+        return pa.dictionary(pa.int8(), pa.string()), encode_timezone
+
+    if isinstance(field_type, type) and issubclass(field_type, Enum):
+        return pa.dictionary(pa.int8(), pa.string()), _get_enum_name
+
+    raise TypeError(f"Unsupported field type for Arrow export: {field_type}")
+
+
+def _get_enum_name(value: Enum) -> str:
+    return value.name
+
+
+def _make_getter(name: str, convert: Optional[Getter]) -> Getter:
+    def getter(obj: Any) -> Any:
+        value = getattr(obj, name)
+        if value is None or convert is None:
+            return value
+        return convert(value)
+
+    return getter
+
+
+def _make_nested_getter(name: str, getter: Getter) -> Getter:
+    def nested_getter(obj: Any) -> Any:
+        value = getattr(obj, name)
+        if value is None:
+            return None
+        return getter(value)
+
+    return nested_getter
+
+
+def _build_columns(pa, cls: type) -> List[Tuple[str, Any, Getter]]:
+    """Return the (name, type, getter) of every column of a dataclass."""
+    columns = []
+    for field in get_serialized_fields(cls):
+        field_type = unwrap_optional(field.type)
+
+        if is_dataclass(field_type):
+            for subname, subtype, subgetter in _build_columns(
+                pa,
+                field_type,  # type: ignore
+            ):
+                columns.append(
+                    (
+                        f"{field.name}_{subname}",
+                        subtype,
+                        _make_nested_getter(field.name, subgetter),
+                    )
+                )
+            continue
+
+        arrow_type, convert = _get_arrow_type(pa, field_type)
+        columns.append(
+            (field.name, arrow_type, _make_getter(field.name, convert))
+        )
+    return columns
+
+
+def _get_columns() -> List[Tuple[str, Any, Getter]]:
+    global _columns  # pylint: disable=global-statement
+
+    if _columns is None:
+        _columns = _build_columns(_import_pyarrow(), AMMetadata)
+
+    return _columns
+
+
+def get_schema():
+    """Return the Arrow schema of AudioMoth metadata.
+
+    Returns
+    -------
+    pyarrow.Schema
+    """
+    global _schema  # pylint: disable=global-statement
+
+    if _schema is None:
+        pa = _import_pyarrow()
+        _schema = pa.schema(
+            [
+                pa.field(name, arrow_type)
+                for name, arrow_type, _ in _get_columns()
+            ]
+        )
+
+    return _schema
+
+
+def to_record_batch(records: Iterable[AMMetadata]):
+    """Convert metadata objects into an Arrow record batch.
+
+    Parameters
+    ----------
+    records : iterable of AMMetadata
+
+    Returns
+    -------
+    pyarrow.RecordBatch
+        A record batch with the schema returned by :py:func:`get_schema`.
+    """
+    pa = _import_pyarrow()
+    records = list(records)
+    columns = _get_columns()
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([getter(record) for record in records], arrow_type)
+            for _, arrow_type, getter in columns
+        ],
+        schema=get_schema(),
+    )
+
+
+def to_table(records: Iterable[AMMetadata]):
+    """Convert metadata objects into an Arrow table.
+
+    Parameters
+    ----------
+    records : iterable of AMMetadata
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    pa = _import_pyarrow()
+    return pa.Table.from_batches(
+        list(iter_record_batches(records)),
+        schema=get_schema(),
+    )
+
+
+def iter_record_batches(
+    records: Iterable[AMMetadata],
+    batch_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Iterator[Any]:
+    """Convert a stream of metadata objects into Arrow record batches.
+
+    Only ``batch_size`` records are held in memory at any time.
+
+    Parameters
+    ----------
+    records : iterable of AMMetadata
+    batch_size : int, optional
+        Maximum number of rows per batch.
+
+    Yields
+    ------
+    pyarrow.RecordBatch
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield to_record_batch(batch)
+            batch = []
+
+    if batch:
+        yield to_record_batch(batch)
+
+
+class ParquetWriter:
+    """Stream metadata objects into a Parquet file.
+
+    Records are buffered and written one row group at a time.
+
+    Parameters
+    ----------
+    path : str
+        Path of the Parquet file to create.
+    row_group_size : int, optional
+        Number of records per row group.
+    compression : str, optional
+        Parquet compression codec. Defaults to ``"zstd"``.
+
+    Examples
+    --------
+    >>> with ParquetWriter("metadata.parquet") as writer:
+    ...     writer.write(records)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = "zstd",
+    ):
+        """Open the Parquet file for writing."""
+        pq = _import_parquet()
+        self.row_group_size = row_group_size
+        self.count = 0
+        self._buffer: List[AMMetadata] = []
+        self._writer = pq.ParquetWriter(
+            str(path),
+            get_schema(),
+            compression=compression,
+        )
+
+    def write(self, records: Iterable[AMMetadata]) -> int:
+        """Write metadata objects to the file.
+
+        Parameters
+        ----------
+        records : iterable of AMMetadata
+
+        Returns
+        -------
+        int
+            Number of records received.
+        """
+        count = 0
+        for record in records:
+            self._buffer.append(record)
+            count += 1
+            if len(self._buffer) >= self.row_group_size:
+                self.flush()
+        return count
+
+    def flush(self) -> None:
+        """Write the buffered records as a row group."""
+        if not self._buffer:
+            return
+
+        self._writer.write_batch(to_record_batch(self._buffer))
+        self.count += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        """Flush the remaining records and close the file."""
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> "ParquetWriter":
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the file on exit."""
+        self.close()
+
+
+def write_parquet(
+    records: Iterable[AMMetadata],
+    path: str,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "zstd",
+) -> int:
+    """Write metadata objects to a Parquet file.
+
+    Parameters
+    ----------
+    records : iterable of AMMetadata
+    path : str
+        Path of the Parquet file to create.
+    row_group_size : int, optional
+        Number of records per row group.
+    compression : str, optional
+        Parquet compression codec. Defaults to ``"zstd"``.
+
+    Returns
+    -------
+    int
+        Number of records written.
+    """
+    with ParquetWriter(
+        path,
+        row_group_size=row_group_size,
+        compression=compression,
+    ) as writer:
+        writer.write(records)
+    return writer.count
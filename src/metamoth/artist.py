@@ -2,12 +2,19 @@
 
 from typing import BinaryIO, Optional
 
-from metamoth.chunks import Chunk
+from metamoth.chunks import Chunk, read_text
 
 __all__ = [
     "get_am_artist",
 ]
 
+MAX_ARTIST_LENGTH = 64
+"""Maximum number of bytes read from the artist chunk.
+
+AudioMoth writes ``AudioMoth`` followed by the 16 characters of the device
+ID, in a 32 bytes chunk.
+"""
+
 
 def read_artist(wav: BinaryIO, artist_chunk: Chunk) -> str:
     """Return the artist from the artist chunk.
@@ -24,9 +31,8 @@ def read_artist(wav: BinaryIO, artist_chunk: Chunk) -> str:
     -------
     artist: str
     """
-    wav.seek(artist_chunk.position + 8)
-    comment = wav.read(artist_chunk.size - 4).decode("utf-8").strip("\x00")
-    return comment
+    size = min(artist_chunk.size - 4, MAX_ARTIST_LENGTH)
+    return read_text(wav, artist_chunk, size)
 
 
 def get_artist_chunk(chunk: Chunk) -> Optional[Chunk]:
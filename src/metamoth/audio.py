@@ -34,7 +34,8 @@ def is_wav(path: PathLike) -> bool:
     """Return True if path is a WAV file.
 
     A WAV file is a RIFF file with the WAVE chunk ID. The WAVE chunk ID
-    is the 8th byte of the file.
+    is the 8th byte of the file. Use :py:func:`metamoth.triage.triage` to
+    check many files.
 
     Parameters
     ----------
@@ -45,8 +46,5 @@ def is_wav(path: PathLike) -> bool:
     bool
     """
     with open(path, "rb") as wav:
-        if wav.read(4) != b"RIFF":
-            return False
-
-        wav.seek(8)
-        return wav.read(4) == b"WAVE"
+        header = wav.read(12)
+    return header[:4] == b"RIFF" and header[8:] == b"WAVE"
@@ -0,0 +1,355 @@
+"""Find truncated and corrupt WAV files without parsing their metadata.
+
+SD card write failures leave recordings whose RIFF or data chunk size
+disagrees with the size of the file, or whose header is zeroed.
+:py:func:`metamoth.parse_metadata` reports them with errors raised deep in
+the parser, if at all. :py:func:`audit` checks the structure of each file
+instead, and returns a diagnosis per file::
+
+    for result in audit(paths):
+        if result.status != AuditStatus.OK:
+            print(result.path, result.status.name, result.detail)
+
+Each file is opened once. Its size is compared with the declared sizes,
+and its chunk headers are walked from the first
+:py:data:`AUDIT_READ_SIZE` bytes, which hold the whole header of an
+AudioMoth recording. Chunks after the audio data are read with one small
+read each. Comments are never parsed, and the audio is never read.
+
+The checks follow the RIFF rules: chunk IDs are four printable ASCII
+characters, every chunk, including the subchunks of LIST chunks, fits in
+its parent chunk, chunks with an odd size are followed by a padding byte,
+and the RIFF chunk holds a fmt and a data chunk and ends at the end of the
+file. The first problem found is reported.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from metamoth.enums import AuditStatus
+from metamoth.scan import DEFAULT_BATCH_SIZE, batched, map_batches
+
+__all__ = [
+    "AUDIT_READ_SIZE",
+    "AuditResult",
+    "audit",
+    "audit_file",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+AUDIT_READ_SIZE = 4096
+"""Number of bytes read from the start of each file."""
+
+REQUIRED_CHUNKS = (b"fmt ", b"data")
+
+Problem = Tuple[AuditStatus, str]
+
+
+@dataclass
+class AuditResult:
+    """Diagnosis of a file."""
+
+    path: str
+    """Path to the file."""
+
+    status: AuditStatus
+    """First problem found, or OK."""
+
+    detail: Optional[str] = None
+    """Description of the problem."""
+
+    file_size: Optional[int] = None
+    """Size of the file, in bytes."""
+
+    data_size: Optional[int] = None
+    """Size declared by the data chunk, if it was found."""
+
+
+def _is_chunk_id(chunk_id: bytes) -> bool:
+    return len(chunk_id) == 4 and all(0x20 <= byte < 0x7F for byte in chunk_id)
+
+
+def _reader(wav: BinaryIO, header: bytes) -> Callable[[int, int], bytes]:
+    """Return a function reading from the header, or from the file."""
+
+    def read(position: int, size: int) -> bytes:
+        if position + size <= len(header):
+            return header[position : position + size]
+        wav.seek(position)
+        return wav.read(size) or b""
+
+    return read
+
+
+def _check_chunks(
+    read: Callable[[int, int], bytes],
+    start: int,
+    end: int,
+    file_size: int,
+    parent: str,
+    chunks: Dict[bytes, Tuple[int, int]],
+) -> Optional[Problem]:
+    """Walk the chunks between start and end, returning the first problem.
+
+    The position and size of the first chunk of each ID are added to
+    chunks.
+    """
+    position = start
+    odd = False
+
+    while position < end:
+        if position + 8 > file_size:
+            return (
+                AuditStatus.TRUNCATED,
+                f"The file ends inside the chunk header at {position}.",
+            )
+
+        if position + 8 > end:
+            return (
+                AuditStatus.BAD_CHUNK,
+                f"{end - position} stray bytes at the end of the {parent} "
+                "chunk.",
+            )
+
+        header = read(position, 8)
+        chunk_id = header[:4]
+        size = int.from_bytes(header[4:], "little")
+
+        if not _is_chunk_id(chunk_id):
+            if odd and _is_chunk_id(read(position - 1, 4)):
+                return (
+                    AuditStatus.MISSING_PADDING,
+                    f"The chunk before {position - 1} has an odd size and "
+                    "no padding byte.",
+                )
+            return (
+                AuditStatus.BAD_CHUNK,
+                f"Invalid chunk ID {bytes(chunk_id)!r} at {position}.",
+            )
+
+        name = chunk_id.decode("ascii")
+        chunk_end = position + 8 + size
+        chunks.setdefault(bytes(chunk_id), (position, size))
+
+        if chunk_end > file_size:
+            return (
+                AuditStatus.TRUNCATED,
+                f"The {name} chunk at {position} declares {size} bytes, "
+                f"the file holds {file_size - position - 8}.",
+            )
+
+        if chunk_end > end:
+            return (
+                AuditStatus.SIZE_MISMATCH
+                if parent == "RIFF"
+                else AuditStatus.BAD_CHUNK,
+                f"The {name} chunk at {position} ends at {chunk_end}, after "
+                f"the end of the {parent} chunk at {end}.",
+            )
+
+        if chunk_id == b"LIST":
+            if size < 4:
+                return (
+                    AuditStatus.BAD_CHUNK,
+                    f"The LIST chunk at {position} is too short.",
+                )
+
+            problem = _check_chunks(
+                read,
+                position + 12,
+                chunk_end,
+                file_size,
+                "LIST",
+                {},
+            )
+            if problem is not None:
+                return problem
+
+        odd = bool(size & 1)
+        position = chunk_end + odd
+        if position > end:
+            return (
+                AuditStatus.MISSING_PADDING,
+                f"The {name} chunk at {chunk_end - size - 8} has an odd "
+                "size and no padding byte.",
+            )
+
+    return None
+
+
+def _diagnose(
+    wav: BinaryIO,
+    header: bytes,
+    file_size: int,
+) -> Tuple[Optional[Problem], Optional[int]]:
+    """Return the first problem of the file and the size of its data."""
+    if not header:
+        return (AuditStatus.TRUNCATED, "The file is empty."), None
+
+    if not header[:12].strip(b"\x00"):
+        return (AuditStatus.ZEROED_HEADER, "The header is zeroed."), None
+
+    if header[:4] != b"RIFF":
+        return (AuditStatus.NOT_WAV, "Not a RIFF file."), None
+
+    if len(header) < 12:
+        return (
+            (AuditStatus.TRUNCATED, "The file ends inside the RIFF header."),
+            None,
+        )
+
+    if header[8:12] != b"WAVE":
+        return (AuditStatus.NOT_WAV, "Not a WAVE file."), None
+
+    riff_end = 8 + int.from_bytes(header[4:8], "little")
+    chunks: Dict[bytes, Tuple[int, int]] = {}
+    problem = _check_chunks(
+        _reader(wav, header),
+        12,
+        riff_end,
+        file_size,
+        "RIFF",
+        chunks,
+    )
+    data_size = chunks[b"data"][1] if b"data" in chunks else None
+    if problem is not None:
+        return problem, data_size
+
+    if riff_end > file_size:
+        return (
+            (
+                AuditStatus.TRUNCATED,
+                f"The RIFF chunk declares {riff_end} bytes, the file holds "
+                f"{file_size}.",
+            ),
+            data_size,
+        )
+
+    if riff_end < file_size:
+        return (
+            (
+                AuditStatus.SIZE_MISMATCH,
+                f"{file_size - riff_end} bytes after the end of the RIFF "
+                "chunk.",
+            ),
+            data_size,
+        )
+
+    # Checked last, since a wrong RIFF size, e.g. zeroed by a failed write,
+    # hides the chunks after its end.
+    for chunk_id in REQUIRED_CHUNKS:
+        if chunk_id not in chunks:
+            return (
+                (
+                    AuditStatus.MISSING_CHUNK,
+                    f"No {chunk_id.decode('ascii')} chunk found.",
+                ),
+                data_size,
+            )
+
+    return None, data_size
+
+
+def audit_file(path: PathLike) -> AuditResult:
+    """Check the structure of a WAV file.
+
+    Parameters
+    ----------
+    path : PathLike
+
+    Returns
+    -------
+    AuditResult
+    """
+    path = os.fspath(path)
+    try:
+        with open(path, "rb", buffering=0) as wav:
+            file_size = os.fstat(wav.fileno()).st_size
+            header = wav.read(AUDIT_READ_SIZE) or b""
+            problem, data_size = _diagnose(
+                wav,  # type: ignore
+                header,
+                file_size,
+            )
+    except OSError as error:
+        return AuditResult(
+            path,
+            AuditStatus.UNREADABLE,
+            detail=f"{type(error).__name__}: {error}",
+        )
+
+    if problem is None:
+        return AuditResult(
+            path,
+            AuditStatus.OK,
+            file_size=file_size,
+            data_size=data_size,
+        )
+
+    status, detail = problem
+    return AuditResult(
+        path,
+        status,
+        detail=detail,
+        file_size=file_size,
+        data_size=data_size,
+    )
+
+
+def _audit_batch(paths: List[PathLike]) -> List[AuditResult]:
+    return [audit_file(path) for path in paths]
+
+
+def audit(
+    paths: Iterable[PathLike],
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    executor: str = "process",
+) -> Iterator[AuditResult]:
+    """Check the structure of many WAV files in parallel.
+
+    Parameters
+    ----------
+    paths : iterable of PathLike
+        Files to check. Directories are not walked, see
+        :py:func:`metamoth.scan.iter_wav_files`.
+    workers : int, optional
+        Number of parallel workers. Defaults to the number of CPUs. With
+        one worker the files are checked in the calling process.
+    batch_size : int, optional
+        Number of files sent to a worker at once.
+    executor : str, optional
+        ``"process"`` (default) or ``"thread"``, see
+        :py:func:`metamoth.scan.scan`.
+
+    Yields
+    ------
+    result : AuditResult
+        The diagnosis of each file, in the order of the paths.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        yield from map(audit_file, paths)
+        return
+
+    for results in map_batches(
+        _audit_batch,
+        batched(paths, batch_size),
+        workers,
+        executor,
+    ):
+        yield from results
@@ -0,0 +1,584 @@
+"""Decode and encode the binary configuration of AudioMoth devices.
+
+The AudioMoth Configuration App sends the configuration to the device as
+the packed ``configSettings_t`` struct of the firmware, which the device
+stores as is. This module maps these bytes to and from the configuration
+dataclasses of :py:mod:`metamoth.config`::
+
+    config = decode_config(data, "1.4.0")
+    assert encode_config(config) == data
+
+The layout of each firmware version is compiled once into a
+:py:class:`struct.Struct`. Fields are little-endian and unaligned, and bit
+fields are allocated from the least significant bit of consecutive bytes,
+as done by GCC for the ARM Cortex-M of the AudioMoth.
+
+:py:func:`decode_configs` decodes many configurations of the same version
+in one pass of :py:meth:`struct.Struct.iter_unpack`, e.g. when reading them
+from a device database.
+"""
+# pylint: disable=invalid-name
+
+import struct
+from dataclasses import dataclass, fields
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from metamoth.config import (
+    Config1_0,
+    Config1_1_0,
+    Config1_2_0,
+    Config1_2_1,
+    Config1_2_2,
+    Config1_4_0,
+    Config1_5_0,
+    Config1_6_0,
+    Config1_7_0,
+    Config1_8_0,
+    StartStopPeriod,
+)
+from metamoth.enums import BatteryLevelDisplayType
+
+__all__ = [
+    "CONFIG_CLASSES",
+    "ConfigLayout",
+    "config_size",
+    "decode_config",
+    "decode_configs",
+    "encode_config",
+    "get_layout",
+]
+
+Config = Union[
+    Config1_0,
+    Config1_1_0,
+    Config1_2_0,
+    Config1_2_1,
+    Config1_2_2,
+    Config1_4_0,
+    Config1_5_0,
+    Config1_6_0,
+    Config1_7_0,
+    Config1_8_0,
+]
+
+CONFIG_CLASSES: Dict[str, Type[Any]] = {
+    "1.0": Config1_0,
+    "1.1.0": Config1_1_0,
+    "1.2.0": Config1_2_0,
+    "1.2.1": Config1_2_1,
+    "1.2.2": Config1_2_2,
+    "1.4.0": Config1_4_0,
+    "1.5.0": Config1_5_0,
+    "1.6.0": Config1_6_0,
+    "1.7.0": Config1_7_0,
+    "1.8.0": Config1_8_0,
+}
+"""Configuration class of each firmware version with a distinct layout."""
+
+_VERSIONS = {cls: version for version, cls in CONFIG_CLASSES.items()}
+
+MAX_START_STOP_PERIODS = 5
+
+# A layout is a sequence of fields, each a (name, struct format) pair, or a
+# tuple of (name, bits, signed) bit fields packed in consecutive bytes.
+BitField = Tuple[str, int, bool]
+Item = Union[Tuple[str, str], Tuple[BitField, ...]]
+
+_START = (
+    ("time", "I"),
+    ("gain", "B"),
+)
+
+_PERIODS = (
+    ("enable_led", "B"),
+    ("active_start_stop_periods", "B"),
+    ("start_stop_period", f"{2 * MAX_START_STOP_PERIODS}H"),
+)
+
+_SAMPLING = (
+    ("clock_divider", "B"),
+    ("acquisition_cycles", "B"),
+    ("oversample_rate", "B"),
+    ("sample_rate", "I"),
+    ("sample_rate_divider", "B"),
+    ("sleep_duration", "H"),
+    ("record_duration", "H"),
+)
+
+_SCHEDULE_1_4_0 = (
+    *_START,
+    *_SAMPLING,
+    *_PERIODS,
+    ("timezone_hours", "b"),
+    ("enable_low_voltage_cutoff", "B"),
+    ("disable_battery_level_display", "B"),
+    ("timezone_minutes", "b"),
+    ("disable_sleep_record_cycle", "B"),
+    ("earliest_recording_time", "I"),
+    ("latest_recording_time", "I"),
+    ("lower_filter_freq", "H"),
+    ("higher_filter_freq", "H"),
+    ("amplitude_threshold", "H"),
+)
+
+_AMPLITUDE_THRESHOLD_SCALES: Tuple[BitField, ...] = (
+    ("enable_amplitude_threshold_decibel_scale", 1, False),
+    ("amplitude_threshold_decibels", 7, False),
+    ("enable_amplitude_threshold_percentage_scale", 1, False),
+    ("amplitude_threshold_percentage_mantissa", 4, False),
+    ("amplitude_threshold_percentage_exponent", 3, True),
+    ("enable_energy_saver_mode", 1, False),
+    ("disable_48_hz_dc_blocking_filter", 1, False),
+)
+
+_LAYOUTS: Dict[str, Tuple[Item, ...]] = {
+    "1.0": (
+        *_START,
+        ("clock_band", "B"),
+        ("clock_divider", "B"),
+        ("acquisition_cycles", "B"),
+        ("oversample_rate", "B"),
+        ("sample_rate", "I"),
+        ("sleep_duration", "H"),
+        ("record_duration", "H"),
+        *_PERIODS,
+    ),
+    "1.1.0": (
+        *_START,
+        *_SAMPLING,
+        *_PERIODS,
+    ),
+    "1.2.0": (
+        *_START,
+        ("clock_divider", "B"),
+        ("acquisition_cycles", "B"),
+        ("oversample_rate", "B"),
+        ("sample_rate", "I"),
+        ("sleep_duration", "H"),
+        ("record_duration", "H"),
+        *_PERIODS,
+        ("timezone", "b"),
+    ),
+    "1.2.1": (
+        *_START,
+        ("clock_divider", "B"),
+        ("acquisition_cycles", "B"),
+        ("oversample_rate", "B"),
+        ("sample_rate", "I"),
+        ("sleep_duration", "H"),
+        ("record_duration", "H"),
+        *_PERIODS,
+        ("timezone", "b"),
+        ("enable_battery_check", "B"),
+        ("disable_battery_level_display", "B"),
+    ),
+    "1.2.2": (
+        *_START,
+        *_SAMPLING,
+        *_PERIODS,
+        ("timezone_hours", "b"),
+        ("enable_battery_check", "B"),
+        ("disable_battery_level_display", "B"),
+        ("timezone_minutes", "b"),
+    ),
+    "1.4.0": _SCHEDULE_1_4_0,
+    "1.5.0": (
+        *_SCHEDULE_1_4_0,
+        ("require_acoustic_configuration", "B"),
+        ("battery_level_display_type", "B"),
+        ("minimum_amplitude_threshold_duration", "B"),
+    ),
+    "1.6.0": (
+        *_SCHEDULE_1_4_0,
+        (
+            ("require_acoustic_configuration", 1, False),
+            ("battery_level_display_type", 1, False),
+            ("minimum_trigger_duration", 6, False),
+            *_AMPLITUDE_THRESHOLD_SCALES,
+        ),
+    ),
+    "1.7.0": (
+        *_SCHEDULE_1_4_0,
+        (
+            ("require_acoustic_configuration", 1, False),
+            ("battery_level_display_type", 1, False),
+            ("minimum_trigger_duration", 6, False),
+            *_AMPLITUDE_THRESHOLD_SCALES,
+            ("enable_time_settings_from_gps", 1, False),
+            ("enable_magnetic_switch", 1, False),
+            ("enable_low_gain_range", 1, False),
+        ),
+    ),
+    "1.8.0": (
+        *_SCHEDULE_1_4_0,
+        ("frequency_trigger_centre_frequency", "H"),
+        (
+            ("require_acoustic_configuration", 1, False),
+            ("battery_level_display_type", 1, False),
+            ("minimum_trigger_duration", 6, False),
+            ("frequency_trigger_window_length_shift", 4, False),
+            ("frequency_trigger_threshold_percentage_mantissa", 4, False),
+            ("frequency_trigger_threshold_percentage_exponent", 3, True),
+            *_AMPLITUDE_THRESHOLD_SCALES,
+            ("enable_time_settings_from_gps", 1, False),
+            ("enable_magnetic_switch", 1, False),
+            ("enable_low_gain_range", 1, False),
+            ("enable_frequency_trigger", 1, False),
+            ("enable_daily_folders", 1, False),
+        ),
+    ),
+}
+
+_INTEGER_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+
+def _get_converters(
+    field_type: Any,
+) -> Tuple[Callable[[int], Any], Callable[[Any], int]]:
+    """Return the (decoder, encoder) of a field of the given type."""
+    if field_type is bool:
+        return bool, int
+
+    if field_type is BatteryLevelDisplayType:
+        # Numbered from 1 by auto(), stored from 0 by the firmware.
+        members = list(field_type)
+        index = {member: position for position, member in enumerate(members)}
+        return members.__getitem__, index.__getitem__
+
+    if isinstance(field_type, type) and issubclass(field_type, Enum):
+        return field_type, lambda member: member.value
+
+    return int, int
+
+
+@dataclass(frozen=True)
+class _Group:
+    """Bit fields packed into an unsigned integer of the struct."""
+
+    names: Tuple[str, ...]
+    shifts: Tuple[int, ...]
+    bits: Tuple[int, ...]
+    signed: Tuple[bool, ...]
+    size: int
+
+
+# (name, index of the value, decoder or None) of a whole field, and
+# (name, shift, mask, sign bit, decoder or None) of a bit field.
+_FieldPlan = Tuple[str, int, Optional[Callable[[int], Any]]]
+_BitFieldPlan = Tuple[str, int, int, int, Optional[Callable[[int], Any]]]
+
+
+@dataclass(frozen=True)
+class ConfigLayout:
+    """Binary layout of the configuration of a firmware version."""
+
+    version: str
+    """Firmware version."""
+
+    cls: Type[Any]
+    """Configuration dataclass."""
+
+    struct: struct.Struct
+    """Compiled struct of the whole configuration."""
+
+    items: Tuple[Union[str, _Group], ...]
+    """Field names and bit field groups, in the order of the struct."""
+
+    encoders: Dict[str, Callable[[Any], int]]
+    """Conversion of each field to the stored integer."""
+
+    fields: Tuple[_FieldPlan, ...]
+    """How to decode each whole field from the unpacked values."""
+
+    bit_fields: Tuple[Tuple[int, Tuple[_BitFieldPlan, ...]], ...]
+    """Index of each bit field group in the unpacked values, and how to
+    decode its fields."""
+
+    periods: int
+    """Index of the first start stop period in the unpacked values."""
+
+    @property
+    def size(self) -> int:
+        """Size of the configuration, in bytes."""
+        return self.struct.size
+
+
+def _compile(version: str) -> ConfigLayout:
+    """Compile the layout of a firmware version."""
+    cls = CONFIG_CLASSES[version]
+    types = {field.name: field.type for field in fields(cls)}
+    converters = {
+        name: _get_converters(field_type)
+        for name, field_type in types.items()
+    }
+    decoders = {
+        name: None if decoder is int else decoder
+        for name, (decoder, _) in converters.items()
+    }
+
+    formats = ["<"]
+    items: List[Union[str, _Group]] = []
+    field_plans: List[_FieldPlan] = []
+    bit_field_plans = []
+    periods = -1
+    index = 0
+    for item in _LAYOUTS[version]:
+        if isinstance(item[1], str):
+            name, code = item  # type: ignore
+            formats.append(code)
+            items.append(name)
+            if name == "start_stop_period":
+                periods = index
+                index += 2 * MAX_START_STOP_PERIODS
+            else:
+                field_plans.append((name, index, decoders[name]))
+                index += 1
+            continue
+
+        group = _Group(
+            names=tuple(name for name, _, _ in item),  # type: ignore
+            shifts=tuple(
+                sum(bits for _, bits, _ in item[:position])  # type: ignore
+                for position in range(len(item))
+            ),
+            bits=tuple(bits for _, bits, _ in item),  # type: ignore
+            signed=tuple(signed for _, _, signed in item),  # type: ignore
+            size=(sum(bits for _, bits, _ in item) + 7) // 8,  # type: ignore
+        )
+        formats.append(_INTEGER_FORMATS.get(group.size, f"{group.size}s"))
+        items.append(group)
+        bit_field_plans.append(
+            (
+                index,
+                tuple(
+                    (
+                        name,
+                        shift,
+                        (1 << bits) - 1,
+                        1 << (bits - 1) if signed else 0,
+                        decoders[name],
+                    )
+                    for name, shift, bits, signed in zip(
+                        group.names,
+                        group.shifts,
+                        group.bits,
+                        group.signed,
+                    )
+                ),
+            )
+        )
+        index += 1
+
+    names = [
+        name
+        for item in items
+        for name in (item.names if isinstance(item, _Group) else [item])
+    ]
+    if sorted(names) != sorted(types):
+        raise RuntimeError(f"Layout of {version} does not match {cls}.")
+
+    return ConfigLayout(
+        version=version,
+        cls=cls,
+        struct=struct.Struct("".join(formats)),
+        items=tuple(items),
+        encoders={name: pair[1] for name, pair in converters.items()},
+        fields=tuple(field_plans),
+        bit_fields=tuple(bit_field_plans),
+        periods=periods,
+    )
+
+
+_layouts: Dict[str, ConfigLayout] = {}
+
+
+def get_layout(version: str) -> ConfigLayout:
+    """Return the compiled layout of a firmware version.
+
+    Raises
+    ------
+    KeyError
+        If the version is not in :py:data:`CONFIG_CLASSES`.
+    """
+    layout = _layouts.get(version)
+    if layout is None:
+        if version not in CONFIG_CLASSES:
+            raise KeyError(
+                f"Unknown configuration version {version!r}, expected one "
+                f"of {list(CONFIG_CLASSES)}."
+            )
+        layout = _layouts[version] = _compile(version)
+    return layout
+
+
+def config_size(version: str) -> int:
+    """Return the size in bytes of the configuration of a version."""
+    return get_layout(version).size
+
+
+def _build(layout: ConfigLayout, values: Sequence[Any]) -> Config:
+    """Build a configuration from the values unpacked by the struct."""
+    kwargs = {
+        name: values[index] if decode is None else decode(values[index])
+        for name, index, decode in layout.fields
+    }
+
+    start = layout.periods
+    end = start + 2 * MAX_START_STOP_PERIODS
+    kwargs["start_stop_period"] = [
+        StartStopPeriod(start_minutes=start_minutes, stop_minutes=stop)
+        for start_minutes, stop in zip(
+            values[start:end:2],
+            values[start + 1 : end : 2],
+        )
+    ]
+
+    for index, bit_fields in layout.bit_fields:
+        packed = values[index]
+        if isinstance(packed, bytes):
+            packed = int.from_bytes(packed, "little")
+        for name, shift, mask, sign, decode in bit_fields:
+            value = (packed >> shift) & mask
+            if value & sign:
+                value -= sign << 1
+            kwargs[name] = value if decode is None else decode(value)
+
+    return layout.cls(**kwargs)
+
+
+def decode_config(data: bytes, version: str) -> Config:
+    """Decode the binary configuration of a firmware version.
+
+    Parameters
+    ----------
+    data : bytes
+        The packed configuration. Bytes after the configuration are
+        ignored.
+    version : str
+        Firmware version, one of :py:data:`CONFIG_CLASSES`.
+
+    Returns
+    -------
+    config
+        The configuration dataclass of the version.
+
+    Raises
+    ------
+    ValueError
+        If the data is shorter than the configuration.
+    """
+    layout = get_layout(version)
+    if len(data) < layout.size:
+        raise ValueError(
+            f"Configuration of version {version} has {layout.size} bytes, "
+            f"got {len(data)}."
+        )
+    return _build(layout, layout.struct.unpack_from(data))
+
+
+def decode_configs(
+    data: Union[bytes, Iterable[bytes]],
+    version: str,
+) -> List[Config]:
+    """Decode many binary configurations of the same firmware version.
+
+    The configurations are unpacked in a single pass over a contiguous
+    buffer, which is much faster than calling :py:func:`decode_config` on
+    each of them.
+
+    Parameters
+    ----------
+    data : bytes or iterable of bytes
+        Either the concatenated configurations, or one configuration per
+        item. Every configuration must have exactly the size of the
+        version.
+    version : str
+        Firmware version, one of :py:data:`CONFIG_CLASSES`.
+
+    Returns
+    -------
+    configs : list
+
+    Raises
+    ------
+    ValueError
+        If the data is not a whole number of configurations.
+    """
+    layout = get_layout(version)
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        data = b"".join(data)
+
+    if len(data) % layout.size:
+        raise ValueError(
+            f"Configurations of version {version} have {layout.size} bytes, "
+            f"got {len(data)} bytes in total."
+        )
+    return [
+        _build(layout, values) for values in layout.struct.iter_unpack(data)
+    ]
+
+
+def encode_config(config: Config) -> bytes:
+    """Encode a configuration into the binary format of its firmware.
+
+    Raises
+    ------
+    TypeError
+        If the configuration is not one of :py:data:`CONFIG_CLASSES`.
+    ValueError
+        If a value does not fit in its field.
+    """
+    version = _VERSIONS.get(type(config))
+    if version is None:
+        raise TypeError(f"Unknown configuration class {type(config)}.")
+
+    layout = get_layout(version)
+    encoders = layout.encoders
+    values: List[Any] = []
+    for item in layout.items:
+        if isinstance(item, str):
+            value = getattr(config, item)
+            if item == "start_stop_period":
+                for period in value:
+                    values.extend((period.start_minutes, period.stop_minutes))
+            else:
+                values.append(encoders[item](value))
+            continue
+
+        packed = 0
+        for name, shift, bits, signed in zip(
+            item.names,
+            item.shifts,
+            item.bits,
+            item.signed,
+        ):
+            field_value = encoders[name](getattr(config, name))
+            low = -(1 << (bits - 1)) if signed else 0
+            high = (1 << (bits - 1 if signed else bits)) - 1
+            if not low <= field_value <= high:
+                raise ValueError(
+                    f"{name} = {field_value} does not fit in {bits} bits."
+                )
+            packed |= (field_value & ((1 << bits) - 1)) << shift
+
+        if item.size in _INTEGER_FORMATS:
+            values.append(packed)
+        else:
+            values.append(packed.to_bytes(item.size, "little"))
+
+    try:
+        return layout.struct.pack(*values)
+    except struct.error as error:
+        raise ValueError(f"Cannot encode {config}: {error}") from error
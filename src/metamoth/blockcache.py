@@ -0,0 +1,362 @@
+"""Cache the blocks of recordings read by the parsers.
+
+Parsing a recording makes many small reads: the chunk headers, the fmt
+chunk, the comment and the artist. On a local disk the read buffer of
+:py:func:`open` serves them, but the buffer is dropped at every seek, and
+on high-latency storage, e.g. network filesystems or
+:py:class:`metamoth.ranges.RangeReader`, each refill is a round trip.
+
+A :py:class:`BlockCache` keeps fixed-size blocks, aligned on multiples of
+the block size, and serves the reads from them::
+
+    cache = BlockCache()
+    for path in paths:
+        parse_metadata(path, block_cache=cache)
+    print(cache.stats)
+
+The header of an AudioMoth recording fits in the first block, so the
+metadata of a recording is usually read with a single fetch. Blocks are
+evicted in least recently used order, both per file, to at most
+``max_blocks_per_file`` blocks, and over all files, to at most
+``max_bytes`` bytes. The cache can be shared between threads.
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Hashable, List, Optional, Tuple, Union
+
+__all__ = [
+    "BlockCache",
+    "BlockCacheStats",
+    "CachedFile",
+    "open_cached",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+DEFAULT_BLOCK_SIZE = 4096
+
+DEFAULT_MAX_BLOCKS_PER_FILE = 8
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class BlockCacheStats:
+    """Counters of a block cache."""
+
+    hits: int = 0
+    """Blocks served from the cache."""
+
+    misses: int = 0
+    """Blocks that were not in the cache."""
+
+    fetches: int = 0
+    """Reads of the underlying files. Contiguous missing blocks are
+    fetched with a single read."""
+
+    bytes_fetched: int = 0
+    """Bytes read from the underlying files."""
+
+    evictions: int = 0
+    """Blocks evicted to respect the bounds of the cache."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the blocks served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class BlockCache:
+    """Least recently used cache of file blocks.
+
+    Parameters
+    ----------
+    block_size : int, optional
+        Size of the blocks, in bytes.
+    max_blocks_per_file : int, optional
+        Maximum number of blocks kept for each file.
+    max_bytes : int, optional
+        Maximum number of bytes kept for all files.
+    read_ahead : int, optional
+        Number of blocks fetched after the blocks of a read that misses
+        the cache, in the same read of the underlying file.
+    """
+
+    def __init__(
+        self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_blocks_per_file: int = DEFAULT_MAX_BLOCKS_PER_FILE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        read_ahead: int = 0,
+    ):
+        """Initialize an empty cache."""
+        if block_size <= 0:
+            raise ValueError("The block size must be positive.")
+
+        self.block_size = block_size
+        self.max_blocks_per_file = max_blocks_per_file
+        self.max_bytes = max_bytes
+        self.read_ahead = read_ahead
+        self.stats = BlockCacheStats()
+        self._blocks: "OrderedDict[Tuple[Hashable, int], bytes]" = (
+            OrderedDict()
+        )
+        self._files: Dict[Hashable, "OrderedDict[int, None]"] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes kept in the cache."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        """Return the number of blocks kept in the cache."""
+        return len(self._blocks)
+
+    def get(self, key: Hashable, index: int) -> Optional[bytes]:
+        """Return a block, or None if it is not in the cache.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifier of the file.
+        index : int
+            Index of the block in the file.
+        """
+        with self._lock:
+            block = self._blocks.get((key, index))
+            if block is None:
+                self.stats.misses += 1
+                return None
+
+            self.stats.hits += 1
+            self._blocks.move_to_end((key, index))
+            self._files[key].move_to_end(index)
+            return block
+
+    def put(self, key: Hashable, index: int, block: bytes) -> None:
+        """Add a block, evicting the least recently used ones if needed.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifier of the file.
+        index : int
+            Index of the block in the file.
+        block : bytes
+            Contents of the block. Only the last block of a file may be
+            shorter than the block size.
+        """
+        with self._lock:
+            self._remove(key, index)
+            self._blocks[(key, index)] = block
+            self._files.setdefault(key, OrderedDict())[index] = None
+            self._bytes += len(block)
+
+            blocks = self._files[key]
+            while len(blocks) > self.max_blocks_per_file:
+                self._evict(key, next(iter(blocks)))
+
+            while self._bytes > self.max_bytes and self._blocks:
+                self._evict(*next(iter(self._blocks)))
+
+    def clear(self) -> None:
+        """Remove all blocks."""
+        with self._lock:
+            self._blocks.clear()
+            self._files.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable, index: int) -> None:
+        block = self._blocks.pop((key, index), None)
+        if block is None:
+            return
+
+        self._bytes -= len(block)
+        blocks = self._files[key]
+        del blocks[index]
+        if not blocks:
+            del self._files[key]
+
+    def _evict(self, key: Hashable, index: int) -> None:
+        self._remove(key, index)
+        self.stats.evictions += 1
+
+    def fetch(
+        self,
+        raw: BinaryIO,
+        key: Hashable,
+        first: int,
+        count: int,
+    ) -> List[bytes]:
+        """Read blocks from a file and add them to the cache.
+
+        Parameters
+        ----------
+        raw : BinaryIO
+            The file, read with one seek and one read.
+        key : hashable
+            Identifier of the file.
+        first : int
+            Index of the first block.
+        count : int
+            Number of blocks.
+
+        Returns
+        -------
+        blocks : list of bytes
+            The blocks read, fewer than count at the end of the file.
+        """
+        raw.seek(first * self.block_size)
+        data = raw.read(count * self.block_size) or b""
+
+        blocks = [
+            data[start : start + self.block_size]
+            for start in range(0, len(data), self.block_size)
+        ]
+        with self._lock:
+            self.stats.fetches += 1
+            self.stats.bytes_fetched += len(data)
+
+        for index, block in enumerate(blocks, start=first):
+            self.put(key, index, block)
+        return blocks
+
+
+class CachedFile(io.RawIOBase):
+    """Seekable file object reading through a block cache.
+
+    Parameters
+    ----------
+    raw : BinaryIO
+        The underlying seekable file. Closed with this file.
+    cache : BlockCache
+    key : hashable, optional
+        Identifier of the file in the cache. Defaults to the name of the
+        underlying file, with its modification time and size when it is
+        a file on disk, so that a modified file is read again.
+    """
+
+    def __init__(
+        self,
+        raw: BinaryIO,
+        cache: BlockCache,
+        key: Optional[Hashable] = None,
+    ):
+        """Initialize the file at its start."""
+        super().__init__()
+        self.raw = raw
+        self.cache = cache
+        self.key = _get_key(raw) if key is None else key
+        self._position = 0
+
+    @property
+    def name(self):
+        """Name of the underlying file."""
+        return self.raw.name
+
+    def readable(self) -> bool:
+        """Return True."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True."""
+        return True
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to a new position, without reading the file."""
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        else:
+            self._position = self.raw.seek(offset, whence)
+        return self._position
+
+    def readinto(self, buffer) -> int:  # type: ignore
+        """Read into the buffer from the cached blocks."""
+        size = len(buffer)
+        if size == 0:
+            return 0
+
+        block_size = self.cache.block_size
+        first = self._position // block_size
+        last = (self._position + size - 1) // block_size
+
+        blocks: List[Optional[bytes]] = [
+            self.cache.get(self.key, index)
+            for index in range(first, last + 1)
+        ]
+        missing = [
+            position for position, block in enumerate(blocks) if block is None
+        ]
+        if missing:
+            start, end = missing[0], missing[-1] + 1
+            fetched = self.cache.fetch(
+                self.raw,
+                self.key,
+                first + start,
+                end - start + self.cache.read_ahead,
+            )
+            blocks[start:end] = fetched[: end - start]
+
+        count = 0
+        offset = self._position - first * block_size
+        for block in blocks:
+            if block is None:
+                break
+
+            data = block[offset : offset + size - count]
+            buffer[count : count + len(data)] = data
+            count += len(data)
+            offset = 0
+
+            if len(block) < block_size:
+                break
+
+        self._position += count
+        return count
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        if not self.closed:
+            self.raw.close()
+        super().close()
+
+
+def _get_key(raw: BinaryIO) -> Hashable:
+    try:
+        stat = os.fstat(raw.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return raw.name
+    return (raw.name, stat.st_mtime_ns, stat.st_size)
+
+
+def open_cached(path: PathLike, cache: BlockCache) -> CachedFile:
+    """Open a file for reading through a block cache.
+
+    Parameters
+    ----------
+    path : PathLike
+    cache : BlockCache
+
+    Returns
+    -------
+    CachedFile
+    """
+    raw = open(  # pylint: disable=consider-using-with
+        path,
+        "rb",
+        buffering=0,
+    )
+    return CachedFile(raw, cache)  # type: ignore
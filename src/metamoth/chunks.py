@@ -15,8 +15,9 @@ and metadata.
 """
 
 import os
+import struct
 from dataclasses import dataclass, field
-from typing import BinaryIO, Dict, Optional, Union
+from typing import BinaryIO, Dict, Mapping, Optional, Union
 
 PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
 
@@ -25,9 +26,14 @@ CHUNKS_WITH_SUBCHUNKS = ["RIFF", "LIST"]
 
 __all__ = [
     "Chunk",
+    "decode_text",
     "parse_into_chunks",
+    "read_info_texts",
+    "read_text",
 ]
 
+_chunk_header = struct.Struct("<4sI")
+
 
 @dataclass
 class Chunk:
@@ -73,7 +79,11 @@ def _get_subchunks(riff: BinaryIO, size: int) -> Dict[str, Chunk]:
 
     subchunks = {}
     while riff.tell() < start_position + size - 1:
-        subchunk = _read_chunk(riff)
+        try:
+            subchunk = _read_chunk(riff)
+        except EOFError:
+            # Truncated file, or only its header was read.
+            break
         subchunks[subchunk.chunk_id] = subchunk
     return subchunks
 
@@ -90,10 +100,19 @@ def _read_chunk(riff: BinaryIO) -> Chunk:
     Returns
     -------
     Chunk
+
+    Raises
+    ------
+    EOFError
+        If the end of the file is reached before the chunk header.
     """
     position = riff.tell()
-    chunk_id = riff.read(4).decode("ascii")
-    size = int.from_bytes(riff.read(4), "little")
+    header = riff.read(8)
+    if len(header) < 8:
+        raise EOFError(f"Chunk header at {position} is truncated.")
+
+    chunk_id = header[:4].decode("ascii")
+    size = int.from_bytes(header[4:], "little")
 
     identifier = None
     if chunk_id in CHUNKS_WITH_SUBCHUNKS:
@@ -125,6 +144,117 @@ def parse_into_chunks(riff: BinaryIO) -> Chunk:
     Returns
     -------
     Chunk
+
+    Raises
+    ------
+    ValueError
+        If the file is shorter than a chunk header. Chunks that start
+        past the end of the file are ignored, so the header of a recording
+        can be parsed without its audio data.
     """
     riff.seek(0)
-    return _read_chunk(riff)
+    try:
+        return _read_chunk(riff)
+    except EOFError as error:
+        raise ValueError("File is too short to be a RIFF file.") from error
+
+
+def decode_text(data: bytes) -> str:
+    """Decode null terminated text, as written by the AudioMoth firmware.
+
+    The text ends at the first null byte, and only the bytes before it are
+    decoded. Leading null bytes are ignored, as done by older versions. A
+    character cut at the end of the data, e.g. by a bounded read, is
+    dropped.
+
+    Parameters
+    ----------
+    data : bytes
+
+    Returns
+    -------
+    text : str
+    """
+    end = data.find(b"\x00")
+    if end == 0:
+        data = data.lstrip(b"\x00")
+        end = data.find(b"\x00")
+    if end == -1:
+        end = len(data)
+
+    text = memoryview(data)[:end]
+    try:
+        return str(text, "utf-8")
+    except UnicodeDecodeError as error:
+        if error.reason != "unexpected end of data":
+            raise
+        return str(text[: error.start], "utf-8")
+
+
+def read_text(riff: BinaryIO, chunk: Chunk, size: int) -> str:
+    """Return the null terminated text stored in a chunk.
+
+    The text ends at the first null byte, as written by the AudioMoth
+    firmware, and only the bytes before it are decoded. The padding is
+    never decoded nor copied.
+
+    Parameters
+    ----------
+    riff : BinaryIO
+        Open file object of the RIFF file.
+    chunk : Chunk
+        The chunk holding the text.
+    size : int
+        Maximum number of bytes to read from the chunk data.
+
+    Returns
+    -------
+    text : str
+    """
+    riff.seek(chunk.position + 8)
+    return decode_text(riff.read(size))
+
+
+def read_info_texts(data: bytes, sizes: Mapping[str, int]) -> Dict[str, str]:
+    """Return the texts of the chunks held in a buffer.
+
+    The buffer holds either a whole RIFF file or a sequence of chunks, such
+    as the data of a LIST chunk after its list type. The subchunks of LIST
+    chunks are walked in the same pass, and chunks cut at the end of the
+    buffer are read up to its end.
+
+    Parameters
+    ----------
+    data : bytes
+        The chunks to walk.
+    sizes : Mapping[str, int]
+        Maximum number of bytes decoded from each chunk of interest, by
+        chunk ID. Other chunks are skipped.
+
+    Returns
+    -------
+    texts : Dict[str, str]
+        The text of the last chunk of each ID found, by chunk ID.
+    """
+    texts: Dict[str, str] = {}
+    offset = 0
+    if data[:4] == b"RIFF":
+        offset = 12
+
+    while offset + 8 <= len(data):
+        chunk_id, size = _chunk_header.unpack_from(data, offset)
+        offset += 8
+
+        if chunk_id == b"LIST":
+            offset += 4
+            continue
+
+        name = chunk_id.decode("latin-1")
+        if name in sizes:
+            texts[name] = decode_text(
+                data[offset : offset + min(size, sizes[name])]
+            )
+
+        offset += size + (size & 1)
+
+    return texts
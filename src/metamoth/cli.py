@@ -0,0 +1,403 @@
+"""Command line interface of metamoth.
+
+Scan files or directories of AudioMoth recordings and write their metadata
+as JSON Lines or CSV::
+
+    metamoth scan /media/SDCARD --workers 8 -o metadata.jsonl
+
+Or keep indexing the recordings that land in a directory::
+
+    metamoth watch /data/landing --state landing.state -o metadata.jsonl
+
+Progress and throughput are reported on stderr, so the metadata can be
+piped to other tools from stdout.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from dataclasses import fields, is_dataclass
+from typing import IO, Any, Dict, List, Optional, Sequence
+
+from metamoth.instrumentation import Profiler
+from metamoth.metadata import AMMetadata
+from metamoth.scan import ScanError, scan
+from metamoth.serialization import (
+    JSON_ENCODER,
+    get_field_plan,
+    to_dict,
+    unwrap_optional,
+)
+from metamoth.watch import DEFAULT_INTERVAL_S, watch
+
+__all__ = [
+    "main",
+]
+
+FORMATS = ("jsonl", "csv")
+
+ERROR_CHOICES = ("raise", "skip", "report")
+
+PROGRESS_INTERVAL_S = 1.0
+
+
+def _parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    if value is None:
+        return None
+
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    valid = get_field_plan(AMMetadata).names
+    for name in names:
+        if name not in valid:
+            raise argparse.ArgumentTypeError(
+                f"unknown field {name!r}, choose from: {', '.join(valid)}"
+            )
+    return names
+
+
+def _get_csv_columns(names: Sequence[str]) -> Dict[str, List[str]]:
+    """Return the CSV columns of each field.
+
+    Nested fields are flattened into one column per attribute.
+    """
+    types = {field.name: field.type for field in fields(AMMetadata)}
+    columns = {}
+    for name in names:
+        field_type = unwrap_optional(types[name])
+        if is_dataclass(field_type):
+            columns[name] = [
+                f"{name}_{subfield.name}"
+                for subfield in fields(field_type)  # type: ignore
+            ]
+        else:
+            columns[name] = [name]
+    return columns
+
+
+class _JSONLWriter:
+    def __init__(self, fp: IO[str], names: Optional[Sequence[str]]):
+        self._fp = fp
+        self._names = names
+
+    def write(self, record: AMMetadata) -> None:
+        self._fp.write(JSON_ENCODER.encode(to_dict(record, self._names)))
+        self._fp.write("\n")
+
+
+class _CSVWriter:
+    def __init__(
+        self,
+        fp: IO[str],
+        names: Optional[Sequence[str]],
+        header: bool = True,
+    ):
+        if names is None:
+            names = get_field_plan(AMMetadata).names
+        self._names = names
+        self._columns = _get_csv_columns(names)
+        self._writer = csv.writer(fp)
+        if header:
+            self._writer.writerow(
+                [column for name in names for column in self._columns[name]]
+            )
+
+    def write(self, record: AMMetadata) -> None:
+        row: List[Any] = []
+        for name, value in to_dict(record, self._names).items():
+            columns = self._columns[name]
+            if columns[0] == name:
+                row.append(value)
+            elif value is None:
+                row.extend([None] * len(columns))
+            else:
+                row.extend(value.values())
+        self._writer.writerow(row)
+
+
+class _Progress:
+    """Report the number of scanned files and throughput on stderr."""
+
+    def __init__(self, stream: IO[str], enabled: bool = True):
+        self.stream = stream
+        self.enabled = enabled
+        self.parsed = 0
+        self.errors = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def update(self, parsed: int = 0, errors: int = 0) -> None:
+        self.parsed += parsed
+        self.errors += errors
+
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        if now - self._last_report >= PROGRESS_INTERVAL_S:
+            self._last_report = now
+            self.stream.write(f"\r{self._format(now)}")
+            self.stream.flush()
+
+    def finish(self) -> None:
+        if self.enabled:
+            self.stream.write(f"\r{self._format(time.perf_counter())}\n")
+            self.stream.flush()
+
+    def _format(self, now: float) -> str:
+        elapsed = max(now - self.start, 1e-9)
+        total = self.parsed + self.errors
+        return (
+            f"{total} files scanned, {self.parsed} parsed, "
+            f"{self.errors} errors in {elapsed:.1f}s "
+            f"({total / elapsed:.1f} files/s)"
+        )
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="metamoth",
+        description="Extract the metadata of AudioMoth recordings.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    scan_parser = subparsers.add_parser(
+        "scan",
+        help="Parse the metadata of files or directories of recordings.",
+        description=(
+            "Parse the metadata of files or directories of recordings. "
+            "Directories are searched recursively for WAV files."
+        ),
+    )
+    scan_parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="PATH",
+        help="Recording or directory of recordings.",
+    )
+    _add_output_arguments(scan_parser)
+    scan_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of parallel workers. Defaults to the number of CPUs.",
+    )
+    scan_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report the time spent in each parsing stage on stderr.",
+    )
+    scan_parser.set_defaults(handler=_run_scan)
+
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="Parse new recordings as they appear in a directory.",
+        description=(
+            "Poll a directory for new recordings and append their metadata "
+            "to the output. Files are parsed once their size stops "
+            "changing. Stop with Ctrl-C."
+        ),
+    )
+    watch_parser.add_argument(
+        "directory",
+        metavar="DIRECTORY",
+        help="Directory to watch, including its subdirectories.",
+    )
+    _add_output_arguments(watch_parser)
+    watch_parser.add_argument(
+        "-s",
+        "--state",
+        default=None,
+        help=(
+            "File where the indexing progress is saved, so that restarting "
+            "the watcher does not parse the same files again."
+        ),
+    )
+    watch_parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL_S,
+        help=f"Seconds between polls. Defaults to {DEFAULT_INTERVAL_S:g}.",
+    )
+    watch_parser.add_argument(
+        "--max-polls",
+        type=int,
+        default=None,
+        help="Stop after this number of polls. Defaults to running forever.",
+    )
+    watch_parser.set_defaults(handler=_run_watch)
+    return parser
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Output file. Defaults to stdout.",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        default="jsonl",
+        help="Output format. Defaults to jsonl.",
+    )
+    parser.add_argument(
+        "--fields",
+        type=_parse_fields,
+        default=None,
+        help="Comma separated list of fields to output. Defaults to all.",
+    )
+    parser.add_argument(
+        "--errors",
+        choices=ERROR_CHOICES,
+        default="report",
+        help=(
+            "What to do with files that cannot be parsed: stop (raise), "
+            "ignore them (skip) or list them on stderr and continue "
+            "(report). Defaults to report."
+        ),
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Do not report progress on stderr.",
+    )
+
+
+def _open_output(path: str, mode: str = "w") -> IO[str]:
+    if path == "-":
+        return sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def _create_writer(
+    fp: IO[str],
+    output_format: str,
+    names: Optional[Sequence[str]],
+    header: bool = True,
+):
+    if output_format == "csv":
+        return _CSVWriter(fp, names, header=header)
+    return _JSONLWriter(fp, names)
+
+
+def _run_scan(args: argparse.Namespace) -> int:
+    progress = _Progress(sys.stderr, enabled=not args.quiet)
+
+    def on_error(error: ScanError) -> None:
+        progress.update(errors=1)
+        if args.errors == "report":
+            sys.stderr.write(
+                f"\rerror: {error.path}: {error.error}: {error.message}\n"
+            )
+
+    profiler = Profiler() if args.profile else None
+
+    fp = _open_output(args.output)
+    try:
+        writer = _create_writer(fp, args.format, args.fields)
+        for record in scan(
+            args.paths,
+            workers=args.workers,
+            errors="raise" if args.errors == "raise" else "skip",
+            on_error=on_error,
+            profiler=profiler,
+        ):
+            writer.write(record)
+            progress.update(parsed=1)
+    except ValueError as error:
+        progress.finish()
+        sys.stderr.write(f"metamoth: error: {error}\n")
+        return 1
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+        else:
+            fp.flush()
+
+    progress.finish()
+    if profiler is not None:
+        sys.stderr.write(profiler.format() + "\n")
+    return 1 if args.errors == "report" and progress.errors else 0
+
+
+def _run_watch(args: argparse.Namespace) -> int:
+    progress = _Progress(sys.stderr, enabled=not args.quiet)
+
+    def on_error(error: ScanError) -> None:
+        progress.update(errors=1)
+        if args.errors == "report":
+            sys.stderr.write(
+                f"\rerror: {error.path}: {error.error}: {error.message}\n"
+            )
+
+    fp = _open_output(args.output, "a")
+    try:
+        writer = _create_writer(
+            fp,
+            args.format,
+            args.fields,
+            header=fp is sys.stdout or fp.tell() == 0,
+        )
+        for record in watch(
+            args.directory,
+            state_path=args.state,
+            interval=args.interval,
+            errors="raise" if args.errors == "raise" else "skip",
+            on_error=on_error,
+            max_polls=args.max_polls,
+        ):
+            writer.write(record)
+            fp.flush()
+            progress.update(parsed=1)
+    except KeyboardInterrupt:
+        pass
+    except ValueError as error:
+        progress.finish()
+        sys.stderr.write(f"metamoth: error: {error}\n")
+        return 1
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+        else:
+            fp.flush()
+
+    progress.finish()
+    return 1 if args.errors == "report" and progress.errors else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the metamoth command line interface.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Command line arguments, without the program name. Defaults to
+        ``sys.argv[1:]``.
+
+    Returns
+    -------
+    int
+        Exit status.
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # The reader of stdout exited, e.g. ``metamoth scan DIR | head``.
+        # Python flushes stdout again at exit, so it is pointed at devnull.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
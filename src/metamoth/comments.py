@@ -2,7 +2,8 @@
 
 from typing import BinaryIO
 
-from metamoth.chunks import Chunk
+from metamoth.chunks import Chunk, read_text
+from metamoth.parsing import MAX_COMMENT_SIZE
 
 __all__ = [
     "get_am_comment",
@@ -23,10 +24,12 @@ def read_comment(wav: BinaryIO, comment_chunk: Chunk) -> str:
     Returns
     -------
     comment : str
+        The text up to the first null byte. At most
+        :py:data:`metamoth.parsing.MAX_COMMENT_SIZE` bytes are read, so
+        longer comments are truncated and rejected by the parser.
     """
-    wav.seek(comment_chunk.position + 8)
-    comment = wav.read(comment_chunk.size - 4).decode("utf-8").strip("\x00")
-    return comment
+    size = min(comment_chunk.size - 4, MAX_COMMENT_SIZE)
+    return read_text(wav, comment_chunk, size)
 
 
 def get_comment_chunk(chunk: Chunk) -> Chunk:
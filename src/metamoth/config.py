@@ -45,7 +45,7 @@ class Config1_0:
     sleep_duration: int = 0
     record_duration: int = 60
     enable_led: bool = True
-    active_start_stop_periods: bool = False
+    active_start_stop_periods: int = 0
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=60, stop_minutes=120),
@@ -71,7 +71,7 @@ class Config1_1_0:
     sleep_duration: int = 0
     record_duration: int = 60
     enable_led: bool = True
-    active_start_stop_periods: bool = False
+    active_start_stop_periods: int = 0
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=60, stop_minutes=120),
@@ -96,7 +96,7 @@ class Config1_2_0:
     sleep_duration: int = 0
     record_duration: int = 60
     enable_led: bool = True
-    active_start_stop_periods: bool = False
+    active_start_stop_periods: int = 0
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=60, stop_minutes=120),
@@ -122,7 +122,7 @@ class Config1_2_1:
     sleep_duration: int = 0
     record_duration: int = 60
     enable_led: bool = True
-    active_start_stop_periods: bool = False
+    active_start_stop_periods: int = 0
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=60, stop_minutes=120),
@@ -154,7 +154,7 @@ class Config1_2_2:
     sleep_duration: int = 0
     record_duration: int = 60
     enable_led: bool = True
-    active_start_stop_periods: bool = False
+    active_start_stop_periods: int = 0
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=60, stop_minutes=120),
@@ -187,7 +187,7 @@ class Config1_4_0:
     sleep_duration: int = 5
     record_duration: int = 55
     enable_led: bool = True
-    active_start_stop_periods: bool = False
+    active_start_stop_periods: int = 0
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=0, stop_minutes=60),
@@ -223,7 +223,7 @@ class Config1_5_0:
     sleep_duration: int = 5
     record_duration: int = 55
     enable_led: bool = True
-    active_start_stop_periods: bool = False
+    active_start_stop_periods: int = 0
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=0, stop_minutes=60),
@@ -264,7 +264,7 @@ class Config1_6_0:
     sleep_duration: int = 5
     record_duration: int = 55
     enable_led: bool = True
-    active_start_stop_periods: bool = True
+    active_start_stop_periods: int = 1
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=0, stop_minutes=1440),
@@ -315,7 +315,7 @@ class Config1_7_0:
     sleep_duration: int = 5
     record_duration: int = 55
     enable_led: bool = True
-    active_start_stop_periods: bool = True
+    active_start_stop_periods: int = 1
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=0, stop_minutes=1440),
@@ -369,7 +369,7 @@ class Config1_8_0:
     sleep_duration: int = 5
     record_duration: int = 55
     enable_led: bool = True
-    active_start_stop_periods: bool = True
+    active_start_stop_periods: int = 1
     start_stop_period: List[StartStopPeriod] = field(
         default_factory=lambda: [
             StartStopPeriod(start_minutes=0, stop_minutes=1440),
@@ -0,0 +1,533 @@
+"""Parse the CONFIG.TXT file written by the AudioMoth firmware.
+
+Recent firmware writes a ``CONFIG.TXT`` file next to the recordings, with
+one ``Key : value`` line per setting::
+
+    Device ID                       : 24F319046020F53E
+    Firmware                        : AudioMoth-Firmware-Basic (1.8.0)
+
+    Time zone                       : UTC+2
+    Sample rate (Hz)                : 48000
+    Gain                            : Medium
+    ...
+
+:py:func:`parse_config_txt` maps these settings onto the configuration
+dataclass of the firmware version, see :py:mod:`metamoth.config`. The
+schedule, filter and trigger settings are then available for all the
+recordings of a folder without parsing the comment of each one.
+:py:class:`ConfigCache` reads the file of each folder only once. With
+daily folders enabled, the recordings are in ``YYYYMMDD`` subfolders and
+the file is at the root of the card, so the cache also looks for it in the
+parent folders.
+"""
+
+import os
+import re
+from calendar import timegm
+from dataclasses import fields
+from decimal import Decimal, InvalidOperation
+from threading import Lock
+from time import strptime
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+from metamoth.binconfig import CONFIG_CLASSES, MAX_START_STOP_PERIODS, Config
+from metamoth.config import StartStopPeriod
+from metamoth.enums import BatteryLevelDisplayType, GainSetting
+from metamoth.parsing import db_to_amplitude, percentage_to_amplitude
+
+__all__ = [
+    "CONFIG_FILENAME",
+    "ConfigCache",
+    "parse_config_txt",
+    "read_config_txt",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+CONFIG_FILENAME = "CONFIG.TXT"
+
+MAX_CONFIG_LENGTH = 4096
+"""Maximum number of bytes read from a CONFIG.TXT file."""
+
+MAX_SAMPLE_RATE = 384000
+"""Sample rate of the ADC, divided to get the configured sample rate."""
+
+UNUSED_FILTER_FREQ = 65535
+"""Filter frequency of the unused side of low-pass and high-pass filters."""
+
+FIRMWARE_REGEX = re.compile(r"\((\d+(?:\.\d+)*)\)")
+
+TIMEZONE_REGEX = re.compile(r"UTC(?:([+-])(\d{1,2})(?::(\d{2}))?)?")
+
+PERIOD_REGEX = re.compile(r"(\d{2}):(\d{2}) - (\d{2}):(\d{2})")
+
+PERIOD_KEY_REGEX = re.compile(r"recording period (\d+)")
+
+FILTER_REGEX = re.compile(
+    r"(?P<type>Low|High|Band)-pass \((?P<first>\d+\.\d)kHz"
+    r"(?: - (?P<second>\d+\.\d)kHz)?\)"
+)
+
+THRESHOLD_REGEX = re.compile(
+    r"(?:(?P<percentage>\d+(?:\.\d+)?)%|(?P<db>-?\d+) ?dB|(?P<amplitude>\d+))$"
+)
+
+_gains = {
+    "low": GainSetting.AM_GAIN_LOW,
+    "low-medium": GainSetting.AM_GAIN_LOW_MEDIUM,
+    "medium": GainSetting.AM_GAIN_MEDIUM,
+    "medium-high": GainSetting.AM_GAIN_MEDIUM_HIGH,
+    "high": GainSetting.AM_GAIN_HIGH,
+}
+
+_flags = {
+    "enable led": ("enable_led", False),
+    "enable low-voltage cut-off": ("enable_low_voltage_cutoff", False),
+    "enable battery level indication": (
+        "disable_battery_level_display",
+        True,
+    ),
+    "always require acoustic chime": (
+        "require_acoustic_configuration",
+        False,
+    ),
+    "use daily folder for wav files": ("enable_daily_folders", False),
+    "disable 48hz dc blocking filter": (
+        "disable_48_hz_dc_blocking_filter",
+        False,
+    ),
+    "enable energy saver mode": ("enable_energy_saver_mode", False),
+    "enable low gain range": ("enable_low_gain_range", False),
+    "enable magnetic switch": ("enable_magnetic_switch", False),
+    "enable gps time setting": ("enable_time_settings_from_gps", False),
+}
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+
+def _get_config_class(firmware: str) -> type:
+    """Return the configuration class of the firmware line.
+
+    Versions without a class of their own use the class of the latest
+    earlier version, e.g. 1.7.1 uses the class of 1.7.0.
+    """
+    match = FIRMWARE_REGEX.search(firmware)
+    if match is None:
+        raise ValueError(f"Could not find the firmware version: {firmware!r}")
+
+    version = _version_key(match.group(1))
+    candidates = [
+        name for name in CONFIG_CLASSES if _version_key(name) <= version
+    ]
+    if not candidates:
+        raise ValueError(f"Unsupported firmware version: {firmware!r}")
+
+    return CONFIG_CLASSES[max(candidates, key=_version_key)]
+
+
+def _parse_yes_no(value: str) -> bool:
+    answer = value.split(" ", 1)[0].lower()
+    if answer not in ("yes", "no"):
+        raise ValueError(f"Expected Yes or No, got {value!r}")
+    return answer == "yes"
+
+
+def _parse_timezone(value: str) -> Dict[str, Any]:
+    match = TIMEZONE_REGEX.fullmatch(value)
+    if match is None:
+        raise ValueError(f"Could not parse the time zone: {value!r}")
+
+    sign, hours, minutes = match.groups()
+    factor = -1 if sign == "-" else 1
+    return {
+        "timezone_hours": factor * int(hours or 0),
+        "timezone_minutes": factor * int(minutes or 0),
+    }
+
+
+def _parse_sample_rate(value: str) -> Dict[str, Any]:
+    rate = int(value)
+    if rate and MAX_SAMPLE_RATE % rate == 0:
+        return {
+            "sample_rate": MAX_SAMPLE_RATE,
+            "sample_rate_divider": MAX_SAMPLE_RATE // rate,
+        }
+    return {"sample_rate": rate, "sample_rate_divider": 1}
+
+
+def _parse_gain(value: str) -> Dict[str, Any]:
+    try:
+        return {"gain": _gains[value.lower()]}
+    except KeyError as error:
+        raise ValueError(f"Unknown gain: {value!r}") from error
+
+
+def _parse_duration(name: str) -> Callable[[str], Dict[str, Any]]:
+    def parse(value: str) -> Dict[str, Any]:
+        if value == "-":
+            return {"disable_sleep_record_cycle": True}
+        return {name: int(value)}
+
+    return parse
+
+
+def _parse_period(value: str) -> StartStopPeriod:
+    match = PERIOD_REGEX.match(value)
+    if match is None:
+        raise ValueError(f"Could not parse the recording period: {value!r}")
+
+    start_hours, start_minutes, stop_hours, stop_minutes = map(
+        int,
+        match.groups(),
+    )
+    return StartStopPeriod(
+        start_minutes=60 * start_hours + start_minutes,
+        stop_minutes=60 * stop_hours + stop_minutes,
+    )
+
+
+def _parse_recording_time(name: str) -> Callable[[str], Dict[str, Any]]:
+    def parse(value: str) -> Dict[str, Any]:
+        if not value.strip("-:() UTC"):
+            return {name: 0}
+
+        timestamp = value.split(" (", 1)[0]
+        return {name: timegm(strptime(timestamp, "%Y-%m-%d %H:%M:%S"))}
+
+    return parse
+
+
+def _filter_freq(frequency: str) -> int:
+    """Convert kHz to the hundreds of Hz stored by the firmware."""
+    return round(float(frequency) * 10)
+
+
+def _parse_filter(value: str) -> Dict[str, Any]:
+    if value == "-":
+        return {"lower_filter_freq": 0, "higher_filter_freq": 0}
+
+    match = FILTER_REGEX.match(value)
+    if match is None:
+        raise ValueError(f"Could not parse the filter: {value!r}")
+
+    filter_type, first, second = match.group("type", "first", "second")
+
+    if filter_type == "Band":
+        if second is None:
+            raise ValueError(f"Band-pass filter without upper bound: {value}")
+        return {
+            "lower_filter_freq": _filter_freq(first),
+            "higher_filter_freq": _filter_freq(second),
+        }
+
+    if filter_type == "Low":
+        return {
+            "lower_filter_freq": UNUSED_FILTER_FREQ,
+            "higher_filter_freq": _filter_freq(first),
+        }
+
+    return {
+        "lower_filter_freq": _filter_freq(first),
+        "higher_filter_freq": UNUSED_FILTER_FREQ,
+    }
+
+
+def _parse_trigger_type(value: str) -> Dict[str, Any]:
+    return {"enable_frequency_trigger": value.lower() == "frequency"}
+
+
+def _parse_percentage(percentage: str) -> Tuple[int, int]:
+    """Split a percentage into the mantissa and exponent of the firmware."""
+    try:
+        _, digits, exponent = Decimal(percentage).normalize().as_tuple()
+    except InvalidOperation as error:
+        raise ValueError(f"Invalid percentage: {percentage!r}") from error
+    return int("".join(map(str, digits))), int(exponent)
+
+
+def _parse_threshold(value: str) -> Dict[str, Any]:
+    """Parse the threshold setting.
+
+    The keys of the percentage scale are prefixed by the parser when the
+    trigger type is known, see :py:func:`parse_config_txt`.
+    """
+    if value == "-":
+        return {}
+
+    match = THRESHOLD_REGEX.match(value)
+    if match is None:
+        raise ValueError(f"Could not parse the threshold setting: {value!r}")
+
+    percentage, db_value, amplitude = match.group(
+        "percentage",
+        "db",
+        "amplitude",
+    )
+
+    if percentage is not None:
+        mantissa, exponent = _parse_percentage(percentage)
+        return {
+            "amplitude_threshold": percentage_to_amplitude(float(percentage)),
+            "enable_amplitude_threshold_percentage_scale": True,
+            "threshold_percentage_mantissa": mantissa,
+            "threshold_percentage_exponent": exponent,
+        }
+
+    if db_value is not None:
+        return {
+            "amplitude_threshold": db_to_amplitude(float(db_value)),
+            "enable_amplitude_threshold_decibel_scale": True,
+            "amplitude_threshold_decibels": abs(int(db_value)),
+        }
+
+    return {"amplitude_threshold": int(amplitude)}
+
+
+def _parse_trigger_duration(value: str) -> Dict[str, Any]:
+    if value == "-":
+        return {}
+    duration = int(value)
+    return {
+        "minimum_trigger_duration": duration,
+        "minimum_amplitude_threshold_duration": duration,
+    }
+
+
+_parsers: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "time zone": _parse_timezone,
+    "sample rate (hz)": _parse_sample_rate,
+    "gain": _parse_gain,
+    "sleep duration (s)": _parse_duration("sleep_duration"),
+    "recording duration (s)": _parse_duration("record_duration"),
+    "earliest recording time": _parse_recording_time(
+        "earliest_recording_time"
+    ),
+    "latest recording time": _parse_recording_time("latest_recording_time"),
+    "filter": _parse_filter,
+    "trigger type": _parse_trigger_type,
+    "threshold setting": _parse_threshold,
+    "minimum trigger duration (s)": _parse_trigger_duration,
+}
+
+
+def _iter_settings(text: str):
+    for line in text.splitlines():
+        key, separator, value = line.partition(":")
+        if separator:
+            yield key.strip().lower(), value.strip()
+
+
+def _build_config(cls: type, settings: Dict[str, Any]) -> Config:
+    """Create the configuration, keeping the settings of its fields."""
+    kwargs = {}
+    for field in fields(cls):
+        if field.name not in settings:
+            continue
+
+        value = settings[field.name]
+        if field.type is int and isinstance(value, GainSetting):
+            value = value.value
+        kwargs[field.name] = value
+
+    return cls(**kwargs)
+
+
+def parse_config_txt(text: str) -> Config:
+    """Parse the contents of a CONFIG.TXT file.
+
+    Parameters
+    ----------
+    text : str
+        Contents of the file.
+
+    Returns
+    -------
+    config : Config
+        The configuration dataclass of the firmware version. Fields that are
+        not written in the file keep their default value. Filter
+        frequencies are stored as by the firmware, in hundreds of Hz, with
+        ``65535`` on the unused side of low-pass and high-pass filters.
+
+    Raises
+    ------
+    ValueError
+        If the firmware version is missing or unsupported, or if a setting
+        cannot be parsed.
+    """
+    firmware = None
+    settings: Dict[str, Any] = {}
+    periods: Dict[int, StartStopPeriod] = {}
+
+    for key, value in _iter_settings(text):
+        if key == "firmware":
+            firmware = value
+            continue
+
+        if key == "active recording periods":
+            settings["active_start_stop_periods"] = int(value)
+            continue
+
+        period = PERIOD_KEY_REGEX.fullmatch(key)
+        if period is not None:
+            periods[int(period.group(1))] = _parse_period(value)
+            continue
+
+        if key in _flags:
+            name, invert = _flags[key]
+            enabled = _parse_yes_no(value)
+            settings[name] = enabled != invert
+            if name == "disable_battery_level_display" and enabled:
+                settings["battery_level_display_type"] = (
+                    BatteryLevelDisplayType.NIMH_LIPO_BATTERY_VOLTAGE
+                    if "nimh" in value.lower()
+                    else BatteryLevelDisplayType.BATTERY_LEVEL
+                )
+            continue
+
+        parser = _parsers.get(key)
+        if parser is not None:
+            settings.update(parser(value))
+
+    if firmware is None:
+        raise ValueError("No firmware version found in the configuration.")
+
+    if periods:
+        settings["start_stop_period"] = [
+            periods.get(index, StartStopPeriod(0, 0))
+            for index in range(1, MAX_START_STOP_PERIODS + 1)
+        ]
+
+    scale = (
+        "frequency_trigger"
+        if settings.get("enable_frequency_trigger")
+        else "amplitude"
+    )
+    for part in ("mantissa", "exponent"):
+        if f"threshold_percentage_{part}" in settings:
+            settings[f"{scale}_threshold_percentage_{part}"] = settings.pop(
+                f"threshold_percentage_{part}"
+            )
+
+    return _build_config(_get_config_class(firmware), settings)
+
+
+def read_config_txt(path: PathLike) -> Config:
+    """Read and parse a CONFIG.TXT file.
+
+    Parameters
+    ----------
+    path : PathLike
+        Path to the file.
+
+    Returns
+    -------
+    config : Config
+
+    Raises
+    ------
+    ValueError
+        If the file cannot be parsed.
+    """
+    with open(path, "rb") as config_file:
+        data = config_file.read(MAX_CONFIG_LENGTH)
+    return parse_config_txt(data.decode("utf-8", errors="replace"))
+
+
+class ConfigCache:
+    """Configuration of the recordings of each folder.
+
+    The CONFIG.TXT file of a folder is read the first time one of its
+    recordings is looked up, and the same configuration object is returned
+    for all of them.
+
+    A folder without a CONFIG.TXT file gets the configuration of its
+    parent folder, up to the root folder that contains it, e.g. the root
+    of a card whose recordings are in daily folders. Folders that are not
+    inside a root only use their own file.
+
+    Parameters
+    ----------
+    roots : iterable of PathLike, optional
+        Folders where the search for a CONFIG.TXT file stops, see
+        :py:meth:`add_root`.
+
+    Examples
+    --------
+    >>> cache = ConfigCache(roots=["/media/sdcard"])
+    >>> cache.get("/media/sdcard/20230101/000000.WAV")  # doctest: +SKIP
+    Config1_8_0(...)
+    """
+
+    def __init__(self, roots: Iterable[PathLike] = ()) -> None:
+        self._configs: Dict[str, Optional[Config]] = {}
+        self._roots: Set[str] = set()
+        self._lock = Lock()
+        for root in roots:
+            self.add_root(root)
+
+    def add_root(self, path: PathLike) -> None:
+        """Add a folder where the search for a CONFIG.TXT file stops.
+
+        Parameters
+        ----------
+        path : PathLike
+            A folder, or a file whose folder is added.
+        """
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            path = os.path.dirname(path)
+        self._roots.add(path)
+
+    def get(self, path: PathLike) -> Optional[Config]:
+        """Return the configuration of the folder of a recording.
+
+        Parameters
+        ----------
+        path : PathLike
+            Path to a recording.
+
+        Returns
+        -------
+        config : Config or None
+            None if neither the folder nor its parents up to the root have
+            a CONFIG.TXT file, or if the nearest one cannot be read or
+            parsed.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            return self._configs[directory]
+        except KeyError:
+            pass
+
+        with self._lock:
+            return self._lookup(directory)
+
+    def _lookup(self, directory: str) -> Optional[Config]:
+        """Return the configuration of a folder, caching each folder."""
+        if directory in self._configs:
+            return self._configs[directory]
+
+        config = None
+        try:
+            config = read_config_txt(os.path.join(directory, CONFIG_FILENAME))
+        except FileNotFoundError:
+            if self._is_inside_root(directory):
+                config = self._lookup(os.path.dirname(directory))
+        except (OSError, ValueError):
+            pass
+
+        self._configs[directory] = config
+        return config
+
+    def _is_inside_root(self, directory: str) -> bool:
+        """Return True if a root strictly contains the folder."""
+        return any(
+            directory.startswith(root.rstrip(os.sep) + os.sep)
+            for root in self._roots
+        )
+
+    def __len__(self) -> int:
+        """Return the number of folders looked up."""
+        return len(self._configs)
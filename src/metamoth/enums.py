@@ -9,6 +9,8 @@ __all__ = [
     "RecordingState",
     "FilterType",
     "BatteryLevelDisplayType",
+    "FileKind",
+    "AuditStatus",
 ]
 
 
@@ -119,3 +121,26 @@ class BatteryLevelDisplayType(Enum):
 
     BATTERY_LEVEL = auto()
     NIMH_LIPO_BATTERY_VOLTAGE = auto()
+
+
+class FileKind(Enum):
+    """Kind of a candidate file, see :py:mod:`metamoth.triage`."""
+
+    NOT_WAV = auto()
+    WAV = auto()
+    AUDIOMOTH = auto()
+    CORRUPT = auto()
+
+
+class AuditStatus(Enum):
+    """Diagnosis of a WAV file, see :py:mod:`metamoth.audit`."""
+
+    OK = auto()
+    NOT_WAV = auto()
+    ZEROED_HEADER = auto()
+    TRUNCATED = auto()
+    SIZE_MISMATCH = auto()
+    BAD_CHUNK = auto()
+    MISSING_PADDING = auto()
+    MISSING_CHUNK = auto()
+    UNREADABLE = auto()
@@ -0,0 +1,194 @@
+"""Read the metadata of AudioMoth recordings converted to FLAC.
+
+A FLAC file starts with the ``fLaC`` marker followed by metadata blocks,
+each with a 4 bytes header: one bit flagging the last block, 7 bits of
+block type and 24 bits of big-endian length. See
+https://xiph.org/flac/format.html
+
+Only the metadata blocks are read, and the audio frames after them are
+never decoded:
+
+* ``STREAMINFO`` holds the sample rate, channels and total samples.
+* ``APPLICATION`` blocks with the ``riff`` id hold the chunks of the WAV
+  file, as preserved by ``flac --keep-foreign-metadata``. The comment and
+  artist are read from the ``ICMT`` and ``IART`` chunks.
+* ``VORBIS_COMMENT`` holds the ``COMMENT`` and ``ARTIST`` tags, as
+  written by ``ffmpeg`` and most converters.
+
+Blocks of any other type are skipped without being read.
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional, Union
+
+from metamoth.artist import MAX_ARTIST_LENGTH, get_audiomoth_id_from_artist
+from metamoth.chunks import decode_text, read_info_texts
+from metamoth.mediainfo import MediaInfo
+from metamoth.parsing import MAX_COMMENT_SIZE
+
+__all__ = [
+    "FLAC_MAGIC",
+    "FlacMetadata",
+    "is_flac_filename",
+    "read_flac_metadata",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+FLAC_MAGIC = b"fLaC"
+
+STREAMINFO = 0
+APPLICATION = 2
+VORBIS_COMMENT = 4
+
+_header = struct.Struct(">I")
+_streaminfo = struct.Struct(">10xQ")
+_riff_text_sizes = {"ICMT": MAX_COMMENT_SIZE, "IART": MAX_ARTIST_LENGTH}
+
+
+@dataclass
+class FlacMetadata:
+    """Metadata read from the metadata blocks of a FLAC file."""
+
+    media_info: MediaInfo
+    """Media information of the STREAMINFO block."""
+
+    comment: Optional[str]
+    """AudioMoth comment. None if the file has none."""
+
+    artist: Optional[str]
+    """AudioMoth ID written in the artist. None if the file has none."""
+
+
+def is_flac_filename(filename: PathLike) -> bool:
+    """Return True if filename is a FLAC file."""
+    filename = str(filename)
+    return filename.endswith(".flac") or filename.endswith(".FLAC")
+
+
+def _parse_streaminfo(data: bytes) -> MediaInfo:
+    """Parse the sample rate, channels and samples of STREAMINFO.
+
+    After the block and frame sizes, 64 bits hold 20 bits of sample rate,
+    3 bits of channels minus one, 5 bits of bits per sample minus one and
+    36 bits of total samples.
+    """
+    (packed,) = _streaminfo.unpack_from(data)
+    samplerate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    samples = packed & 0xFFFFFFFFF
+    return MediaInfo(
+        samplerate_hz=samplerate,
+        channels=channels,
+        samples=samples,
+        duration_s=samples / samplerate if samplerate else 0.0,
+    )
+
+
+def _parse_vorbis_comment(data: bytes, texts: Dict[str, str]) -> None:
+    """Collect the COMMENT and ARTIST tags of a VORBIS_COMMENT block.
+
+    Lengths in this block are little-endian, unlike the rest of FLAC.
+    """
+    (vendor_length,) = struct.unpack_from("<I", data)
+    offset = 4 + vendor_length
+    (count,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+
+    for _ in range(count):
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        entry = data[offset : offset + length]
+        offset += length
+
+        name, separator, value = entry.partition(b"=")
+        if not separator:
+            continue
+
+        name = name.upper()
+        if name == b"COMMENT":
+            texts.setdefault(
+                "comment",
+                decode_text(value[:MAX_COMMENT_SIZE]),
+            )
+        elif name == b"ARTIST":
+            texts.setdefault(
+                "artist",
+                decode_text(value[:MAX_ARTIST_LENGTH]),
+            )
+
+
+def read_flac_metadata(flac: BinaryIO) -> FlacMetadata:
+    """Read the metadata blocks of a FLAC file.
+
+    The comment preserved in RIFF chunks is preferred to the Vorbis
+    comment tag. Reading stops at the first audio frame, or as soon as the
+    stream information and a preserved comment have been read.
+
+    Parameters
+    ----------
+    flac : BinaryIO
+        Open file object of the FLAC file.
+
+    Returns
+    -------
+    FlacMetadata
+
+    Raises
+    ------
+    ValueError
+        If the file is not a FLAC file or has no STREAMINFO block.
+    """
+    flac.seek(0)
+    if flac.read(4) != FLAC_MAGIC:
+        raise ValueError("Not a FLAC file.")
+
+    media_info = None
+    riff_texts: Dict[str, str] = {}
+    vorbis_texts: Dict[str, str] = {}
+
+    last = False
+    while not last:
+        header = flac.read(4)
+        if len(header) < 4:
+            raise ValueError("FLAC metadata blocks are truncated.")
+
+        (packed,) = _header.unpack(header)
+        last = bool(packed >> 31)
+        block_type = (packed >> 24) & 0x7F
+        length = packed & 0xFFFFFF
+
+        try:
+            if block_type == STREAMINFO:
+                media_info = _parse_streaminfo(flac.read(length))
+            elif block_type == APPLICATION:
+                data = flac.read(length)
+                if data[:4] == b"riff":
+                    riff_texts.update(
+                        read_info_texts(data[4:], _riff_text_sizes)
+                    )
+            elif block_type == VORBIS_COMMENT:
+                _parse_vorbis_comment(flac.read(length), vorbis_texts)
+            else:
+                flac.seek(length, os.SEEK_CUR)  # pylint: disable=no-member
+        except struct.error as error:
+            raise ValueError(
+                f"Metadata block of type {block_type} is truncated."
+            ) from error
+
+        if media_info is not None and "ICMT" in riff_texts:
+            break
+
+    if media_info is None:
+        raise ValueError("No STREAMINFO block found.")
+
+    artist = riff_texts.get("IART", vorbis_texts.get("artist"))
+    return FlacMetadata(
+        media_info=media_info,
+        comment=riff_texts.get("ICMT", vorbis_texts.get("comment")),
+        artist=(
+            None if artist is None else get_audiomoth_id_from_artist(artist)
+        ),
+    )
@@ -0,0 +1,443 @@
+"""Measure where the time goes when parsing recordings.
+
+Pass a :py:class:`Profiler` to :py:func:`metamoth.parse_metadata` or
+:py:func:`metamoth.scan.scan` to record the wall time and the bytes read
+by each stage of the parsing of every file::
+
+    profiler = Profiler()
+    for path in paths:
+        parse_metadata(path, profiler=profiler)
+    print(profiler.format())
+
+The stages are, in order: ``open``, ``parse_into_chunks``,
+``get_media_info``, ``read_comment``, ``read_artist``, ``parse_comment``
+and ``assemble_metadata``. For FLAC files, the four reading stages are
+replaced by ``read_flac_metadata``, see :py:mod:`metamoth.flac`. Per file
+measurements are passed to the profiler ``callback`` as
+:py:class:`FileProfile` objects, and aggregated into one
+:py:class:`Histogram` per stage.
+
+The file is opened with a :py:class:`CountingFileIO`, which counts the
+``read`` and ``seek`` system calls and the bytes actually read from disk,
+below the read buffer. These :py:class:`IOStats` are reported per file and
+summed over all files by the profiler. On network filesystems the number
+of calls, each one a round trip, usually matters more than the bytes.
+
+When no profiler is given, parsing takes a code path without any
+instrumentation, so there is no overhead.
+"""
+
+import io
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from metamoth.parsing import ParserStats
+
+__all__ = [
+    "CountingFileIO",
+    "FLAC_STAGE",
+    "FileProfile",
+    "Histogram",
+    "IOStats",
+    "Profiler",
+    "STAGES",
+    "open_counting",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+STAGES = (
+    "open",
+    "parse_into_chunks",
+    "get_media_info",
+    "read_comment",
+    "read_artist",
+    "parse_comment",
+    "assemble_metadata",
+)
+"""Stages of :py:func:`metamoth.parse_metadata`, in order."""
+
+FLAC_STAGE = "read_flac_metadata"
+"""Stage replacing the reading stages of WAV files for FLAC files."""
+
+PERCENTILES = (50, 90, 99)
+
+
+class Histogram:
+    """Histogram of non-negative values with logarithmic buckets.
+
+    Each power of two is split into ``subbuckets`` buckets, so percentiles
+    are accurate to about ``100 / subbuckets`` percent, with a memory use
+    that does not depend on the number of values.
+
+    Parameters
+    ----------
+    subbuckets : int, optional
+        Number of buckets per power of two.
+    """
+
+    def __init__(self, subbuckets: int = 16):
+        """Initialize an empty histogram."""
+        self.subbuckets = subbuckets
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _bucket(self, value: int) -> int:
+        if value < 1:
+            return -1
+        return int(math.log2(value) * self.subbuckets)
+
+    def _upper_bound(self, bucket: int) -> float:
+        if bucket < 0:
+            return 0
+        return 2 ** ((bucket + 1) / self.subbuckets)
+
+    def add(self, value: int) -> None:
+        """Add a value to the histogram."""
+        bucket = self._bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram") -> None:
+        """Add all the values of another histogram to this one."""
+        if other.subbuckets != self.subbuckets:
+            raise ValueError("Cannot merge histograms with different buckets.")
+
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is None:
+                continue
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of the values."""
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, percentile: float) -> float:
+        """Return an upper bound of the given percentile of the values.
+
+        Parameters
+        ----------
+        percentile : float
+            Between 0 and 100.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = math.ceil(self.count * percentile / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self._upper_bound(bucket), self.max or 0)
+        return float(self.max or 0)
+
+
+@dataclass
+class IOStats:
+    """Counts of the file system operations made while parsing."""
+
+    files_opened: int = 0
+    """Number of files opened."""
+
+    reads: int = 0
+    """Number of ``read`` system calls."""
+
+    seeks: int = 0
+    """Number of ``lseek`` system calls, including position queries."""
+
+    bytes_read: int = 0
+    """Bytes read from the files."""
+
+    def add(self, other: "IOStats") -> None:
+        """Add the counts of another object to this one."""
+        self.files_opened += other.files_opened
+        self.reads += other.reads
+        self.seeks += other.seeks
+        self.bytes_read += other.bytes_read
+
+
+class CountingFileIO(io.FileIO):
+    """Unbuffered binary file that counts its system calls.
+
+    Wrap it in a :py:class:`io.BufferedReader` to count the calls that
+    reach the operating system when reading through the usual buffer, or
+    use :py:func:`open_counting`.
+
+    Parameters
+    ----------
+    path : PathLike
+        Path of the file to open for reading.
+    stats : IOStats
+        Where the operations are counted.
+    """
+
+    def __init__(self, path: PathLike, stats: IOStats):
+        """Open the file and count it as opened."""
+        super().__init__(path, "r")
+        self.stats = stats
+        stats.files_opened += 1
+
+    def readinto(self, buffer) -> Optional[int]:  # type: ignore
+        """Read into a buffer, counting the call and bytes read."""
+        count = super().readinto(buffer)
+        self.stats.reads += 1
+        self.stats.bytes_read += count or 0
+        return count
+
+    def readall(self) -> bytes:
+        """Read until the end of the file, counting the bytes read."""
+        data = super().readall()
+        self.stats.reads += 1
+        self.stats.bytes_read += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Change the position in the file, counting the call."""
+        self.stats.seeks += 1
+        return super().seek(offset, whence)
+
+    def tell(self) -> int:
+        """Return the position in the file, counting the call."""
+        self.stats.seeks += 1
+        return super().tell()
+
+
+def open_counting(path: PathLike, stats: IOStats) -> io.BufferedReader:
+    """Open a file for buffered reading, counting its system calls.
+
+    The buffer has the same size as the one used by :py:func:`open`.
+    """
+    raw = CountingFileIO(path, stats)
+    buffer_size = getattr(raw, "_blksize", 0)
+    if buffer_size <= 1:
+        buffer_size = io.DEFAULT_BUFFER_SIZE
+    return io.BufferedReader(raw, buffer_size)
+
+
+@dataclass
+class FileProfile:
+    """Measurements of the parsing of a single file."""
+
+    path: str
+    """Path of the file."""
+
+    times_ns: Dict[str, int] = field(default_factory=dict)
+    """Wall time of each stage, in nanoseconds."""
+
+    bytes_read: Dict[str, int] = field(default_factory=dict)
+    """Bytes read from the file in each stage."""
+
+    io: IOStats = field(default_factory=IOStats)
+    """File system operations made while parsing the file."""
+
+    parsers: ParserStats = field(default_factory=ParserStats)
+    """Firmware parsers tried on the comment of the file."""
+
+    error: Optional[str] = None
+    """Name of the exception raised while parsing, if any."""
+
+    @property
+    def total_ns(self) -> int:
+        """Return the wall time of all stages, in nanoseconds."""
+        return sum(self.times_ns.values())
+
+    def stage(self, name: str) -> "_Stage":
+        """Return a context manager that times a stage of the parsing.
+
+        The wall time and the bytes read from the file inside the ``with``
+        block are added to those of the stage::
+
+            with profile.stage("parse_comment"):
+                parse_comment(comment)
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage, e.g. one of :py:data:`STAGES`.
+        """
+        return _Stage(self, name)
+
+
+class _Stage:
+    """Context manager that times a stage of a file profile.
+
+    The bytes read from the file during the stage are also recorded, if
+    any.
+    """
+
+    __slots__ = ("profile", "name", "start", "start_bytes")
+
+    def __init__(self, profile: FileProfile, name: str):
+        self.profile = profile
+        self.name = name
+        self.start = 0
+        self.start_bytes = 0
+
+    def __enter__(self) -> "_Stage":
+        self.start_bytes = self.profile.io.bytes_read
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *args) -> None:
+        profile = self.profile
+        name = self.name
+        profile.times_ns[name] = (
+            profile.times_ns.get(name, 0)
+            + time.perf_counter_ns()
+            - self.start
+        )
+
+        count = profile.io.bytes_read - self.start_bytes
+        if count:
+            profile.bytes_read[name] = profile.bytes_read.get(name, 0) + count
+
+
+class Profiler:
+    """Aggregate the per stage measurements of many files.
+
+    The profiler can be shared between threads.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with the :py:class:`FileProfile` of each parsed file.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[FileProfile], None]] = None,
+    ):
+        """Initialize an empty profiler."""
+        self.callback = callback
+        self.files = 0
+        self.errors = 0
+        self.times_ns: Dict[str, Histogram] = {}
+        self.bytes_read: Dict[str, Histogram] = {}
+        self.io = IOStats()
+        self.io_per_file: Dict[str, Histogram] = {}
+        self.parsers = ParserStats()
+        self._lock = threading.Lock()
+
+    def record(self, profile: FileProfile) -> None:
+        """Add the measurements of a file."""
+        with self._lock:
+            self.files += 1
+            if profile.error is not None:
+                self.errors += 1
+            _add_all(self.times_ns, profile.times_ns)
+            _add_all(self.times_ns, {"total": profile.total_ns})
+            _add_all(self.bytes_read, profile.bytes_read)
+            self.io.add(profile.io)
+            self.parsers.merge(profile.parsers)
+            _add_all(
+                self.io_per_file,
+                {
+                    "reads": profile.io.reads,
+                    "seeks": profile.io.seeks,
+                    "bytes_read": profile.io.bytes_read,
+                },
+            )
+
+        if self.callback is not None:
+            self.callback(profile)
+
+    def record_all(self, profiles: Iterable[FileProfile]) -> None:
+        """Add the measurements of several files."""
+        for profile in profiles:
+            self.record(profile)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return statistics of each stage.
+
+        Returns
+        -------
+        dict
+            For each stage, the number of files, the mean and percentiles
+            of the wall time in microseconds and the mean bytes read.
+        """
+        summary = {}
+        for name in _ordered(self.times_ns):
+            times = self.times_ns[name]
+            stats = {
+                "count": times.count,
+                "mean_us": times.mean / 1000,
+                **{
+                    f"p{percentile}_us": times.percentile(percentile) / 1000
+                    for percentile in PERCENTILES
+                },
+                "max_us": (times.max or 0) / 1000,
+            }
+            if name in self.bytes_read:
+                stats["mean_bytes"] = self.bytes_read[name].mean
+            summary[name] = stats
+        return summary
+
+    def format(self) -> str:
+        """Return the summary as a text table."""
+        lines = [
+            f"{'stage':<18} {'files':>8} {'mean':>9} {'p50':>9} "
+            f"{'p90':>9} {'p99':>9} {'bytes':>8}"
+        ]
+        for name, stats in self.summary().items():
+            mean_bytes = stats.get("mean_bytes")
+            lines.append(
+                f"{name:<18} {stats['count']:>8d} "
+                f"{stats['mean_us']:>7.1f}us {stats['p50_us']:>7.1f}us "
+                f"{stats['p90_us']:>7.1f}us {stats['p99_us']:>7.1f}us "
+                + ("       -" if mean_bytes is None else f"{mean_bytes:>8.0f}")
+            )
+
+        if self.files:
+            lines.append(
+                f"I/O per file: {self.io.reads / self.files:.1f} reads, "
+                f"{self.io.seeks / self.files:.1f} seeks, "
+                f"{self.io.bytes_read / self.files:.0f} bytes "
+                f"({self.io.files_opened} files opened)"
+            )
+
+        if self.parsers.comments:
+            matches = ", ".join(
+                f"{version}: {count}"
+                for version, count in sorted(self.parsers.matches.items())
+            )
+            lines.append(
+                "Firmware parsers per comment: "
+                f"{self.parsers.mean_attempts:.2f} ({matches})"
+            )
+        return "\n".join(lines)
+
+
+def _add_all(histograms: Dict[str, Histogram], values: Dict[str, int]):
+    for name, value in values.items():
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram()
+        histogram.add(value)
+
+
+def _ordered(names: Iterable[str]) -> List[str]:
+    stages = STAGES[:1] + (FLAC_STAGE,) + STAGES[1:] + ("total",)
+    order = {name: index for index, name in enumerate(stages)}
+    return sorted(names, key=lambda name: order.get(name, len(order)))
@@ -12,7 +12,9 @@ from metamoth.chunks import Chunk
 
 __all__ = [
     "MediaInfo",
+    "build_media_info",
     "get_media_info",
+    "unpack_samplerate_and_channels",
 ]
 
 
@@ -53,12 +55,64 @@ def read_samplerate_and_channels(
     channels: int
     """
     wav.seek(fmt_chunk.position + 8)
-    wav.read(2)  # audio format
-    channels = int.from_bytes(wav.read(2), "little")
-    samplerate = int.from_bytes(wav.read(4), "little")
+    return unpack_samplerate_and_channels(wav.read(8))
+
+
+def unpack_samplerate_and_channels(fmt: bytes) -> Tuple[int, int]:
+    """Return the sample rate and channels from the fmt chunk data.
+
+    Parameters
+    ----------
+    fmt : bytes
+        At least the first 8 bytes of the fmt chunk data.
+
+    Returns
+    -------
+    samplerate : int
+    channels: int
+
+    Raises
+    ------
+    ValueError
+        If the data is too short.
+    """
+    if len(fmt) < 8:
+        raise ValueError("The fmt chunk is truncated.")
+
+    # The audio format comes first.
+    channels = int.from_bytes(fmt[2:4], "little")
+    samplerate = int.from_bytes(fmt[4:8], "little")
     return samplerate, channels
 
 
+def build_media_info(
+    samplerate: int,
+    channels: int,
+    data_size: int,
+) -> MediaInfo:
+    """Return the media information of 16 bits PCM audio.
+
+    Parameters
+    ----------
+    samplerate : int
+    channels : int
+    data_size : int
+        Size of the data chunk, in bytes.
+
+    Returns
+    -------
+    MediaInfo
+    """
+    samples = data_size // (channels * 2)
+    duration = samples / samplerate
+    return MediaInfo(
+        samplerate_hz=samplerate,
+        channels=channels,
+        samples=samples,
+        duration_s=duration,
+    )
+
+
 def get_media_info(wav: BinaryIO, chunk: Chunk) -> MediaInfo:
     """Return the media information from the WAV file.
 
@@ -78,11 +132,4 @@ def get_media_info(wav: BinaryIO, chunk: Chunk) -> MediaInfo:
     fmt_chunk = chunk.subchunks["fmt "]
     data_chunk = chunk.subchunks["data"]
     samplerate, channels = read_samplerate_and_channels(wav, fmt_chunk)
-    samples = data_chunk.size // (channels * 2)
-    duration = samples / samplerate
-    return MediaInfo(
-        samplerate_hz=samplerate,
-        channels=channels,
-        samples=samples,
-        duration_s=duration,
-    )
+    return build_media_info(samplerate, channels, data_chunk.size)
@@ -5,10 +5,10 @@ firmware versions.
 """
 
 # pylint: disable=too-many-instance-attributes
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime as dt
 from datetime import timezone as tz
-from typing import Optional
+from typing import Any, Optional
 
 from metamoth.enums import FilterType, GainSetting, RecordingState
 from metamoth.mediainfo import MediaInfo
@@ -211,7 +211,7 @@ class CommentMetadataV6(CommentMetadata):
     frequency_filter: Optional[FrequencyFilter] = None
     """Frequency filter applied to the recording."""
 
-    deployment_id: Optional[int] = None
+    deployment_id: Optional[str] = None
     """Deployment ID of the AudioMoth."""
 
     external_microphone: bool = False
@@ -239,6 +239,16 @@ class ExtraMetadata:
 class AMMetadata(CommentMetadataV6, MediaInfo, ExtraMetadata):
     """AudioMoth recording metadata."""
 
+    config: Optional[Any] = field(
+        default=None,
+        compare=False,
+        repr=False,
+        metadata={"serialize": False},
+    )
+    """Configuration read from the CONFIG.TXT file of the card, see
+    :py:mod:`metamoth.configtxt`. Set by :py:func:`metamoth.scan.scan` and
+    shared by all the recordings of the card. It is not serialized."""
+
 
 def assemble_metadata(
     path: str,
@@ -1,16 +1,24 @@
 """Main module."""
 
+import io
 import os
-from typing import Union
+from typing import TYPE_CHECKING, BinaryIO, Optional, Tuple, Union
 
 from metamoth.artist import get_am_artist
 from metamoth.chunks import parse_into_chunks
 from metamoth.comments import get_am_comment
-from metamoth.mediainfo import get_media_info
+from metamoth.flac import FLAC_MAGIC, read_flac_metadata
+from metamoth.mediainfo import MediaInfo, get_media_info
 from metamoth.metadata import AMMetadata, assemble_metadata
-from metamoth.parsing import parse_comment
+from metamoth.parsing import CommentParser, parse_comment
+from metamoth.ranges import RangeFile, RangeReader
+
+if TYPE_CHECKING:
+    from metamoth.blockcache import BlockCache
+    from metamoth.instrumentation import Profiler
 
 __all__ = [
+    "parse_header",
     "parse_metadata",
 ]
 
@@ -18,12 +26,35 @@ __all__ = [
 PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
 
 
-def parse_metadata(path: PathLike) -> AMMetadata:
+def parse_metadata(
+    path: Union[PathLike, RangeReader],
+    profiler: Optional["Profiler"] = None,
+    comment_parser: Optional[CommentParser] = None,
+    block_cache: Optional["BlockCache"] = None,
+) -> AMMetadata:
     """Parse the metadata from an AudioMoth recording.
 
     Parameters
     ----------
-    path : PathLike
+    path : PathLike or RangeReader
+        Path to a WAV file, or to a FLAC file converted from one. Only the
+        metadata blocks of FLAC files are read, see :py:mod:`metamoth.flac`.
+        Recordings in remote storage are read with a
+        :py:class:`metamoth.ranges.RangeReader`, usually in a single range
+        request.
+    profiler : Profiler, optional
+        If given, the wall time, bytes read and system calls of each stage
+        of the parsing are recorded in the profiler. See
+        :py:mod:`metamoth.instrumentation`.
+    comment_parser : CommentParser, optional
+        Parser of the comment string. When parsing many files, reuse a
+        :py:class:`metamoth.parsing.CommentParser` to try the most common
+        firmware formats first. Defaults to
+        :py:func:`metamoth.parsing.parse_comment`.
+    block_cache : BlockCache, optional
+        If given, the file is read in blocks kept in the cache, which then
+        serves the small reads of the parsers. Use it on high-latency
+        storage. See :py:mod:`metamoth.blockcache`.
 
     Returns
     -------
@@ -31,11 +62,174 @@ def parse_metadata(path: PathLike) -> AMMetadata:
         Parse metadata from the recording at `path`. The metadata is
         returned as a :py:class:`AMMetadata` object.
     """
-    with open(path, "rb") as wav:
-        riff = parse_into_chunks(wav)
-        media_info = get_media_info(wav, riff)
-        comment = get_am_comment(wav, riff)
-        artist = get_am_artist(wav, riff)
-
-    am_metadata = parse_comment(comment)
-    return assemble_metadata(str(path), media_info, am_metadata, artist)
+    if profiler is not None:
+        return _parse_metadata_profiled(
+            path,
+            profiler,
+            comment_parser,
+            block_cache,
+        )
+
+    with _open(path, block_cache) as wav:
+        media_info, comment, artist = _read(wav)
+
+    if comment_parser is None:
+        am_metadata = parse_comment(comment)
+    else:
+        am_metadata = comment_parser.parse(comment)
+    return assemble_metadata(_name(path), media_info, am_metadata, artist)
+
+
+def _open(
+    path: Union[PathLike, RangeReader],
+    block_cache: Optional["BlockCache"] = None,
+) -> BinaryIO:
+    if block_cache is None:
+        if isinstance(path, RangeReader):
+            return RangeFile(path)  # type: ignore
+        return open(path, "rb")
+
+    # pylint: disable=import-outside-toplevel
+    from metamoth.blockcache import CachedFile
+
+    if isinstance(path, RangeReader):
+        # The cache fetches whole blocks, so the file does not prefetch.
+        raw = RangeFile(path, prefetch=0)
+    else:
+        raw = open(path, "rb", buffering=0)  # type: ignore
+    return CachedFile(raw, block_cache)  # type: ignore
+
+
+def _name(path: Union[PathLike, RangeReader]) -> str:
+    if isinstance(path, RangeReader):
+        return path.name
+    return str(path)
+
+
+def parse_header(
+    data: bytes,
+    path: str,
+    comment_parser: Optional[CommentParser] = None,
+) -> AMMetadata:
+    """Parse the metadata from the first bytes of an AudioMoth recording.
+
+    Used when the recording is not a file on disk, e.g. a member of an
+    archive. The audio data is not needed: the duration is computed from
+    the size of the data chunk.
+
+    Parameters
+    ----------
+    data : bytes
+        The first bytes of the recording, up to the header of the data
+        chunk at least.
+    path : str
+        Path reported in the metadata.
+    comment_parser : CommentParser, optional
+        Parser of the comment string, see :py:func:`parse_metadata`.
+
+    Returns
+    -------
+    AMMetadata
+    """
+    media_info, comment, artist = _read(io.BytesIO(data))
+
+    if comment_parser is None:
+        am_metadata = parse_comment(comment)
+    else:
+        am_metadata = comment_parser.parse(comment)
+    return assemble_metadata(path, media_info, am_metadata, artist)
+
+
+def _read(wav: BinaryIO) -> Tuple[MediaInfo, str, Optional[str]]:
+    """Read the media information, comment and artist of a recording."""
+    if wav.read(4) == FLAC_MAGIC:
+        return _read_flac(wav)
+
+    riff = parse_into_chunks(wav)
+    media_info = get_media_info(wav, riff)
+    comment = get_am_comment(wav, riff)
+    artist = get_am_artist(wav, riff)
+    return media_info, comment, artist
+
+
+def _read_flac(
+    flac: BinaryIO,
+) -> Tuple[MediaInfo, str, Optional[str]]:
+    """Read the media information, comment and artist of a FLAC file."""
+    metadata = read_flac_metadata(flac)
+    if metadata.comment is None:
+        raise ValueError("No comment found in the FLAC metadata.")
+    return metadata.media_info, metadata.comment, metadata.artist
+
+
+def _parse_metadata_profiled(
+    path: Union[PathLike, RangeReader],
+    profiler: "Profiler",
+    comment_parser: Optional[CommentParser] = None,
+    block_cache: Optional["BlockCache"] = None,
+) -> AMMetadata:
+    """Parse the metadata, timing each stage."""
+    # pylint: disable=import-outside-toplevel
+    from metamoth.instrumentation import (
+        FLAC_STAGE,
+        CountingFileIO,
+        FileProfile,
+        open_counting,
+    )
+
+    profile = FileProfile(path=_name(path))
+    try:
+        with profile.stage("open"):
+            # The I/O of range readers is counted by the readers.
+            if isinstance(path, RangeReader):
+                wav = _open(path, block_cache)
+            elif block_cache is not None:
+                from metamoth.blockcache import CachedFile
+
+                wav = CachedFile(
+                    CountingFileIO(path, profile.io),  # type: ignore
+                    block_cache,
+                )
+            else:
+                wav = open_counting(path, profile.io)
+            # The first read of the file, which fills the read buffer.
+            is_flac = wav.read(4) == FLAC_MAGIC
+
+        with wav:
+            if is_flac:
+                with profile.stage(FLAC_STAGE):
+                    media_info, comment, artist = _read_flac(wav)
+            else:
+                with profile.stage("parse_into_chunks"):
+                    riff = parse_into_chunks(wav)
+
+                with profile.stage("get_media_info"):
+                    media_info = get_media_info(wav, riff)
+
+                with profile.stage("read_comment"):
+                    comment = get_am_comment(wav, riff)
+
+                with profile.stage("read_artist"):
+                    artist = get_am_artist(wav, riff)
+
+        with profile.stage("parse_comment"):
+            if comment_parser is None:
+                am_metadata = parse_comment(comment, stats=profile.parsers)
+            else:
+                am_metadata = comment_parser.parse(
+                    comment,
+                    stats=profile.parsers,
+                )
+
+        with profile.stage("assemble_metadata"):
+            return assemble_metadata(
+                _name(path),
+                media_info,
+                am_metadata,
+                artist,
+            )
+    except Exception as error:
+        profile.error = type(error).__name__
+        raise
+    finally:
+        profiler.record(profile)
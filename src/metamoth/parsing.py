@@ -1,11 +1,12 @@
 """Functions for parsing the comment string of AudioMoth recordings."""
 
 import re
-from dataclasses import asdict
+from dataclasses import dataclass, field
 from datetime import datetime as dt
 from datetime import timedelta as td
 from datetime import timezone as tz
-from typing import Callable, Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Match, Optional, Tuple, TypeVar
 
 from metamoth.enums import FilterType, GainSetting, RecordingState
 from metamoth.metadata import (
@@ -20,124 +21,187 @@ from metamoth.metadata import (
 
 DATE_FORMAT = "%H:%M:%S %d/%m/%Y"
 
+COMMENT_PREFIX = "Recorded at "
+"""Start of the comments of all firmware versions."""
+
+MAX_COMMENT_LENGTH = 1024
+"""Maximum length of a comment.
+
+The AudioMoth firmware writes the comment into a 384 bytes chunk, so longer
+comments come from corrupted or foreign files and are rejected before any
+regular expression is tried. This bounds the work spent on every file.
+"""
+
+MAX_COMMENT_SIZE = 4 * (MAX_COMMENT_LENGTH + 1)
+"""Maximum number of bytes read from a comment.
+
+A UTF-8 character takes at most 4 bytes, so a comment longer than
+:py:data:`MAX_COMMENT_LENGTH` characters is still longer once truncated to
+this size, and is rejected by the parser.
+"""
+
 MAX_AMPLITUDE = 32768
 
+TEMPLATE_CACHE_SIZE = 256
+"""Number of configurations remembered by the field parsers.
+
+Every comment of a deployment has the same amplitude threshold and
+frequency filter, so the values parsed from the most recent groups captured
+for them are cached and each repeated configuration costs a dictionary
+lookup.
+"""
+
+TIMEZONE_CACHE_SIZE = 256
+"""Number of parsed timezones remembered.
+
+All the comments of a deployment have the same timezone, so parsing it
+usually costs a dictionary lookup.
+"""
+
 
 class MessageFormatError(Exception):
     """Exception raised when the message format is not correct."""
 
 
-COMMENT_REGEX_1_0 = re.compile(
-    r"Recorded at (\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) by "
-    r"AudioMoth ([0-9A-z]{16}) at gain setting (\d) while battery "
-    r"state was ([<>]?\s?[0-9\.]*)V"
+T = TypeVar("T")
+
+
+class _LazyPattern:
+    """Regular expression compiled when first used.
+
+    Compiling the grammars of all the firmware versions is a large part of
+    the import time of this module, and a program usually sees only a few
+    versions. Attributes of the compiled pattern are cached on first
+    access, so matching costs the same as with the compiled pattern.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(re.compile(self.pattern), name)
+        setattr(self, name, value)
+        return value
+
+
+def _check_match(metadata: Optional[T]) -> T:
+    """Raise an error if a firmware parser did not match the comment."""
+    if metadata is None:
+        raise MessageFormatError(
+            "Comment string does not match expected format."
+        )
+    return metadata
+
+
+COMMENT_REGEX_1_0 = _LazyPattern(
+    r"Recorded at (?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) by "
+    r"AudioMoth (?P<audiomoth_id>[0-9A-z]{16}) "
+    r"at gain setting (?P<gain>\d) while battery "
+    r"state was (?P<battery_state>[<>]?\s?[0-9\.]*)V"
 )
 
 
-def parse_comment_version_1_0(
+def _parse_comment_version_1_0(
     comment: str,
-) -> CommentMetadataV1:
+) -> Optional[CommentMetadataV1]:
     """Parse the comment string of 1.0 firmware.
 
-    Parameters
-    ----------
-    comment : str
-        The comment string.
-
-    Returns
-    -------
-    metadata : dict
-
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_0.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
 
     low_battery = False
-    if match.group(4).startswith("<"):
+    if match.group("battery_state").startswith("<"):
         low_battery = True
         battery_state_volts = 3.6
 
-    elif match.group(4).startswith(">"):
+    elif match.group("battery_state").startswith(">"):
         battery_state_volts = 5.0
 
     else:
-        battery_state_volts = float(match.group(4))
+        battery_state_volts = float(match.group("battery_state"))
 
     return CommentMetadataV1(
-        datetime=dt.strptime(match.group(1), DATE_FORMAT),
+        datetime=dt.strptime(match.group("datetime"), DATE_FORMAT),
         timezone=tz(td(0)),
-        audiomoth_id=match.group(2),
-        gain=GainSetting(int(match.group(3))),
+        audiomoth_id=match.group("audiomoth_id"),
+        gain=GainSetting(int(match.group("gain"))),
         comment=comment,
         low_battery=low_battery,
         battery_state_v=battery_state_volts,
     )
 
 
-COMMENT_REGEX_1_0_1 = re.compile(
-    r"Recorded at (\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) \(UTC\) by "
-    r"AudioMoth ([0-9A-z]{16}) at gain setting (\d) while battery "
-    r"state was ([<>]?\s?[0-9\.]*)V"
-)
-
-
-def parse_comment_version_1_0_1(comment: str) -> CommentMetadataV1:
-    """Parse the comment string of 1.0.1 firmware.
-
-    Also valid for version 1.1.0.
+def parse_comment_version_1_0(
+    comment: str,
+) -> CommentMetadataV1:
+    """Parse the comment string of 1.0 firmware.
 
     Parameters
     ----------
     comment : str
+        The comment string.
 
     Returns
     -------
-    metadata: CommentMetadataV1
+    metadata : dict
+
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_0(comment))
+
+
+COMMENT_REGEX_1_0_1 = _LazyPattern(
+    r"Recorded at "
+    r"(?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) \(UTC\) by "
+    r"AudioMoth (?P<audiomoth_id>[0-9A-z]{16}) "
+    r"at gain setting (?P<gain>\d) while battery "
+    r"state was (?P<battery_state>[<>]?\s?[0-9\.]*)V"
+)
+
 
+def _parse_comment_version_1_0_1(comment: str) -> Optional[CommentMetadataV1]:
+    """Parse the comment string of 1.0.1 firmware.
+
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_0_1.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
 
     low_battery = False
-    if match.group(4).startswith("<"):
+    if match.group("battery_state").startswith("<"):
         low_battery = True
         battery_state_volts = 3.6
 
-    elif match.group(4).startswith(">"):
+    elif match.group("battery_state").startswith(">"):
         battery_state_volts = 5.0
 
     else:
-        battery_state_volts = float(match.group(4))
+        battery_state_volts = float(match.group("battery_state"))
 
     return CommentMetadataV1(
-        datetime=dt.strptime(match.group(1), DATE_FORMAT),
+        datetime=dt.strptime(match.group("datetime"), DATE_FORMAT),
         timezone=tz(td(0)),
-        audiomoth_id=match.group(2),
-        gain=GainSetting(int(match.group(3))),
+        audiomoth_id=match.group("audiomoth_id"),
+        gain=GainSetting(int(match.group("gain"))),
         comment=comment,
         low_battery=low_battery,
         battery_state_v=battery_state_volts,
     )
 
 
-COMMENT_REGEX_1_2_0 = re.compile(
-    r"Recorded at (\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "
-    r"\(UTC([\+\-]?\d{0,2})\) by "  # timezone
-    r"AudioMoth ([0-9A-z]{16}) at gain setting (\d) while battery "
-    r"state was ([<>]?\s?[0-9\.]*)V."
-)
-
+def parse_comment_version_1_0_1(comment: str) -> CommentMetadataV1:
+    """Parse the comment string of 1.0.1 firmware.
 
-def parse_comment_version_1_2_0(comment: str) -> CommentMetadataV1:
-    """Parse the comment string of 1.2.0 firmware.
+    Also valid for version 1.1.0.
 
     Parameters
     ----------
@@ -147,54 +211,61 @@ def parse_comment_version_1_2_0(comment: str) -> CommentMetadataV1:
     -------
     metadata: CommentMetadataV1
 
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_0_1(comment))
+
+
+COMMENT_REGEX_1_2_0 = _LazyPattern(
+    r"Recorded at (?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "
+    r"\(UTC(?P<timezone>[\+\-]?\d{0,2})\) by "
+    r"AudioMoth (?P<audiomoth_id>[0-9A-z]{16}) "
+    r"at gain setting (?P<gain>\d) while battery "
+    r"state was (?P<battery_state>[<>]?\s?[0-9\.]*)V."
+)
+
+
+def _parse_comment_version_1_2_0(comment: str) -> Optional[CommentMetadataV1]:
+    """Parse the comment string of 1.2.0 firmware.
+
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_2_0.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
 
     low_battery = False
-    if match.group(5).startswith("<"):
+    if match.group("battery_state").startswith("<"):
         low_battery = True
         battery_state_volts = 3.6
 
-    elif match.group(5).startswith(">"):
+    elif match.group("battery_state").startswith(">"):
         battery_state_volts = 5.0
 
     else:
-        battery_state_volts = float(match.group(5))
+        battery_state_volts = float(match.group("battery_state"))
 
     utc_offset = 0
-    if match.group(2) != "":
-        utc_offset = int(match.group(2))
+    if match.group("timezone") != "":
+        utc_offset = int(match.group("timezone"))
 
     return CommentMetadataV1(
-        datetime=dt.strptime(match.group(1), DATE_FORMAT),
+        datetime=dt.strptime(match.group("datetime"), DATE_FORMAT),
         timezone=tz(td(hours=utc_offset)),
-        audiomoth_id=match.group(3),
-        gain=GainSetting(int(match.group(4))),
+        audiomoth_id=match.group("audiomoth_id"),
+        gain=GainSetting(int(match.group("gain"))),
         comment=comment,
         low_battery=low_battery,
         battery_state_v=battery_state_volts,
     )
 
 
-COMMENT_REGEX_1_2_1 = re.compile(
-    r"Recorded at "
-    r"(\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "  # date time
-    r"\(UTC([\+\-]?\d{0,2})\) by "  # timezone
-    r"AudioMoth ([0-9A-z]{16}) "  # audiomoth id
-    r"at gain setting (\d) while battery state was "  # gain setting
-    r"(less than 3\.6|greater than 4\.9|\d\.\d)V"  # battery state
-    r"(\. Recording cancelled before completion due to "
-    r"(low battery voltage|change of switch position)\.|\.)"
-)
-
-
-def parse_comment_version_1_2_1(comment: str) -> CommentMetadataV2:
-    """Parse the comment string of 1.2.1 firmware.
+def parse_comment_version_1_2_0(comment: str) -> CommentMetadataV1:
+    """Parse the comment string of 1.2.0 firmware.
 
     Parameters
     ----------
@@ -202,40 +273,63 @@ def parse_comment_version_1_2_1(comment: str) -> CommentMetadataV2:
 
     Returns
     -------
-    metadata: CommentMetadataV2
+    metadata: CommentMetadataV1
+
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_2_0(comment))
+
+
+COMMENT_REGEX_1_2_1 = _LazyPattern(
+    r"Recorded at "
+    r"(?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "
+    r"\(UTC(?P<timezone>[\+\-]?\d{0,2})\) by "
+    r"AudioMoth (?P<audiomoth_id>[0-9A-z]{16}) "
+    r"at gain setting (?P<gain>\d) while battery state was "
+    r"(?P<battery_state>less than 3\.6|greater than 4\.9|\d\.\d)V"
+    r"(?:\. Recording cancelled before completion due to "
+    r"(?P<recording_state>low battery voltage"
+    r"|change of switch position)\.|\.)"
+)
+
 
+def _parse_comment_version_1_2_1(comment: str) -> Optional[CommentMetadataV2]:
+    """Parse the comment string of 1.2.1 firmware.
+
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_2_1.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
 
-    datetime = dt.strptime(match.group(1), DATE_FORMAT)
+    datetime = dt.strptime(match.group("datetime"), DATE_FORMAT)
 
-    if match.group(2) == "":
+    if match.group("timezone") == "":
         timezone = tz(td(0))
     else:
-        timezone = tz(td(hours=int(match.group(2))))
+        timezone = tz(td(hours=int(match.group("timezone"))))
 
-    audiomoth_id = match.group(3)
+    audiomoth_id = match.group("audiomoth_id")
 
-    gain = GainSetting(int(match.group(4)))
+    gain = GainSetting(int(match.group("gain")))
 
     low_battery = False
-    if match.group(5) == "less than 3.6":
+    if match.group("battery_state") == "less than 3.6":
         low_battery = True
         battery_state_volts = 3.6
-    elif match.group(5) == "greater than 4.9":
+    elif match.group("battery_state") == "greater than 4.9":
         battery_state_volts = 5.0
     else:
-        battery_state_volts = float(match.group(5))
+        battery_state_volts = float(match.group("battery_state"))
 
     recording_state = RecordingState.RECORDING_OKAY
-    if match.group(7) == "low battery voltage":
+    if match.group("recording_state") == "low battery voltage":
         recording_state = RecordingState.SUPPLY_VOLTAGE_LOW
-    elif match.group(7) == "change of switch position":
+    elif match.group("recording_state") == "change of switch position":
         recording_state = RecordingState.SWITCH_CHANGED
 
     return CommentMetadataV2(
@@ -250,22 +344,8 @@ def parse_comment_version_1_2_1(comment: str) -> CommentMetadataV2:
     )
 
 
-COMMENT_REGEX_1_2_2 = re.compile(
-    r"Recorded at "
-    r"(\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "  # date time
-    r"\(UTC([\+\-]?\d{0,2}:?\d{0,2})\) by "  # timezone
-    r"AudioMoth ([0-9A-z]{16}) "  # audiomoth id
-    r"at gain setting (\d) while battery state was "  # gain setting
-    r"(less than 3\.6|greater than 4\.9|\d\.\d)V"  # battery state
-    r"(\. Recording cancelled before completion due to "
-    r"(low battery voltage|change of switch position)\.|\.)"
-)
-
-
-def parse_comment_version_1_2_2(comment: str) -> CommentMetadataV2:
-    """Parse the comment string of 1.2.2 firmware.
-
-    Also valid for version 1.3.0.
+def parse_comment_version_1_2_1(comment: str) -> CommentMetadataV2:
+    """Parse the comment string of 1.2.1 firmware.
 
     Parameters
     ----------
@@ -275,41 +355,64 @@ def parse_comment_version_1_2_2(comment: str) -> CommentMetadataV2:
     -------
     metadata: CommentMetadataV2
 
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_2_1(comment))
+
+
+COMMENT_REGEX_1_2_2 = _LazyPattern(
+    r"Recorded at "
+    r"(?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "
+    r"\(UTC(?P<timezone>[\+\-]?\d{0,2}:?\d{0,2})\) by "
+    r"AudioMoth (?P<audiomoth_id>[0-9A-z]{16}) "
+    r"at gain setting (?P<gain>\d) while battery state was "
+    r"(?P<battery_state>less than 3\.6|greater than 4\.9|\d\.\d)V"
+    r"(?:\. Recording cancelled before completion due to "
+    r"(?P<recording_state>low battery voltage"
+    r"|change of switch position)\.|\.)"
+)
+
+
+def _parse_comment_version_1_2_2(comment: str) -> Optional[CommentMetadataV2]:
+    """Parse the comment string of 1.2.2 firmware.
+
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_2_2.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
 
-    datetime = dt.strptime(match.group(1), DATE_FORMAT)
+    datetime = dt.strptime(match.group("datetime"), DATE_FORMAT)
 
-    if match.group(2) == "":
+    if match.group("timezone") == "":
         timezone = tz(td(0))
-    elif ":" not in match.group(2):
-        timezone = tz(td(hours=int(match.group(2))))
+    elif ":" not in match.group("timezone"):
+        timezone = tz(td(hours=int(match.group("timezone"))))
     else:
-        hours, minutes = match.group(2).split(":")
+        hours, minutes = match.group("timezone").split(":")
         timezone = tz(td(hours=int(hours), minutes=int(minutes)))
 
-    audiomoth_id = match.group(3)
+    audiomoth_id = match.group("audiomoth_id")
 
-    gain = GainSetting(int(match.group(4)))
+    gain = GainSetting(int(match.group("gain")))
 
     low_battery = False
-    if match.group(5) == "less than 3.6":
+    if match.group("battery_state") == "less than 3.6":
         low_battery = True
         battery_state_volts = 3.6
-    elif match.group(5) == "greater than 4.9":
+    elif match.group("battery_state") == "greater than 4.9":
         battery_state_volts = 5.0
     else:
-        battery_state_volts = float(match.group(5))
+        battery_state_volts = float(match.group("battery_state"))
 
     recording_state = RecordingState.RECORDING_OKAY
-    if match.group(7) == "low battery voltage":
+    if match.group("recording_state") == "low battery voltage":
         recording_state = RecordingState.SUPPLY_VOLTAGE_LOW
-    elif match.group(7) == "change of switch position":
+    elif match.group("recording_state") == "change of switch position":
         recording_state = RecordingState.SWITCH_CHANGED
 
     return CommentMetadataV2(
@@ -324,22 +427,46 @@ def parse_comment_version_1_2_2(comment: str) -> CommentMetadataV2:
     )
 
 
-COMMENT_REGEX_1_4_0 = re.compile(
+def parse_comment_version_1_2_2(comment: str) -> CommentMetadataV2:
+    """Parse the comment string of 1.2.2 firmware.
+
+    Also valid for version 1.3.0.
+
+    Parameters
+    ----------
+    comment : str
+
+    Returns
+    -------
+    metadata: CommentMetadataV2
+
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_2_2(comment))
+
+
+COMMENT_REGEX_1_4_0 = _LazyPattern(
     r"Recorded at "
-    r"(\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "  # date time
-    r"\(UTC([\+\-]?\d{0,2}:?\d{0,2})\) by "  # timezone
-    r"AudioMoth ([0-9A-z]{16}) "  # audiomoth id
-    r"at (low|low-medium|medium|medium-high|high) gain setting "  # gain
+    r"(?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "
+    r"\(UTC(?P<timezone>[\+\-]?\d{0,2}:?\d{0,2})\) by "
+    r"AudioMoth (?P<audiomoth_id>[0-9A-z]{16}) "
+    r"at (?P<gain>low|low-medium|medium|medium-high|high) gain setting "
     "while battery state was "
-    r"(less than 2\.5|greater than 4\.9|\d\.\d)V "  # battery state
-    r"and temperature was (-?\d{1,2}\.\d)C."  # temperature
-    r"( Amplitude threshold was \d{1,4}\.)?"  # threshold
-    r"( Band-pass filter applied with cut-off frequencies of \d{1,4}"
-    r"\.\dkHz and \d{1,4}\.\dkHz\.| Low-pass filter applied with cut-off "
-    r"frequency of \d{1,4}\.\dkHz\.|"
-    r" High-pass filter applied with cut-off frequency of \d{1,4}\.\dkHz\.)?"
-    r"( Recording cancelled before completion due to "
-    r"(low voltage|change of switch position)\.)?"
+    r"(?P<battery_state>less than 2\.5|greater than 4\.9|\d\.\d)V "
+    r"and temperature was (?P<temperature>-?\d{1,2}\.\d)C."
+    r"(?: Amplitude threshold was (?P<threshold>\d{1,4})\.)?"
+    r"(?: Band-pass filter applied with cut-off frequencies of "
+    r"(?P<band_pass_low>\d{1,4}\.\d)kHz and "
+    r"(?P<band_pass_high>\d{1,4}\.\d)kHz\."
+    r"| Low-pass filter applied with cut-off frequency of "
+    r"(?P<low_pass>\d{1,4}\.\d)kHz\."
+    r"| High-pass filter applied with cut-off frequency of "
+    r"(?P<high_pass>\d{1,4}\.\d)kHz\.)?"
+    r"(?: Recording cancelled before completion due to "
+    r"(?P<recording_state>low voltage|change of switch position)\.)?"
 )
 
 
@@ -352,87 +479,73 @@ _gain_mapping = {
 }
 
 
-AMPLITUDE_REGEX = re.compile(r" Amplitude threshold was (\d{1,4})\.")
-
-
 def _parse_amplitude_threshold_1_4_0(
-    comment: Optional[str],
+    threshold: Optional[str],
 ) -> AmplitudeThreshold:
-    """Parse the amplitude threshold from the comment string."""
-    if comment is None:
+    """Parse the amplitude threshold captured from the comment string."""
+    if threshold is None:
         return AmplitudeThreshold(enabled=False, threshold=0)
+    return AmplitudeThreshold(enabled=True, threshold=int(threshold))
 
-    match = AMPLITUDE_REGEX.fullmatch(comment)
-
-    if match is None:
-        raise MessageFormatError(f"Unexpected amplitude threshold: {comment}")
-    return AmplitudeThreshold(enabled=True, threshold=int(match.group(1)))
 
+def _khz_to_hz(frequency: str) -> int:
+    """Convert a frequency written in kHz, e.g. ``12.5``, to Hz."""
+    return int(float(frequency) * 1000)
 
-def _parse_frequency_filter_1_4_0(comment: Optional[str]) -> FrequencyFilter:
-    """Parse the frequency filter from the comment string."""
-    if comment is None:
-        return FrequencyFilter(
-            type=FilterType.NO_FILTER,
-            lower_frequency_hz=None,
-            higher_frequency_hz=None,
-        )
 
-    if "Band-pass filter applied" in comment:
-        match = re.match(
-            r" Band-pass filter applied with cut-off frequencies of "
-            r"(\d{1,4}\.\d)kHz and (\d{1,4}\.\d)kHz\.",
-            comment,
-        )
+def _parse_frequency_filter(match: Match[str]) -> FrequencyFilter:
+    """Parse the frequency filter captured from the comment string.
 
-        if match is None:
-            raise MessageFormatError(f"Unexpected frequency filter: {comment}")
-
-        return FrequencyFilter(
-            type=FilterType.BAND_PASS,
-            lower_frequency_hz=int(float(match.group(1)) * 1000),
-            higher_frequency_hz=int(float(match.group(2)) * 1000),
-        )
-
-    if "Low-pass filter applied" in comment:
-        match = re.match(
-            (
-                r" Low-pass filter applied with cut-off frequency of "
-                r"(\d{1,4}\.\d)kHz\."
-            ),
-            comment,
+    Works for the comments of version 1.4.0 and later, whose regular
+    expressions capture the frequencies in the groups ``band_pass_low``,
+    ``band_pass_high``, ``low_pass`` and ``high_pass``.
+    """
+    filter_type, lower_frequency_hz, higher_frequency_hz = (
+        _get_frequency_filter(
+            *match.group(
+                "band_pass_low",
+                "band_pass_high",
+                "low_pass",
+                "high_pass",
+            )
         )
+    )
+    return FrequencyFilter(
+        type=filter_type,
+        lower_frequency_hz=lower_frequency_hz,
+        higher_frequency_hz=higher_frequency_hz,
+    )
 
-        if match is None:
-            raise MessageFormatError(f"Unexpected frequency filter: {comment}")
 
-        return FrequencyFilter(
-            type=FilterType.LOW_PASS,
-            lower_frequency_hz=None,
-            higher_frequency_hz=int(float(match.group(1)) * 1000),
-        )
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _get_frequency_filter(
+    band_pass_low: Optional[str],
+    band_pass_high: Optional[str],
+    low_pass: Optional[str],
+    high_pass: Optional[str],
+) -> Tuple[FilterType, Optional[int], Optional[int]]:
+    """Return the type and the lower and higher frequencies of a filter.
 
-    if "High-pass filter applied" in comment:
-        match = re.match(
-            (
-                r" High-pass filter applied with cut-off frequency "
-                r"of (\d{1,4}\.\d)kHz\."
-            ),
-            comment,
+    The values are cached rather than the FrequencyFilter, which is mutable
+    and must not be shared between records.
+    """
+    if band_pass_low is not None:
+        return (
+            FilterType.BAND_PASS,
+            _khz_to_hz(band_pass_low),
+            _khz_to_hz(band_pass_high),  # type: ignore
         )
 
-        if match is None:
-            raise MessageFormatError(f"Unexpected frequency filter: {comment}")
+    if low_pass is not None:
+        return FilterType.LOW_PASS, None, _khz_to_hz(low_pass)
 
-        return FrequencyFilter(
-            type=FilterType.HIGH_PASS,
-            lower_frequency_hz=int(float(match.group(1)) * 1000),
-            higher_frequency_hz=None,
-        )
+    if high_pass is not None:
+        return FilterType.HIGH_PASS, _khz_to_hz(high_pass), None
 
-    raise MessageFormatError(f"Unexpected frequency filter: {comment}")
+    return FilterType.NO_FILTER, None, None
 
 
+@lru_cache(maxsize=TIMEZONE_CACHE_SIZE)
 def _parse_timezone(comment: str) -> tz:
     """Parse the timezone from the comment string."""
     if comment == "":
@@ -445,21 +558,11 @@ def _parse_timezone(comment: str) -> tz:
     return tz(td(hours=int(hours), minutes=int(minutes)))
 
 
-def _parse_recording_state_1_4_0(comment: Optional[str]) -> RecordingState:
-    """Parse the recording state from the comment string.
-
-    Works for version 1.4.0 and 1.4.1.
-    """
-    if comment is None:
-        return RecordingState.RECORDING_OKAY
-
-    if "low voltage" in comment:
-        return RecordingState.SUPPLY_VOLTAGE_LOW
-
-    if "change of switch position" in comment:
-        return RecordingState.SWITCH_CHANGED
-
-    raise MessageFormatError(f"Unexpected recording state: {comment}")
+_recording_states_1_4_0 = {
+    None: RecordingState.RECORDING_OKAY,
+    "low voltage": RecordingState.SUPPLY_VOLTAGE_LOW,
+    "change of switch position": RecordingState.SWITCH_CHANGED,
+}
 
 
 def _parse_battery_state_1_4_0(comment: str) -> Tuple[bool, float]:
@@ -475,170 +578,173 @@ def _parse_battery_state_1_4_0(comment: str) -> Tuple[bool, float]:
     return low_battery, battery_state_volts
 
 
-def parse_comment_version_1_4_0(comment: str) -> CommentMetadataV3:
+def _parse_comment_version_1_4_0(comment: str) -> Optional[CommentMetadataV3]:
     """Parse the comment string of 1.4.0 firmware.
 
-    Also valid for version 1.4.1.
-
-    Parameters
-    ----------
-    comment : str
-
-    Returns
-    -------
-    metadata: CommentMetadataV3
-
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_4_0.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
 
-    datetime = dt.strptime(match.group(1), DATE_FORMAT)
-    timezone = _parse_timezone(match.group(2))
-    audiomoth_id = match.group(3)
-    gain = _gain_mapping[match.group(4)]
-    temperature_c = float(match.group(6))
     low_battery, battery_state_volts = _parse_battery_state_1_4_0(
-        match.group(5)
+        match.group("battery_state")
     )
-    amplitude_threshold = _parse_amplitude_threshold_1_4_0(match.group(7))
-    frequency_filter = _parse_frequency_filter_1_4_0(match.group(8))
-    recording_state = _parse_recording_state_1_4_0(match.group(9))
 
     return CommentMetadataV3(
-        datetime=datetime,
-        timezone=timezone,
-        audiomoth_id=audiomoth_id,
-        gain=gain,
+        datetime=dt.strptime(match.group("datetime"), DATE_FORMAT),
+        timezone=_parse_timezone(match.group("timezone")),
+        audiomoth_id=match.group("audiomoth_id"),
+        gain=_gain_mapping[match.group("gain")],
         comment=comment,
         low_battery=low_battery,
         battery_state_v=battery_state_volts,
-        recording_state=recording_state,
-        temperature_c=temperature_c,
-        amplitude_threshold=amplitude_threshold,
-        frequency_filter=frequency_filter,
+        recording_state=_recording_states_1_4_0[
+            match.group("recording_state")
+        ],
+        temperature_c=float(match.group("temperature")),
+        amplitude_threshold=_parse_amplitude_threshold_1_4_0(
+            match.group("threshold")
+        ),
+        frequency_filter=_parse_frequency_filter(match),
     )
 
 
-def _parse_recording_state_1_4_2(comment: Optional[str]) -> RecordingState:
-    """Parse the recording state from the comment string of 1.4.2 firmware."""
-    if comment is None:
-        return RecordingState.RECORDING_OKAY
+def parse_comment_version_1_4_0(comment: str) -> CommentMetadataV3:
+    """Parse the comment string of 1.4.0 firmware.
+
+    Also valid for version 1.4.1.
+
+    Parameters
+    ----------
+    comment : str
 
-    if "low voltage" in comment:
-        return RecordingState.SUPPLY_VOLTAGE_LOW
+    Returns
+    -------
+    metadata: CommentMetadataV3
 
-    if "file size limit" in comment:
-        return RecordingState.FILE_SIZE_LIMITED
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_4_0(comment))
 
-    if "change of switch position" in comment:
-        return RecordingState.SWITCH_CHANGED
 
-    raise MessageFormatError(f"Unexpected recording state: {comment}")
+_recording_states_1_4_2 = {
+    None: RecordingState.RECORDING_OKAY,
+    "low voltage": RecordingState.SUPPLY_VOLTAGE_LOW,
+    "file size limit": RecordingState.FILE_SIZE_LIMITED,
+    "change of switch position": RecordingState.SWITCH_CHANGED,
+}
 
 
-COMMENT_REGEX_1_4_2 = re.compile(
+COMMENT_REGEX_1_4_2 = _LazyPattern(
     r"Recorded at "
-    r"(\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "  # date time
-    r"\(UTC([\+\-]?\d{0,2}:?\d{0,2})\) by "  # timezone
-    r"AudioMoth ([0-9A-z]{16}) "  # audiomoth id
-    r"at (low|low-medium|medium|medium-high|high) gain setting "  # gain
+    r"(?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "
+    r"\(UTC(?P<timezone>[\+\-]?\d{0,2}:?\d{0,2})\) by "
+    r"AudioMoth (?P<audiomoth_id>[0-9A-z]{16}) "
+    r"at (?P<gain>low|low-medium|medium|medium-high|high) gain setting "
     "while battery state was "
-    r"(less than 2\.5|greater than 4\.9|\d\.\d)V "  # battery state
-    r"and temperature was (-?\d{1,2}\.\d)C."  # temperature
-    r"( Amplitude threshold was \d{1,4}\.)?"  # threshold
-    r"( Band-pass filter applied with cut-off frequencies of \d{1,4}\.\dkHz "
-    r"and \d{1,4}\.\dkHz\.| Low-pass filter applied with cut-off frequency of "
-    r"\d{1,4}\.\dkHz\."
-    r"| High-pass filter applied with cut-off frequency of \d{1,4}\.\dkHz\.)?"
-    r"( Recording cancelled before completion due to "
-    r"(low voltage|change of switch position|file size limit)\.)?"
+    r"(?P<battery_state>less than 2\.5|greater than 4\.9|\d\.\d)V "
+    r"and temperature was (?P<temperature>-?\d{1,2}\.\d)C."
+    r"(?: Amplitude threshold was (?P<threshold>\d{1,4})\.)?"
+    r"(?: Band-pass filter applied with cut-off frequencies of "
+    r"(?P<band_pass_low>\d{1,4}\.\d)kHz and "
+    r"(?P<band_pass_high>\d{1,4}\.\d)kHz\."
+    r"| Low-pass filter applied with cut-off frequency of "
+    r"(?P<low_pass>\d{1,4}\.\d)kHz\."
+    r"| High-pass filter applied with cut-off frequency of "
+    r"(?P<high_pass>\d{1,4}\.\d)kHz\.)?"
+    r"(?: Recording cancelled before completion due to "
+    r"(?P<recording_state>low voltage|change of switch position"
+    r"|file size limit)\.)?"
 )
 
 
-def parse_comment_version_1_4_2(comment: str) -> CommentMetadataV3:
+def _parse_comment_version_1_4_2(comment: str) -> Optional[CommentMetadataV3]:
     """Parse the comment string of 1.4.2 firmware.
 
-    Also valid for versions 1.4.3 and 1.4.4.
-
-    Parameters
-    ----------
-    comment : str
-
-    Returns
-    -------
-    metadata: CommentMetadataV3
-
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_4_2.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
 
-    datetime = dt.strptime(match.group(1), DATE_FORMAT)
-    timezone = _parse_timezone(match.group(2))
-    audiomoth_id = match.group(3)
-    gain = _gain_mapping[match.group(4)]
-    temperature_c = float(match.group(6))
     low_battery, battery_state_volts = _parse_battery_state_1_4_0(
-        match.group(5)
+        match.group("battery_state")
     )
-    amplitude_threshold = _parse_amplitude_threshold_1_4_0(match.group(7))
-    frequency_filter = _parse_frequency_filter_1_4_0(match.group(8))
-    recording_state = _parse_recording_state_1_4_2(match.group(9))
 
     return CommentMetadataV3(
-        datetime=datetime,
-        timezone=timezone,
-        audiomoth_id=audiomoth_id,
-        gain=gain,
+        datetime=dt.strptime(match.group("datetime"), DATE_FORMAT),
+        timezone=_parse_timezone(match.group("timezone")),
+        audiomoth_id=match.group("audiomoth_id"),
+        gain=_gain_mapping[match.group("gain")],
         comment=comment,
         low_battery=low_battery,
         battery_state_v=battery_state_volts,
-        recording_state=recording_state,
-        temperature_c=temperature_c,
-        amplitude_threshold=amplitude_threshold,
-        frequency_filter=frequency_filter,
+        recording_state=_recording_states_1_4_2[
+            match.group("recording_state")
+        ],
+        temperature_c=float(match.group("temperature")),
+        amplitude_threshold=_parse_amplitude_threshold_1_4_0(
+            match.group("threshold")
+        ),
+        frequency_filter=_parse_frequency_filter(match),
     )
 
 
-COMMENT_REGEX_1_6_0 = re.compile(
+def parse_comment_version_1_4_2(comment: str) -> CommentMetadataV3:
+    """Parse the comment string of 1.4.2 firmware.
+
+    Also valid for versions 1.4.3 and 1.4.4.
+
+    Parameters
+    ----------
+    comment : str
+
+    Returns
+    -------
+    metadata: CommentMetadataV3
+
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_4_2(comment))
+
+
+COMMENT_REGEX_1_6_0 = _LazyPattern(
     r"Recorded at "
-    r"(\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "  # date time
-    r"\(UTC([\+\-]?\d{0,2}:?\d{0,2})\) "  # timezone
-    r"(during deployment [0-9A-z]{16}|by AudioMoth [0-9A-z]{16}) "
-    r"(using external microphone )?"
-    r"at (low|low-medium|medium|medium-high|high) gain "  # gain
+    r"(?P<datetime>\d{2}:\d{2}:\d{2} \d{2}\/\d{2}\/\d{4}) "
+    r"\(UTC(?P<timezone>[\+\-]?\d{0,2}:?\d{0,2})\) "
+    r"(?P<id_source>during deployment|by AudioMoth) "
+    r"(?P<audiomoth_id>[0-9A-z]{16}) "
+    r"(?P<external_microphone>using external microphone )?"
+    r"at (?P<gain>low|low-medium|medium|medium-high|high) gain "
     "while battery was "
-    r"(less than 2\.5|greater than 4\.9|\d\.\d)V "  # battery state
-    r"and temperature was (-?\d{1,2}\.\d)C."  # temperature
-    r"( Amplitude threshold was (?:\d{1,4}|\d{1,4}\.?\d{0,4}%|-?\d{1,4} dB) "
-    r"with \d{1,4}s minimum trigger duration\.)?"  # threshold
-    r"( Band-pass filter with frequencies of \d{1,4}\.\dkHz "
-    r"and \d{1,4}\.\dkHz applied\.| Low-pass filter with frequency of "
-    r"\d{1,4}\.\dkHz applied\."
-    r"| High-pass filter with frequency of \d{1,4}\.\dkHz applied\.)?"
-    r"( Recording stopped due to (low voltage|microphone change"
-    r"|switch position change|file size limit)\.)?"
+    r"(?P<battery_state>less than 2\.5|greater than 4\.9|\d\.\d)V "
+    r"and temperature was (?P<temperature>-?\d{1,2}\.\d)C."
+    r"(?: Amplitude threshold was (?:(?P<threshold>\d{1,4})"
+    r"|(?P<threshold_percentage>\d{1,4}\.?\d{0,4})%"
+    r"|(?P<threshold_db>-?\d{1,4}) dB) "
+    r"with (?P<minimum_trigger_duration>\d{1,4})s minimum trigger "
+    r"duration\.)?"
+    r"(?: Band-pass filter with frequencies of "
+    r"(?P<band_pass_low>\d{1,4}\.\d)kHz and "
+    r"(?P<band_pass_high>\d{1,4}\.\d)kHz applied\."
+    r"| Low-pass filter with frequency of "
+    r"(?P<low_pass>\d{1,4}\.\d)kHz applied\."
+    r"| High-pass filter with frequency of "
+    r"(?P<high_pass>\d{1,4}\.\d)kHz applied\.)?"
+    r"(?: Recording stopped due to (?P<recording_state>low voltage"
+    r"|microphone change|switch position change|file size limit)\.)?"
 )
 
 
-def _parse_artist_and_deployment_id(
-    comment: str,
-) -> Tuple[str, Optional[str]]:
-    """Parse artist and deployment id from comment string."""
-    deployment_id = None
-    audiomoth_id = comment[-16:]
-    if "during deployment" in comment:
-        deployment_id = comment[-16:]
-    return audiomoth_id, deployment_id
-
-
 def db_to_amplitude(db_value: float) -> int:
     """Convert dB values to amplitude threshold value."""
     return round(10 ** (db_value / 20) * MAX_AMPLITUDE)
@@ -649,179 +755,123 @@ def percentage_to_amplitude(percentage: float) -> int:
     return round(percentage / 100 * MAX_AMPLITUDE)
 
 
-AMPLITUDE_REGEX_1_6_0 = re.compile(
-    r" Amplitude threshold was (\d{1,4}|\d{1,4}\.?\d{0,4}%|-?\d{1,4} dB)"
-    r" with (\d{1,4})s minimum trigger duration\."
-)
-
-
 def _parse_amplitude_threshold_1_6_0(
-    comment: Optional[str],
+    match: Match[str],
 ) -> Tuple[AmplitudeThreshold, int]:
-    """Parse the amplitude threshold from the comment string."""
-    if comment is None:
-        return AmplitudeThreshold(enabled=False, threshold=0), 0
+    """Parse the amplitude threshold captured from the comment string.
 
-    match = re.match(
-        AMPLITUDE_REGEX_1_6_0,
-        comment,
+    The threshold is written as an amplitude, a percentage or in dB.
+    """
+    enabled, amplitude, trigger_duration = _get_amplitude_threshold_1_6_0(
+        *match.group(
+            "threshold",
+            "threshold_percentage",
+            "threshold_db",
+            "minimum_trigger_duration",
+        )
     )
-
-    if match is None:
-        raise MessageFormatError(f"Unexpected amplitude threshold: {comment}")
-
-    amplitude_threshold = match.group(1)
-    if "%" in amplitude_threshold:
-        amplitude = percentage_to_amplitude(float(amplitude_threshold[:-1]))
-    elif "dB" in amplitude_threshold:
-        amplitude = db_to_amplitude(float(amplitude_threshold[:-2]))
-    else:
-        amplitude = int(amplitude_threshold)
-
-    trigger_duration = int(match.group(2))
-
     return (
-        AmplitudeThreshold(enabled=True, threshold=amplitude),
+        AmplitudeThreshold(enabled=enabled, threshold=amplitude),
         trigger_duration,
     )
 
 
-def _parse_recording_state_1_6_0(comment: Optional[str]) -> RecordingState:
-    """Parse the recording state from the comment string of 1.6.0 firmware."""
-    if comment is None:
-        return RecordingState.RECORDING_OKAY
-
-    if "low voltage" in comment:
-        return RecordingState.SUPPLY_VOLTAGE_LOW
-
-    if "file size limit" in comment:
-        return RecordingState.FILE_SIZE_LIMITED
-
-    if "switch position change" in comment:
-        return RecordingState.SWITCH_CHANGED
-
-    raise MessageFormatError(f"Unexpected recording state: {comment}")
-
-
-def _parse_frequency_filter_1_6_0(comment: Optional[str]) -> FrequencyFilter:
-    """Parse the frequency filter from the comment string."""
-    if comment is None:
-        return FrequencyFilter(
-            type=FilterType.NO_FILTER,
-            lower_frequency_hz=None,
-            higher_frequency_hz=None,
-        )
-
-    if "Band-pass filter" in comment:
-        match = re.match(
-            r" Band-pass filter with frequencies of "
-            r"(\d{1,4}\.\d)kHz and (\d{1,4}\.\d)kHz applied\.",
-            comment,
-        )
-
-        if match is None:
-            raise MessageFormatError(f"Unexpected frequency filter: {comment}")
-
-        return FrequencyFilter(
-            type=FilterType.BAND_PASS,
-            lower_frequency_hz=int(float(match.group(1)) * 1000),
-            higher_frequency_hz=int(float(match.group(2)) * 1000),
-        )
-
-    if "Low-pass filter" in comment:
-        match = re.match(
-            (
-                r" Low-pass filter with frequency of "
-                r"(\d{1,4}\.\d)kHz applied\."
-            ),
-            comment,
-        )
-
-        if match is None:
-            raise MessageFormatError(f"Unexpected frequency filter: {comment}")
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _get_amplitude_threshold_1_6_0(
+    threshold: Optional[str],
+    percentage: Optional[str],
+    db_value: Optional[str],
+    trigger_duration: Optional[str],
+) -> Tuple[bool, int, int]:
+    """Return the enabled flag, amplitude and minimum trigger duration.
 
-        return FrequencyFilter(
-            type=FilterType.LOW_PASS,
-            lower_frequency_hz=None,
-            higher_frequency_hz=int(float(match.group(1)) * 1000),
-        )
+    The values are cached rather than the AmplitudeThreshold, which is
+    mutable and must not be shared between records.
+    """
+    if trigger_duration is None:
+        return False, 0, 0
 
-    if "High-pass filter" in comment:
-        match = re.match(
-            (
-                r" High-pass filter with frequency "
-                r"of (\d{1,4}\.\d)kHz applied\."
-            ),
-            comment,
-        )
+    if percentage is not None:
+        amplitude = percentage_to_amplitude(float(percentage))
+    elif db_value is not None:
+        amplitude = db_to_amplitude(float(db_value))
+    else:
+        amplitude = int(threshold)  # type: ignore
 
-        if match is None:
-            raise MessageFormatError(f"Unexpected frequency filter: {comment}")
+    return True, amplitude, int(trigger_duration)
 
-        return FrequencyFilter(
-            type=FilterType.HIGH_PASS,
-            lower_frequency_hz=int(float(match.group(1)) * 1000),
-            higher_frequency_hz=None,
-        )
 
-    raise MessageFormatError(f"Unexpected frequency filter: {comment}")
+_recording_states_1_6_0 = {
+    None: RecordingState.RECORDING_OKAY,
+    "low voltage": RecordingState.SUPPLY_VOLTAGE_LOW,
+    "file size limit": RecordingState.FILE_SIZE_LIMITED,
+    "switch position change": RecordingState.SWITCH_CHANGED,
+    "microphone change": RecordingState.MICROPHONE_CHANGED,
+}
 
 
-def parse_comment_version_1_6_0(comment: str) -> CommentMetadataV5:
+def _parse_comment_version_1_6_0(comment: str) -> Optional[CommentMetadataV5]:
     """Parse the comment string of 1.6.0 firmware.
 
-    Parameters
-    ----------
-    comment : str
-
-    Returns
-    -------
-    metadata: CommentMetadataV5
-
+    Return None if the comment does not have the format of this version.
     """
     match = COMMENT_REGEX_1_6_0.fullmatch(comment)
 
     if match is None:
-        raise MessageFormatError(
-            "Comment string does not match expected format."
-        )
+        return None
+
+    audiomoth_id = match.group("audiomoth_id")
+    deployment_id = None
+    if match.group("id_source") == "during deployment":
+        deployment_id = audiomoth_id
 
-    datetime = dt.strptime(match.group(1), DATE_FORMAT)
-    timezone = _parse_timezone(match.group(2))
-    audiomoth_id, deployment_id = _parse_artist_and_deployment_id(
-        match.group(3)
-    )
-    external_microphone = match.group(4) is not None
-    gain = _gain_mapping[match.group(5)]
     low_battery, battery_state_volts = _parse_battery_state_1_4_0(
-        match.group(6)
+        match.group("battery_state")
     )
-    temperature_c = float(match.group(7))
     (
         amplitude_threshold,
         minimum_trigger_duration_s,
-    ) = _parse_amplitude_threshold_1_6_0(match.group(8))
-    frequency_filter = _parse_frequency_filter_1_6_0(match.group(9))
-    recording_state = _parse_recording_state_1_6_0(match.group(10))
+    ) = _parse_amplitude_threshold_1_6_0(match)
 
     return CommentMetadataV5(
-        datetime=datetime,
-        timezone=timezone,
+        datetime=dt.strptime(match.group("datetime"), DATE_FORMAT),
+        timezone=_parse_timezone(match.group("timezone")),
         audiomoth_id=audiomoth_id,
-        gain=gain,
+        gain=_gain_mapping[match.group("gain")],
         comment=comment,
         low_battery=low_battery,
         battery_state_v=battery_state_volts,
-        recording_state=recording_state,
-        temperature_c=temperature_c,
+        recording_state=_recording_states_1_6_0[
+            match.group("recording_state")
+        ],
+        temperature_c=float(match.group("temperature")),
         amplitude_threshold=amplitude_threshold,
-        frequency_filter=frequency_filter,
+        frequency_filter=_parse_frequency_filter(match),
         deployment_id=deployment_id,
-        external_microphone=external_microphone,
+        external_microphone=match.group("external_microphone") is not None,
         minimum_trigger_duration_s=minimum_trigger_duration_s,
     )
 
 
+def parse_comment_version_1_6_0(comment: str) -> CommentMetadataV5:
+    """Parse the comment string of 1.6.0 firmware.
+
+    Parameters
+    ----------
+    comment : str
+
+    Returns
+    -------
+    metadata: CommentMetadataV5
+
+    Raises
+    ------
+    MessageFormatError
+        If the comment does not have the format of this version.
+    """
+    return _check_match(_parse_comment_version_1_6_0(comment))
+
+
 parsers: Dict[str, Callable[[str], CommentMetadata]] = {
     "1.0": parse_comment_version_1_0,
     "1.0.1": parse_comment_version_1_0_1,
@@ -833,23 +883,303 @@ parsers: Dict[str, Callable[[str], CommentMetadata]] = {
     "1.6.0": parse_comment_version_1_6_0,
 }
 
+# Internal versions of the parsers, which return None instead of raising an
+# error when the comment does not have their format. Building exceptions
+# for every failed match would dominate the cost of trying the parsers.
+_parsers: Dict[str, Callable[[str], Optional[CommentMetadata]]] = {
+    "1.0": _parse_comment_version_1_0,
+    "1.0.1": _parse_comment_version_1_0_1,
+    "1.2.0": _parse_comment_version_1_2_0,
+    "1.2.1": _parse_comment_version_1_2_1,
+    "1.2.2": _parse_comment_version_1_2_2,
+    "1.4.0": _parse_comment_version_1_4_0,
+    "1.4.2": _parse_comment_version_1_4_2,
+    "1.6.0": _parse_comment_version_1_6_0,
+}
+
 
-def parse_comment(comment: str) -> dict:
+PARSER_GROUPS: Tuple[Tuple[str, ...], ...] = (
+    ("1.0",),
+    ("1.0.1",),
+    ("1.2.0", "1.2.1", "1.2.2"),
+    ("1.4.0", "1.4.2"),
+    ("1.6.0",),
+)
+"""Firmware versions grouped by overlapping comment formats.
+
+A comment can match several formats of the same group, in which case the
+first version of the group is reported. Formats of different groups differ
+in fixed parts of the text, e.g. ``at gain setting 2`` and ``at medium gain
+setting``, so no comment matches two groups and the groups can be tried in
+any order.
+"""
+
+
+@dataclass
+class ParserStats:
+    """Statistics of the firmware parsers tried on each comment."""
+
+    comments: int = 0
+    """Number of comments parsed."""
+
+    attempts: int = 0
+    """Total number of parsers tried."""
+
+    unmatched: int = 0
+    """Number of comments that did not match any format."""
+
+    matches: Dict[str, int] = field(default_factory=dict)
+    """Number of comments matched by each firmware version."""
+
+    attempts_per_comment: Dict[int, int] = field(default_factory=dict)
+    """Number of comments by the number of parsers tried on them."""
+
+    def record(self, version: Optional[str], attempts: int) -> None:
+        """Record the result of parsing a comment.
+
+        Parameters
+        ----------
+        version : str, optional
+            The firmware version that matched, or None if none did.
+        attempts : int
+            The number of parsers tried.
+        """
+        self.comments += 1
+        self.attempts += attempts
+        self.attempts_per_comment[attempts] = (
+            self.attempts_per_comment.get(attempts, 0) + 1
+        )
+        if version is None:
+            self.unmatched += 1
+        else:
+            self.matches[version] = self.matches.get(version, 0) + 1
+
+    def merge(self, other: "ParserStats") -> None:
+        """Add the statistics of another object to this one."""
+        self.comments += other.comments
+        self.attempts += other.attempts
+        self.unmatched += other.unmatched
+        for version, count in other.matches.items():
+            self.matches[version] = self.matches.get(version, 0) + count
+        for attempts, count in other.attempts_per_comment.items():
+            self.attempts_per_comment[attempts] = (
+                self.attempts_per_comment.get(attempts, 0) + count
+            )
+
+    @property
+    def mean_attempts(self) -> float:
+        """Return the mean number of parsers tried per comment."""
+        if self.comments == 0:
+            return 0.0
+        return self.attempts / self.comments
+
+
+def parse_comment(
+    comment: str,
+    stats: Optional[ParserStats] = None,
+) -> dict:
     """Parse the comment string into a dictionary of metadata.
 
     Parameters
     ----------
     comment : str
+    stats : ParserStats, optional
+        If given, the number of parsers tried and the firmware version that
+        matched are recorded in it.
 
     Returns
     -------
     metadata : dict
 
     """
-    for version, parser in parsers.items():
+    _check_comment(comment, stats)
+
+    attempts = 0
+    errors: List[str] = []
+    for version, parser in _parsers.items():
+        attempts += 1
         try:
-            return {"firmware_version": version, **asdict(parser(comment))}
-        except MessageFormatError:
+            parsed = parser(comment)
+        except MessageFormatError as error:
+            errors.append(f"{version}: {error}")
+            continue
+
+        if parsed is None:
             continue
 
-    raise MessageFormatError("Comment string does not match any format.")
+        if stats is not None:
+            stats.record(version, attempts)
+
+        # Shallow copy so that nested objects, such as the frequency
+        # filter, are kept as their dataclasses.
+        return {"firmware_version": version, **vars(parsed)}
+
+    if stats is not None:
+        stats.record(None, attempts)
+    raise _no_match_error(comment, errors)
+
+
+def _check_comment(comment: str, stats: Optional[ParserStats]) -> None:
+    """Reject comments that no firmware could have written."""
+    if len(comment) > MAX_COMMENT_LENGTH:
+        message = (
+            f"Comment string is too long ({len(comment)} characters, "
+            f"maximum {MAX_COMMENT_LENGTH})."
+        )
+    elif not comment.startswith(COMMENT_PREFIX):
+        message = (
+            f"Comment string does not start with {COMMENT_PREFIX!r}. "
+            f"Comment starts with: {comment[:48]!r}."
+        )
+    else:
+        return
+
+    if stats is not None:
+        stats.record(None, 0)
+    raise MessageFormatError(message)
+
+
+def _no_match_error(comment: str, errors: List[str]) -> MessageFormatError:
+    """Build the error of a comment that no firmware parser matched.
+
+    Parameters
+    ----------
+    comment : str
+    errors : list of str
+        Errors raised by parsers whose format matched but whose fields
+        could not be parsed.
+    """
+    message = (
+        "Comment string does not match any format. "
+        f"Comment starts with: {comment[:48]!r}."
+    )
+    if errors:
+        message += " Errors: " + "; ".join(errors)
+    return MessageFormatError(message)
+
+
+class CommentParser:
+    """Parse many comments, trying the most common firmware first.
+
+    :py:func:`parse_comment` always tries the firmware formats from the
+    oldest to the newest, so comments of recent firmware pay for a failed
+    match of every older format. This parser counts the matches of each
+    group of :py:data:`PARSER_GROUPS` and tries the groups in order of
+    decreasing frequency. The counts decay over time, so the order follows
+    archives that change from one firmware to another. The parsed metadata
+    is always the same as with :py:func:`parse_comment`.
+
+    Parameters
+    ----------
+    adaptive : bool, optional
+        Whether to reorder the groups. If False, the parser only records
+        statistics.
+    decay_every : int, optional
+        Number of comments after which the counts are halved.
+
+    Examples
+    --------
+    >>> parser = CommentParser()
+    >>> metadata = [parser.parse(comment) for comment in comments]
+    >>> parser.stats.mean_attempts
+    1.0
+    """
+
+    def __init__(self, adaptive: bool = True, decay_every: int = 1024):
+        """Initialize the parser with the groups in release order."""
+        self.adaptive = adaptive
+        self.decay_every = decay_every
+        self.stats = ParserStats()
+        self._groups = [
+            tuple((version, _parsers[version]) for version in group)
+            for group in PARSER_GROUPS
+        ]
+        self._scores = [0.0] * len(self._groups)
+        # Replaced, never modified, so that it can be iterated while
+        # another thread reorders the groups.
+        self._order = tuple(range(len(self._groups)))
+
+    @property
+    def order(self) -> List[str]:
+        """Return the firmware versions in the order they are tried."""
+        return [
+            version
+            for index in self._order
+            for version, _ in self._groups[index]
+        ]
+
+    def parse(
+        self,
+        comment: str,
+        stats: Optional[ParserStats] = None,
+    ) -> dict:
+        """Parse the comment string into a dictionary of metadata.
+
+        Parameters
+        ----------
+        comment : str
+        stats : ParserStats, optional
+            Also record the parsers tried on this comment in ``stats``, in
+            addition to the statistics of the parser.
+
+        Returns
+        -------
+        metadata : dict
+
+        Raises
+        ------
+        MessageFormatError
+            If the comment does not match any format.
+        """
+        try:
+            _check_comment(comment, stats)
+        except MessageFormatError:
+            self.stats.record(None, 0)
+            raise
+
+        attempts = 0
+        errors: List[str] = []
+        order = self._order
+        for position, index in enumerate(order):
+            for version, parser in self._groups[index]:
+                attempts += 1
+                try:
+                    parsed = parser(comment)
+                except MessageFormatError as error:
+                    errors.append(f"{version}: {error}")
+                    continue
+
+                if parsed is None:
+                    continue
+
+                self.stats.record(version, attempts)
+                if stats is not None:
+                    stats.record(version, attempts)
+                if self.adaptive:
+                    self._promote(order, position)
+                return {"firmware_version": version, **vars(parsed)}
+
+        self.stats.record(None, attempts)
+        if stats is not None:
+            stats.record(None, attempts)
+        raise _no_match_error(comment, errors)
+
+    def _promote(self, order: Tuple[int, ...], position: int) -> None:
+        """Count a match of a group and move it ahead of rarer groups."""
+        scores = self._scores
+        index = order[position]
+        scores[index] += 1
+
+        if self.stats.comments % self.decay_every == 0:
+            self._scores = [score / 2 for score in scores]
+            scores = self._scores
+
+        if position == 0 or scores[index] <= scores[order[position - 1]]:
+            return
+
+        new_order = list(order)
+        while position > 0 and scores[index] > scores[new_order[position - 1]]:
+            new_order[position] = new_order[position - 1]
+            position -= 1
+        new_order[position] = index
+        self._order = tuple(new_order)
@@ -0,0 +1,244 @@
+"""Read recordings with ranged reads, e.g. from object storage.
+
+A :py:class:`RangeReader` returns a range of bytes of a recording. Pass it
+to :py:func:`metamoth.parse_metadata` instead of a path::
+
+    reader = HTTPRangeReader("https://example.com/20230101_000000.WAV")
+    metadata = parse_metadata(reader)
+
+The reader is wrapped in a :py:class:`RangeFile`, a seekable file object
+that fetches :py:data:`DEFAULT_PREFETCH` bytes at once and serves the
+following reads from them. The whole header of an AudioMoth recording fits
+in the first window, so the metadata costs a single range request per
+recording instead of downloading the file.
+
+:py:class:`LocalRangeReader` reads local files, and is a stand-in for
+remote storage in tests. Other storages only need to implement
+:py:meth:`RangeReader._read_range`.
+"""
+
+import io
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Union
+
+__all__ = [
+    "DEFAULT_PREFETCH",
+    "HTTPRangeReader",
+    "LocalRangeReader",
+    "RangeFile",
+    "RangeReader",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+DEFAULT_PREFETCH = 4096
+"""Number of bytes fetched by each range request of a RangeFile.
+
+The header of an AudioMoth recording, up to its data chunk, is about 500
+bytes long.
+"""
+
+
+class RangeReader(ABC):
+    """Reader of byte ranges of a recording.
+
+    Parameters
+    ----------
+    name : str
+        Path or URL of the recording, reported in the metadata.
+    """
+
+    def __init__(self, name: str):
+        """Initialize the reader."""
+        self.name = name
+        self.requests = 0
+        """Number of range requests made."""
+        self.bytes_read = 0
+        """Number of bytes returned by the range requests."""
+
+    def read_range(self, start: int, size: int) -> bytes:
+        """Return size bytes starting at start.
+
+        Parameters
+        ----------
+        start : int
+            Position of the first byte.
+        size : int
+            Number of bytes to read.
+
+        Returns
+        -------
+        data : bytes
+            Fewer than size bytes if the range ends after the end of the
+            recording, and no bytes if it starts after it.
+        """
+        self.requests += 1
+        data = self._read_range(start, size)
+        self.bytes_read += len(data)
+        return data
+
+    @abstractmethod
+    def _read_range(self, start: int, size: int) -> bytes:
+        """Read the range from the storage."""
+
+    def close(self) -> None:  # noqa: B027
+        """Release the resources of the reader."""
+
+    def __enter__(self) -> "RangeReader":
+        """Return the reader."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the reader."""
+        self.close()
+
+
+class LocalRangeReader(RangeReader):
+    """Read byte ranges of a local file.
+
+    Parameters
+    ----------
+    path : PathLike
+        Path to the file.
+    """
+
+    def __init__(self, path: PathLike):
+        """Open the file."""
+        super().__init__(os.fspath(path))
+        self._file = open(  # pylint: disable=consider-using-with
+            path,
+            "rb",
+            buffering=0,
+        )
+
+    def _read_range(self, start: int, size: int) -> bytes:
+        self._file.seek(start)
+        return self._file.read(size) or b""
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class HTTPRangeReader(RangeReader):
+    """Read byte ranges of a recording served over HTTP.
+
+    Each range is fetched with a ``Range`` request header. When the server
+    ignores it and returns the whole file, only the bytes up to the end of
+    the range are downloaded.
+
+    Parameters
+    ----------
+    url : str
+        URL of the recording.
+    headers : dict, optional
+        Extra request headers, e.g. for authentication.
+    timeout : float, optional
+        Timeout of each request, in seconds.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Initialize the reader."""
+        super().__init__(url)
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+
+    def _read_range(self, start: int, size: int) -> bytes:
+        # Imported on first use, as urllib is slow to import.
+        # pylint: disable=import-outside-toplevel
+        from urllib.error import HTTPError
+        from urllib.request import Request, urlopen
+
+        request = Request(
+            self.name,
+            headers={
+                **self.headers,
+                "Range": f"bytes={start}-{start + size - 1}",
+            },
+        )
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                if response.status == 206:
+                    return response.read(size)
+                return response.read(start + size)[start:]
+        except HTTPError as error:
+            if error.code == 416:
+                return b""
+            raise
+
+
+class RangeFile(io.RawIOBase):
+    """Seekable file object reading from a RangeReader.
+
+    Reads are served from a window of the recording. A read outside the
+    window fetches a new window of at least ``prefetch`` bytes starting at
+    the read position, with one range request.
+
+    Parameters
+    ----------
+    reader : RangeReader
+    prefetch : int, optional
+        Minimum size of each range request.
+    """
+
+    def __init__(self, reader: RangeReader, prefetch: int = DEFAULT_PREFETCH):
+        """Initialize the file at the start of the recording."""
+        super().__init__()
+        self.reader = reader
+        self.name = reader.name
+        self.prefetch = prefetch
+        self._position = 0
+        self._start = 0
+        self._window = b""
+        self._at_end = False
+
+    def readable(self) -> bool:
+        """Return True."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True."""
+        return True
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to a new position, without any request.
+
+        Seeking from the end is not supported, as the size of the
+        recording is unknown.
+        """
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        else:
+            raise io.UnsupportedOperation("Cannot seek from the end.")
+        return self._position
+
+    def readinto(self, buffer) -> int:  # type: ignore
+        """Read into the buffer, fetching a new window if needed."""
+        size = len(buffer)
+        offset = self._position - self._start
+        end = self._start + len(self._window)
+
+        # Past the end of the last window, there is nothing left to read.
+        if offset < 0 or (self._position + size > end and not self._at_end):
+            length = max(size, self.prefetch)
+            self._window = self.reader.read_range(self._position, length)
+            self._start = self._position
+            self._at_end = len(self._window) < length
+            offset = 0
+
+        data = self._window[offset : offset + size]
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
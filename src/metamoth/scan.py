@@ -0,0 +1,372 @@
+"""Parse the metadata of many AudioMoth recordings in parallel.
+
+Directories are walked with :py:func:`os.scandir` and every WAV and FLAC
+file found is parsed with :py:func:`metamoth.parse_metadata`. Paths are
+sent to the workers in small batches and only a bounded number of batches
+is in flight at any time, so scanning millions of files uses constant
+memory. Results are returned in the same order as the paths.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
+from itertools import islice
+from typing import (
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from metamoth.audio import is_wav_filename
+from metamoth.configtxt import ConfigCache
+from metamoth.flac import is_flac_filename
+from metamoth.instrumentation import FileProfile, Profiler
+from metamoth.metadata import AMMetadata
+from metamoth.metamoth import parse_metadata
+from metamoth.parsing import CommentParser
+
+__all__ = [
+    "ScanError",
+    "batched",
+    "iter_wav_files",
+    "map_batches",
+    "parse_batch",
+    "scan",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+DEFAULT_BATCH_SIZE = 64
+
+ERROR_MODES = ("raise", "skip")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Shared by all the batches parsed in a process, so that the most common
+# firmware formats of the scanned files are tried first.
+_comment_parser = CommentParser()
+
+
+@dataclass
+class ScanError:
+    """A recording that could not be parsed."""
+
+    path: str
+    """Path to the recording."""
+
+    error: str
+    """Name of the exception raised while parsing."""
+
+    message: str
+    """Message of the exception raised while parsing."""
+
+
+def iter_wav_files(paths: Iterable[PathLike]) -> Iterator[str]:
+    """Yield the WAV and FLAC files in the given files and directories.
+
+    Directories are walked recursively. Files given explicitly are yielded
+    even if they do not have a WAV or FLAC extension.
+
+    Parameters
+    ----------
+    paths : iterable of PathLike
+        Files or directories.
+
+    Yields
+    ------
+    path : str
+    """
+    for path in paths:
+        path = os.fspath(path)
+        if os.path.isdir(path):
+            yield from _walk(path)
+        else:
+            yield path
+
+
+def _add_roots(
+    paths: Iterable[PathLike],
+    configs: ConfigCache,
+) -> Iterator[PathLike]:
+    """Bound the search of CONFIG.TXT files by the scanned paths."""
+    for path in paths:
+        configs.add_root(path)
+        yield path
+
+
+def _walk(directory: str) -> Iterator[str]:
+    """Yield the WAV and FLAC files in a directory tree, in sorted order."""
+    with os.scandir(directory) as iterator:
+        entries = sorted(iterator, key=lambda entry: entry.name)
+
+    for entry in entries:
+        if entry.is_dir():
+            yield from _walk(entry.path)
+        elif entry.is_file() and (
+            is_wav_filename(entry.name) or is_flac_filename(entry.name)
+        ):
+            yield entry.path
+
+
+ScanResult = Union[AMMetadata, ScanError]
+
+
+def parse_batch(
+    paths: List[str],
+    profiler: Optional[Profiler] = None,
+) -> List[ScanResult]:
+    """Parse a batch of recordings, catching any errors.
+
+    Parameters
+    ----------
+    paths : list of str
+        Files to parse.
+    profiler : Profiler, optional
+        Records the time spent in each stage of the parsing of every file.
+
+    Returns
+    -------
+    results : list of AMMetadata or ScanError
+        The metadata of each file, or the error that stopped its parsing,
+        in the order of the paths.
+    """
+    results: List[ScanResult] = []
+    for path in paths:
+        try:
+            results.append(
+                parse_metadata(
+                    path,
+                    profiler=profiler,
+                    comment_parser=_comment_parser,
+                )
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            results.append(
+                ScanError(
+                    path=path,
+                    error=type(error).__name__,
+                    message=str(error),
+                )
+            )
+    return results
+
+
+def _parse_batch_profiled(
+    paths: List[str],
+) -> Tuple[List[ScanResult], List[FileProfile]]:
+    """Parse a batch of recordings, returning the profile of each file."""
+    profiles: List[FileProfile] = []
+    results = parse_batch(paths, profiler=Profiler(callback=profiles.append))
+    return results, profiles
+
+
+def batched(
+    iterable: Iterable[T],
+    size: int,
+) -> Iterator[List[T]]:
+    """Split an iterable into lists of the given size.
+
+    The iterable is consumed lazily, one batch at a time.
+
+    Parameters
+    ----------
+    iterable : iterable
+    size : int
+        Number of items of each batch. The last batch may be shorter.
+
+    Yields
+    ------
+    batch : list
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _create_executor(workers: int, executor: str) -> Executor:
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+
+    raise ValueError(
+        f"Unknown executor {executor!r}, expected 'process' or 'thread'."
+    )
+
+
+def _iter_results(
+    paths: Iterable[str],
+    workers: int,
+    batch_size: int,
+    executor: str,
+    profiler: Optional[Profiler] = None,
+) -> Iterator[ScanResult]:
+    batches = batched(paths, batch_size)
+
+    if workers <= 1:
+        for batch in batches:
+            yield from parse_batch(batch, profiler=profiler)
+        return
+
+    def collect(value) -> List[ScanResult]:
+        if profiler is None:
+            return value
+
+        results, profiles = value
+        profiler.record_all(profiles)
+        return results
+
+    function = parse_batch if profiler is None else _parse_batch_profiled
+
+    for value in map_batches(function, batches, workers, executor):
+        yield from collect(value)
+
+
+def map_batches(
+    function: Callable[[List[T]], R],
+    batches: Iterable[List[T]],
+    workers: int,
+    executor: str = "process",
+) -> Iterator[R]:
+    """Yield the result of a function on each batch, in order.
+
+    The batches are sent to a pool of workers. Only a bounded number of
+    batches is in flight at any time, so the batches can be generated
+    lazily from a large iterable, see :py:func:`batched`.
+
+    Parameters
+    ----------
+    function : callable
+        Called with each batch. It must be picklable with the process
+        executor.
+    batches : iterable of list
+    workers : int
+        Number of parallel workers.
+    executor : str, optional
+        ``"process"`` (default) or ``"thread"``, see :py:func:`scan`.
+
+    Yields
+    ------
+    result
+        The result of the function on each batch, in the order of the
+        batches.
+
+    Raises
+    ------
+    ValueError
+        If the executor is unknown.
+    """
+    with _create_executor(workers, executor) as pool:
+        pending: Deque = deque()
+        max_pending = 4 * workers
+
+        for batch in batches:
+            pending.append(pool.submit(function, batch))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def scan(
+    paths: Iterable[PathLike],
+    workers: Optional[int] = None,
+    errors: str = "raise",
+    on_error: Optional[Callable[[ScanError], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    executor: str = "process",
+    profiler: Optional[Profiler] = None,
+    config: bool = False,
+) -> Iterator[AMMetadata]:
+    """Parse the metadata of all WAV files in the given paths.
+
+    Parameters
+    ----------
+    paths : iterable of PathLike
+        Files or directories. Directories are searched recursively for WAV
+        files.
+    workers : int, optional
+        Number of parallel workers. Defaults to the number of CPUs. With
+        one worker the files are parsed in the calling process.
+    errors : str, optional
+        What to do when a file cannot be parsed. ``"raise"`` (default)
+        raises a :py:class:`ValueError`, ``"skip"`` ignores the file.
+    on_error : callable, optional
+        Called with a :py:class:`ScanError` for every file that could not
+        be parsed, before the ``errors`` policy is applied.
+    batch_size : int, optional
+        Number of files sent to a worker at once.
+    executor : str, optional
+        ``"process"`` (default) or ``"thread"``. Threads avoid the cost of
+        sending results between processes, but parse in a single core.
+    profiler : Profiler, optional
+        Records the time spent in each stage of the parsing of every file.
+        See :py:mod:`metamoth.instrumentation`.
+    config : bool, optional
+        If True, the CONFIG.TXT file of each folder is parsed once and the
+        same configuration object is set as the ``config`` attribute of
+        the metadata of all its recordings. Folders without the file use
+        the one of their nearest parent, up to the scanned directory. See
+        :py:mod:`metamoth.configtxt`.
+
+    Yields
+    ------
+    metadata : AMMetadata
+        The metadata of each recording, in the order the paths were found.
+
+    Raises
+    ------
+    ValueError
+        If a file cannot be parsed and ``errors`` is ``"raise"``.
+    """
+    if errors not in ERROR_MODES:
+        raise ValueError(
+            f"Unknown error mode {errors!r}, expected one of {ERROR_MODES}."
+        )
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    configs = None
+    if config:
+        configs = ConfigCache()
+        paths = _add_roots(paths, configs)
+
+    for result in _iter_results(
+        iter_wav_files(paths),
+        workers=workers,
+        batch_size=batch_size,
+        executor=executor,
+        profiler=profiler,
+    ):
+        if not isinstance(result, ScanError):
+            if configs is not None:
+                result.config = configs.get(result.path)
+            yield result
+            continue
+
+        if on_error is not None:
+            on_error(result)
+
+        if errors == "raise":
+            raise ValueError(
+                f"Could not parse {result.path}: "
+                f"{result.error}: {result.message}"
+            )
@@ -0,0 +1,519 @@
+"""Serialize AudioMoth metadata to plain Python, JSON and tuples.
+
+The metadata objects returned by :py:func:`metamoth.parse_metadata` contain
+values that are not directly serializable, such as datetimes, timezones,
+enums and nested dataclasses. This module converts them to and from plain
+values (strings, numbers, booleans, dicts and tuples).
+
+The conversion of each field is decided once per class and stored in a
+:py:class:`FieldPlan`. Serializing a record then amounts to a single loop
+over the precomputed plan, with no type inspection per value.
+
+Plain values follow these conventions:
+
+* ``datetime`` values are ISO 8601 strings, as produced by
+  :py:meth:`datetime.datetime.isoformat`.
+* ``timezone`` values are UTC offsets in the ``+HH:MM`` format.
+* Enum values are stored by member name, e.g. ``"AM_GAIN_MEDIUM"``.
+* Nested dataclasses (such as ``frequency_filter``) are stored as dicts
+  in the dict and JSON forms, and as tuples in the tuple form.
+* Fields whose metadata has ``"serialize": False`` (such as ``config``)
+  are left out, see :py:func:`get_serialized_fields`.
+"""
+
+import json
+from dataclasses import Field, dataclass, is_dataclass
+from dataclasses import fields as get_fields
+from datetime import datetime as dt
+from datetime import timedelta as td
+from datetime import timezone as tz
+from enum import Enum
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from metamoth.metadata import AMMetadata
+
+__all__ = [
+    "JSON_ENCODER",
+    "FieldPlan",
+    "encode_timezone",
+    "get_field_plan",
+    "get_serialized_fields",
+    "to_dict",
+    "from_dict",
+    "to_tuple",
+    "from_tuple",
+    "to_json",
+    "from_json",
+    "write_jsonl",
+    "read_jsonl",
+    "unwrap_optional",
+]
+
+T = TypeVar("T")
+
+Converter = Callable[[Any], Any]
+
+JSON_ENCODER = json.JSONEncoder(
+    separators=(",", ":"),
+    ensure_ascii=False,
+    check_circular=False,
+)
+"""Encoder of compact JSON, used for the records returned by to_dict."""
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """Precomputed serialization plan for a dataclass.
+
+    Parameters
+    ----------
+    cls : type
+        The dataclass the plan applies to.
+    names : tuple of str
+        The field names, in declaration order.
+    encoders : tuple of callables or None
+        Function converting each field value to a plain value. None if the
+        value is already plain.
+    decoders : tuple of callables or None
+        Function converting each plain value back to the field type. None
+        if the plain value can be used as is.
+    tuple_encoders : tuple of callables or None
+        Same as ``encoders`` but nested dataclasses are encoded as tuples.
+    tuple_decoders : tuple of callables or None
+        Inverse of ``tuple_encoders``.
+    encoders_by_name : dict
+        The ``encoders`` keyed by field name, for partial serialization.
+    """
+
+    cls: type
+    names: Tuple[str, ...]
+    encoders: Tuple[Optional[Converter], ...]
+    decoders: Tuple[Optional[Converter], ...]
+    tuple_encoders: Tuple[Optional[Converter], ...]
+    tuple_decoders: Tuple[Optional[Converter], ...]
+    encoders_by_name: Dict[str, Optional[Converter]]
+
+
+_plans: Dict[type, FieldPlan] = {}
+
+
+def _encode_datetime(value: dt) -> str:
+    return value.isoformat()
+
+
+def encode_timezone(value: tz) -> str:
+    """Convert a timezone to its UTC offset, in the ``+HH:MM`` format.
+
+    Parameters
+    ----------
+    value : datetime.timezone
+
+    Returns
+    -------
+    str
+    """
+    offset = value.utcoffset(None)
+    minutes = int(offset.total_seconds()) // 60  # type: ignore
+    sign = "-" if minutes < 0 else "+"
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+def _decode_timezone(value: str) -> tz:
+    offset = td(hours=int(value[1:3]), minutes=int(value[4:6]))
+    if value[0] == "-":
+        offset = -offset
+    return tz(offset)
+
+
+def unwrap_optional(field_type: Any) -> Any:
+    """Return X if the type is Optional[X], else the type itself.
+
+    Parameters
+    ----------
+    field_type : type
+        Type annotation of a dataclass field.
+
+    Returns
+    -------
+    type
+    """
+    if getattr(field_type, "__origin__", None) is not Union:
+        return field_type
+
+    args = [arg for arg in field_type.__args__ if arg is not type(None)]
+    if len(args) != 1:
+        return field_type
+
+    return args[0]
+
+
+def _get_converters(
+    field_type: Any,
+) -> Tuple[
+    Optional[Converter],
+    Optional[Converter],
+    Optional[Converter],
+    Optional[Converter],
+]:
+    """Return the (encoder, decoder, tuple encoder, tuple decoder)."""
+    field_type = unwrap_optional(field_type)
+
+    if field_type is dt:
+        return (
+            _encode_datetime,
+            dt.fromisoformat,
+            _encode_datetime,
+            dt.fromisoformat,
+        )
+
+    if field_type is tz:
+        return (
+            encode_timezone,
+            _decode_timezone,
+            encode_timezone,
+            _decode_timezone,
+        )
+
+    if isinstance(field_type, type) and issubclass(field_type, Enum):
+        members = field_type.__members__
+        return (
+            _encode_enum,
+            members.__getitem__,
+            _encode_enum,
+            members.__getitem__,
+        )
+
+    if isinstance(field_type, type) and is_dataclass(field_type):
+        nested = field_type
+
+        def decode(value: Dict[str, Any]) -> Any:
+            return from_dict(value, nested)
+
+        def decode_tuple(value: Sequence[Any]) -> Any:
+            return from_tuple(value, nested)
+
+        return to_dict, decode, to_tuple, decode_tuple
+
+    return None, None, None, None
+
+
+def _encode_enum(value: Enum) -> str:
+    return value.name
+
+
+def get_serialized_fields(cls: type) -> Tuple[Field, ...]:
+    """Return the fields of a dataclass that are serialized.
+
+    Fields declared with ``metadata={"serialize": False}``, such as
+    :py:attr:`metamoth.metadata.AMMetadata.config`, are left out.
+
+    Parameters
+    ----------
+    cls : type
+        A dataclass.
+
+    Returns
+    -------
+    tuple of dataclasses.Field
+    """
+    return tuple(
+        field
+        for field in get_fields(cls)
+        if field.metadata.get("serialize", True)
+    )
+
+
+def _build_field_plan(cls: type) -> FieldPlan:
+    names = []
+    encoders = []
+    decoders = []
+    tuple_encoders = []
+    tuple_decoders = []
+
+    for field in get_serialized_fields(cls):
+        encoder, decoder, tuple_encoder, tuple_decoder = _get_converters(
+            field.type
+        )
+        names.append(field.name)
+        encoders.append(encoder)
+        decoders.append(decoder)
+        tuple_encoders.append(tuple_encoder)
+        tuple_decoders.append(tuple_decoder)
+
+    return FieldPlan(
+        cls=cls,
+        names=tuple(names),
+        encoders=tuple(encoders),
+        decoders=tuple(decoders),
+        tuple_encoders=tuple(tuple_encoders),
+        tuple_decoders=tuple(tuple_decoders),
+        encoders_by_name=dict(zip(names, encoders)),
+    )
+
+
+def get_field_plan(cls: type) -> FieldPlan:
+    """Return the serialization plan of a dataclass.
+
+    Plans are built on first use and cached for the lifetime of the
+    process.
+
+    Parameters
+    ----------
+    cls : type
+        A dataclass type.
+
+    Returns
+    -------
+    FieldPlan
+    """
+    plan = _plans.get(cls)
+
+    if plan is None:
+        if not is_dataclass(cls):
+            raise TypeError(f"{cls!r} is not a dataclass.")
+
+        plan = _build_field_plan(cls)
+        _plans[cls] = plan
+
+    return plan
+
+
+def to_dict(
+    obj: Any,
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Convert a metadata object into a dict of plain values.
+
+    Parameters
+    ----------
+    obj : dataclass instance
+        Usually a :py:class:`metamoth.metadata.AMMetadata` object.
+    fields : list of str, optional
+        Only include these fields, in this order. By default all fields are
+        included in declaration order.
+
+    Returns
+    -------
+    dict
+    """
+    plan = get_field_plan(type(obj))
+    data = {}
+
+    if fields is None:
+        for name, encode in zip(plan.names, plan.encoders):
+            value = getattr(obj, name)
+            if encode is not None and value is not None:
+                value = encode(value)
+            data[name] = value
+        return data
+
+    encoders = plan.encoders_by_name
+    for name in fields:
+        value = getattr(obj, name)
+        encode = encoders[name]
+        if encode is not None and value is not None:
+            value = encode(value)
+        data[name] = value
+    return data
+
+
+def from_dict(data: Dict[str, Any], cls: Type[T] = AMMetadata) -> T:
+    """Build a metadata object from a dict of plain values.
+
+    This is the inverse of :py:func:`to_dict`. Fields missing from `data`
+    take their default value, if any.
+
+    Parameters
+    ----------
+    data : dict
+        Plain values, keyed by field name.
+    cls : type, optional
+        The class to build. Defaults to
+        :py:class:`metamoth.metadata.AMMetadata`.
+
+    Returns
+    -------
+    obj : cls
+    """
+    plan = get_field_plan(cls)
+    kwargs = {}
+
+    for name, decode in zip(plan.names, plan.decoders):
+        if name not in data:
+            continue
+
+        value = data[name]
+        if decode is not None and value is not None:
+            value = decode(value)
+        kwargs[name] = value
+
+    return cls(**kwargs)
+
+
+def to_tuple(obj: Any) -> Tuple[Any, ...]:
+    """Convert a metadata object into a tuple of plain values.
+
+    The values are in field declaration order, see
+    :py:attr:`FieldPlan.names`. This is the most compact form and is well
+    suited for CSV rows or database inserts.
+
+    Parameters
+    ----------
+    obj : dataclass instance
+
+    Returns
+    -------
+    tuple
+    """
+    plan = get_field_plan(type(obj))
+    return tuple(
+        value if encode is None or value is None else encode(value)
+        for value, encode in zip(
+            map(obj.__getattribute__, plan.names),
+            plan.tuple_encoders,
+        )
+    )
+
+
+def from_tuple(values: Sequence[Any], cls: Type[T] = AMMetadata) -> T:
+    """Build a metadata object from a tuple of plain values.
+
+    This is the inverse of :py:func:`to_tuple`.
+
+    Parameters
+    ----------
+    values : sequence
+        Plain values in field declaration order.
+    cls : type, optional
+        The class to build. Defaults to
+        :py:class:`metamoth.metadata.AMMetadata`.
+
+    Returns
+    -------
+    obj : cls
+    """
+    plan = get_field_plan(cls)
+
+    if len(values) != len(plan.names):
+        raise ValueError(
+            f"Expected {len(plan.names)} values for {cls.__name__}, "
+            f"got {len(values)}."
+        )
+
+    return cls(
+        *(
+            value if decode is None or value is None else decode(value)
+            for value, decode in zip(values, plan.tuple_decoders)
+        )
+    )
+
+
+def to_json(
+    obj: Any,
+    fields: Optional[Sequence[str]] = None,
+) -> str:
+    """Convert a metadata object into a compact JSON string.
+
+    Parameters
+    ----------
+    obj : dataclass instance
+    fields : list of str, optional
+        Only include these fields. See :py:func:`to_dict`.
+
+    Returns
+    -------
+    str
+    """
+    return JSON_ENCODER.encode(to_dict(obj, fields=fields))
+
+
+def from_json(data: str, cls: Type[T] = AMMetadata) -> T:
+    """Build a metadata object from a JSON string.
+
+    Parameters
+    ----------
+    data : str
+        JSON object as produced by :py:func:`to_json`.
+    cls : type, optional
+        The class to build. Defaults to
+        :py:class:`metamoth.metadata.AMMetadata`.
+
+    Returns
+    -------
+    obj : cls
+    """
+    return from_dict(_JSON_DECODER.decode(data), cls)
+
+
+def write_jsonl(
+    records: Iterable[Any],
+    fp: IO[str],
+    fields: Optional[Sequence[str]] = None,
+) -> int:
+    """Write metadata objects to a text file as JSON Lines.
+
+    Parameters
+    ----------
+    records : iterable
+        Metadata objects to write.
+    fp : file object
+        Open text file.
+    fields : list of str, optional
+        Only include these fields. See :py:func:`to_dict`.
+
+    Returns
+    -------
+    int
+        Number of records written.
+    """
+    encode = JSON_ENCODER.encode
+    write = fp.write
+    count = 0
+    for record in records:
+        write(encode(to_dict(record, fields=fields)))
+        write("\n")
+        count += 1
+    return count
+
+
+def read_jsonl(
+    fp: Iterable[str],
+    cls: Type[T] = AMMetadata,
+) -> Iterator[T]:
+    """Read metadata objects from a JSON Lines file.
+
+    Blank lines are skipped.
+
+    Parameters
+    ----------
+    fp : file object
+        Open text file, or any iterable of lines.
+    cls : type, optional
+        The class to build. Defaults to
+        :py:class:`metamoth.metadata.AMMetadata`.
+
+    Yields
+    ------
+    obj : cls
+    """
+    decode = _JSON_DECODER.decode
+    for line in fp:
+        if not line.strip():
+            continue
+        yield from_dict(decode(line), cls)
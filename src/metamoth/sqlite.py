@@ -0,0 +1,395 @@
+"""Store AudioMoth metadata in a SQLite database.
+
+The metadata is stored in a normalized schema with four tables:
+
+* ``devices``: one row per AudioMoth, identified by its ``audiomoth_id``.
+* ``deployments``: one row per deployment ID, linked to a device.
+* ``configurations``: one row per distinct device configuration, i.e.
+  firmware version, gain, sample rate, filters and triggers.
+* ``recordings``: one row per recording, linked to its device, deployment
+  and configuration.
+
+A ``metadata`` view joins the four tables back into one row per recording.
+
+Records are inserted in batches with ``executemany``, one transaction per
+batch, with the database in WAL mode. Devices, deployments and
+configurations are deduplicated in memory, so inserting a recording whose
+configuration has been seen before costs no lookup in the database.
+Indexes are created when the sink is closed, after the bulk load.
+"""
+
+import itertools
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from metamoth.metadata import AMMetadata
+from metamoth.serialization import encode_timezone
+
+__all__ = [
+    "SQLiteSink",
+]
+
+DEFAULT_BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    audiomoth_id TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS deployments (
+    id INTEGER PRIMARY KEY,
+    deployment_id TEXT NOT NULL UNIQUE,
+    device_id INTEGER REFERENCES devices (id)
+);
+
+CREATE TABLE IF NOT EXISTS configurations (
+    id INTEGER PRIMARY KEY,
+    firmware_version TEXT NOT NULL,
+    gain TEXT NOT NULL,
+    samplerate_hz INTEGER NOT NULL,
+    channels INTEGER NOT NULL,
+    timezone TEXT NOT NULL,
+    external_microphone INTEGER NOT NULL,
+    amplitude_threshold_enabled INTEGER,
+    amplitude_threshold INTEGER,
+    minimum_trigger_duration_s INTEGER,
+    frequency_filter_type TEXT,
+    frequency_filter_lower_frequency_hz INTEGER,
+    frequency_filter_higher_frequency_hz INTEGER,
+    frequency_trigger_enabled INTEGER,
+    frequency_trigger_centre_frequency_hz INTEGER,
+    frequency_trigger_window_length_shift INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    device_id INTEGER NOT NULL REFERENCES devices (id),
+    deployment_id INTEGER REFERENCES deployments (id),
+    configuration_id INTEGER NOT NULL REFERENCES configurations (id),
+    datetime TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    battery_state_v REAL NOT NULL,
+    low_battery INTEGER NOT NULL,
+    temperature_c REAL,
+    recording_state TEXT,
+    comment TEXT NOT NULL
+);
+
+CREATE VIEW IF NOT EXISTS metadata AS
+SELECT
+    recordings.id AS id,
+    recordings.path AS path,
+    devices.audiomoth_id AS audiomoth_id,
+    deployments.deployment_id AS deployment_id,
+    recordings.datetime AS datetime,
+    recordings.duration_s AS duration_s,
+    recordings.samples AS samples,
+    recordings.battery_state_v AS battery_state_v,
+    recordings.low_battery AS low_battery,
+    recordings.temperature_c AS temperature_c,
+    recordings.recording_state AS recording_state,
+    recordings.comment AS comment,
+    configurations.firmware_version AS firmware_version,
+    configurations.gain AS gain,
+    configurations.samplerate_hz AS samplerate_hz,
+    configurations.channels AS channels,
+    configurations.timezone AS timezone,
+    configurations.external_microphone AS external_microphone,
+    configurations.amplitude_threshold_enabled
+        AS amplitude_threshold_enabled,
+    configurations.amplitude_threshold AS amplitude_threshold,
+    configurations.minimum_trigger_duration_s AS minimum_trigger_duration_s,
+    configurations.frequency_filter_type AS frequency_filter_type,
+    configurations.frequency_filter_lower_frequency_hz
+        AS frequency_filter_lower_frequency_hz,
+    configurations.frequency_filter_higher_frequency_hz
+        AS frequency_filter_higher_frequency_hz,
+    configurations.frequency_trigger_enabled AS frequency_trigger_enabled,
+    configurations.frequency_trigger_centre_frequency_hz
+        AS frequency_trigger_centre_frequency_hz,
+    configurations.frequency_trigger_window_length_shift
+        AS frequency_trigger_window_length_shift
+FROM recordings
+JOIN devices ON recordings.device_id = devices.id
+LEFT JOIN deployments ON recordings.deployment_id = deployments.id
+JOIN configurations ON recordings.configuration_id = configurations.id;
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS recordings_path ON recordings (path);
+CREATE INDEX IF NOT EXISTS recordings_datetime ON recordings (datetime);
+CREATE INDEX IF NOT EXISTS recordings_device
+    ON recordings (device_id, datetime);
+CREATE INDEX IF NOT EXISTS recordings_deployment
+    ON recordings (deployment_id);
+CREATE INDEX IF NOT EXISTS recordings_configuration
+    ON recordings (configuration_id);
+"""
+
+INSERT_DEVICE = "INSERT INTO devices (id, audiomoth_id) VALUES (?, ?)"
+
+INSERT_DEPLOYMENT = (
+    "INSERT INTO deployments (id, deployment_id, device_id) VALUES (?, ?, ?)"
+)
+
+INSERT_CONFIGURATION = (
+    "INSERT INTO configurations ("
+    "id, firmware_version, gain, samplerate_hz, channels, timezone, "
+    "external_microphone, amplitude_threshold_enabled, amplitude_threshold, "
+    "minimum_trigger_duration_s, frequency_filter_type, "
+    "frequency_filter_lower_frequency_hz, "
+    "frequency_filter_higher_frequency_hz, frequency_trigger_enabled, "
+    "frequency_trigger_centre_frequency_hz, "
+    "frequency_trigger_window_length_shift"
+    ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+INSERT_RECORDING = (
+    "INSERT INTO recordings ("
+    "path, device_id, deployment_id, configuration_id, datetime, "
+    "duration_s, samples, battery_state_v, low_battery, temperature_c, "
+    "recording_state, comment"
+    ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _get_configuration(record: AMMetadata) -> Tuple[Any, ...]:
+    """Return the configuration of a record as a hashable tuple.
+
+    Values are not encoded yet, so that repeated configurations can be
+    looked up without any conversion.
+    """
+    threshold = record.amplitude_threshold
+    frequency_filter = record.frequency_filter
+    trigger = record.frequency_trigger
+    return (
+        record.firmware_version,
+        record.gain,
+        record.samplerate_hz,
+        record.channels,
+        record.timezone,
+        record.external_microphone,
+        None if threshold is None else threshold.enabled,
+        None if threshold is None else threshold.threshold,
+        record.minimum_trigger_duration_s,
+        None if frequency_filter is None else frequency_filter.type,
+        None
+        if frequency_filter is None
+        else frequency_filter.lower_frequency_hz,
+        None
+        if frequency_filter is None
+        else frequency_filter.higher_frequency_hz,
+        None if trigger is None else trigger.enabled,
+        None if trigger is None else trigger.centre_frequency_hz,
+        None if trigger is None else trigger.window_length_shift,
+    )
+
+
+def _encode_configuration(configuration: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """Return the configuration columns, without the id."""
+    values = list(configuration)
+    values[1] = values[1].name
+    values[4] = encode_timezone(values[4])
+    if values[9] is not None:
+        values[9] = values[9].name
+    return tuple(values)
+
+
+def _counter(ids: Dict[Any, int]) -> Iterator[int]:
+    """Return an iterator over the ids following the existing ones."""
+    return itertools.count(max(ids.values(), default=0) + 1)
+
+
+class SQLiteSink:
+    """Bulk insert metadata objects into a SQLite database.
+
+    The database and its tables are created if they do not exist. Writing
+    to an existing database appends to it.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database file.
+    batch_size : int, optional
+        Number of records inserted per transaction.
+
+    Examples
+    --------
+    >>> with SQLiteSink("metadata.db") as sink:
+    ...     sink.write(records)
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Open the database and create the schema."""
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer: List[AMMetadata] = []
+        self._connection = sqlite3.connect(str(path), isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._load_ids()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return the underlying database connection."""
+        return self._connection
+
+    def _load_ids(self) -> None:
+        """Load the ids of the devices, deployments and configurations."""
+        execute = self._connection.execute
+        self._devices: Dict[str, int] = dict(
+            execute("SELECT audiomoth_id, id FROM devices")
+        )
+        self._deployments: Dict[str, int] = dict(
+            execute("SELECT deployment_id, id FROM deployments")
+        )
+        self._configurations: Dict[Tuple[Any, ...], int] = {
+            tuple(row[1:]): row[0]
+            for row in execute("SELECT * FROM configurations")
+        }
+        self._configuration_keys: Dict[Tuple[Any, ...], int] = {}
+        self._next_device_id = _counter(self._devices)
+        self._next_deployment_id = _counter(self._deployments)
+        self._next_configuration_id = _counter(self._configurations)
+
+    def write(self, records: Iterable[AMMetadata]) -> int:
+        """Write metadata objects to the database.
+
+        Records are buffered and inserted every ``batch_size`` records.
+
+        Parameters
+        ----------
+        records : iterable of AMMetadata
+
+        Returns
+        -------
+        int
+            Number of records received.
+        """
+        count = 0
+        for record in records:
+            self._buffer.append(record)
+            count += 1
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+        return count
+
+    def flush(self) -> None:
+        """Insert the buffered records in a single transaction."""
+        if not self._buffer:
+            return
+
+        devices = self._devices
+        deployments = self._deployments
+        configurations = self._configurations
+        configuration_keys = self._configuration_keys
+        new_devices = []
+        new_deployments = []
+        new_configurations = []
+        recordings = []
+
+        for record in self._buffer:
+            device_id = devices.get(record.audiomoth_id)
+            if device_id is None:
+                device_id = next(self._next_device_id)
+                devices[record.audiomoth_id] = device_id
+                new_devices.append((device_id, record.audiomoth_id))
+
+            deployment_id: Optional[int] = None
+            if record.deployment_id is not None:
+                deployment_id = deployments.get(record.deployment_id)
+                if deployment_id is None:
+                    deployment_id = next(self._next_deployment_id)
+                    deployments[record.deployment_id] = deployment_id
+                    new_deployments.append(
+                        (deployment_id, record.deployment_id, device_id)
+                    )
+
+            key = _get_configuration(record)
+            configuration_id = configuration_keys.get(key)
+            if configuration_id is None:
+                configuration = _encode_configuration(key)
+                configuration_id = configurations.get(configuration)
+                if configuration_id is None:
+                    configuration_id = next(self._next_configuration_id)
+                    configurations[configuration] = configuration_id
+                    new_configurations.append(
+                        (configuration_id, *configuration)
+                    )
+                configuration_keys[key] = configuration_id
+
+            recordings.append(
+                (
+                    record.path,
+                    device_id,
+                    deployment_id,
+                    configuration_id,
+                    record.datetime.isoformat(),
+                    record.duration_s,
+                    record.samples,
+                    record.battery_state_v,
+                    record.low_battery,
+                    record.temperature_c,
+                    None
+                    if record.recording_state is None
+                    else record.recording_state.name,
+                    record.comment,
+                )
+            )
+
+        try:
+            with self._transaction():
+                executemany = self._connection.executemany
+                if new_devices:
+                    executemany(INSERT_DEVICE, new_devices)
+                if new_deployments:
+                    executemany(INSERT_DEPLOYMENT, new_deployments)
+                if new_configurations:
+                    executemany(INSERT_CONFIGURATION, new_configurations)
+                executemany(INSERT_RECORDING, recordings)
+        except sqlite3.Error:
+            # The new ids were rolled back, forget them.
+            self._load_ids()
+            raise
+
+        self.count += len(self._buffer)
+        self._buffer = []
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run the enclosed statements in a single transaction."""
+        self._connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def create_indexes(self) -> None:
+        """Create the indexes of the recordings table.
+
+        This is done automatically on :py:meth:`close`. Creating the indexes
+        after the bulk load is much faster than updating them on every
+        insert.
+        """
+        self._connection.executescript(INDEXES)
+
+    def close(self) -> None:
+        """Flush the remaining records, create indexes and close."""
+        self.flush()
+        self.create_indexes()
+        self._connection.close()
+
+    def __enter__(self) -> "SQLiteSink":
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the database on exit."""
+        self.close()
@@ -0,0 +1,180 @@
+"""Parse the metadata of a recording read from a forward-only stream.
+
+:py:func:`metamoth.parse_metadata` seeks to the position of each chunk,
+which needs a file on disk. :py:func:`parse_stream` only calls ``read``,
+so the recording can come from a pipe, a socket, ``sys.stdin.buffer`` or
+the body of an HTTP response::
+
+    with urllib.request.urlopen(url) as response:
+        metadata = parse_stream(response, path=url)
+
+The chunks are consumed in the order of the stream. Parsing stops as soon
+as the fmt chunk, the comment and the header of the data chunk have been
+read, and the stream is left at the start of the audio data, which can
+then be copied elsewhere. The audio is never buffered: chunks of no
+interest, and the audio data when the comment comes after it, are
+discarded in blocks of :py:data:`SKIP_BLOCK_SIZE` bytes.
+"""
+
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from metamoth.artist import MAX_ARTIST_LENGTH, get_audiomoth_id_from_artist
+from metamoth.chunks import read_info_texts
+from metamoth.mediainfo import build_media_info, unpack_samplerate_and_channels
+from metamoth.metadata import AMMetadata, assemble_metadata
+from metamoth.parsing import MAX_COMMENT_SIZE, CommentParser, parse_comment
+
+__all__ = [
+    "parse_stream",
+]
+
+SKIP_BLOCK_SIZE = 65536
+"""Size of the reads used to discard data."""
+
+MAX_LIST_SIZE = 65536
+"""Maximum number of bytes of a LIST chunk kept in memory."""
+
+MAX_FMT_SIZE = 64
+"""Maximum number of bytes of a fmt chunk kept in memory."""
+
+_text_sizes = {"ICMT": MAX_COMMENT_SIZE, "IART": MAX_ARTIST_LENGTH}
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Read exactly size bytes, unless the stream ends before.
+
+    Pipes and sockets may return fewer bytes than requested.
+    """
+    data = stream.read(size)
+    if data is None or len(data) == size:
+        return data or b""
+
+    parts = [data]
+    remaining = size - len(data)
+    while remaining and data:
+        data = stream.read(remaining)
+        if data:
+            parts.append(data)
+            remaining -= len(data)
+    return b"".join(parts)
+
+
+def _skip(stream: BinaryIO, size: int, buffer: bytearray) -> None:
+    """Discard size bytes of the stream, reusing the same buffer."""
+    view = memoryview(buffer)
+    while size > 0:
+        count = stream.readinto(view[: min(size, len(buffer))])  # type: ignore
+        if not count:
+            raise ValueError("The stream ended inside a chunk.")
+        size -= count
+
+
+def _read_chunk_data(
+    stream: BinaryIO,
+    size: int,
+    limit: int,
+    buffer: bytearray,
+) -> bytes:
+    """Return at most limit bytes of the chunk data, skipping the rest."""
+    data = _read_exact(stream, min(size, limit))
+    if len(data) < min(size, limit):
+        raise ValueError("The stream ended inside a chunk.")
+    _skip(stream, size - len(data) + (size & 1), buffer)
+    return data
+
+
+def _read_header(
+    stream: BinaryIO,
+) -> Tuple[Tuple[int, int], Dict[str, str], int]:
+    """Read the chunks of the stream up to the metadata.
+
+    Returns the sample rate and channels, the texts of the LIST chunk and
+    the size of the data chunk.
+    """
+    riff = _read_exact(stream, 12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:] != b"WAVE":
+        raise ValueError("Not a WAV file.")
+
+    buffer = bytearray(SKIP_BLOCK_SIZE)
+    fmt: Optional[Tuple[int, int]] = None
+    texts: Dict[str, str] = {}
+    data_size: Optional[int] = None
+
+    while fmt is None or "ICMT" not in texts or data_size is None:
+        header = _read_exact(stream, 8)
+        if len(header) < 8:
+            break
+
+        chunk_id = header[:4]
+        size = int.from_bytes(header[4:], "little")
+
+        if chunk_id == b"fmt ":
+            fmt = unpack_samplerate_and_channels(
+                _read_chunk_data(stream, size, MAX_FMT_SIZE, buffer)
+            )
+        elif chunk_id == b"LIST":
+            texts.update(
+                read_info_texts(
+                    _read_chunk_data(stream, size, MAX_LIST_SIZE, buffer)[4:],
+                    _text_sizes,
+                )
+            )
+        elif chunk_id == b"data":
+            data_size = size
+            if fmt is None or "ICMT" not in texts:
+                _skip(stream, size + (size & 1), buffer)
+        else:
+            _skip(stream, size + (size & 1), buffer)
+
+    if fmt is None:
+        raise ValueError("No fmt chunk found.")
+
+    if data_size is None:
+        raise ValueError("No data chunk found.")
+
+    if "ICMT" not in texts:
+        raise ValueError("No ICMT chunk found.")
+
+    return fmt, texts, data_size
+
+
+def parse_stream(
+    stream: BinaryIO,
+    path: str = "<stream>",
+    comment_parser: Optional[CommentParser] = None,
+) -> AMMetadata:
+    """Parse the metadata of an AudioMoth recording from a stream.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+        Binary stream positioned at the start of the WAV file. Only its
+        ``read`` and ``readinto`` methods are used.
+    path : str, optional
+        Path reported in the metadata.
+    comment_parser : CommentParser, optional
+        Parser of the comment string, see
+        :py:func:`metamoth.parse_metadata`.
+
+    Returns
+    -------
+    AMMetadata
+
+    Raises
+    ------
+    ValueError
+        If the stream is not a WAV file, or ends before the metadata.
+    """
+    (samplerate, channels), texts, data_size = _read_header(stream)
+    media_info = build_media_info(samplerate, channels, data_size)
+
+    if comment_parser is None:
+        am_metadata = parse_comment(texts["ICMT"])
+    else:
+        am_metadata = comment_parser.parse(texts["ICMT"])
+
+    artist = texts.get("IART")
+    if artist is not None:
+        artist = get_audiomoth_id_from_artist(artist)
+
+    return assemble_metadata(path, media_info, am_metadata, artist)
@@ -0,0 +1,181 @@
+"""Sort candidate files into WAV, AudioMoth, corrupt and other files.
+
+SD card dumps mix recordings with logs and junk. Checking each file with
+:py:func:`metamoth.audio.is_riff`, :py:func:`metamoth.audio.is_wav` and
+then :py:func:`metamoth.parse_metadata` opens it up to three times.
+:py:func:`triage` opens each file once and reads its first
+:py:data:`TRIAGE_READ_SIZE` bytes, which hold the whole header of an
+AudioMoth recording. The same bytes are parsed into the metadata of the
+AudioMoth recordings, so they are not read again::
+
+    for result in triage(paths):
+        if result.kind == FileKind.AUDIOMOTH:
+            print(result.path, result.metadata.datetime)
+
+Files are classified as:
+
+* :py:attr:`FileKind.NOT_WAV`: not a RIFF WAVE file.
+* :py:attr:`FileKind.CORRUPT`: a WAV file whose chunks cannot be read, a
+  file with a WAV extension and a zeroed header, or a file that could not
+  be opened.
+* :py:attr:`FileKind.WAV`: a valid WAV file without an AudioMoth comment.
+* :py:attr:`FileKind.AUDIOMOTH`: an AudioMoth recording.
+"""
+
+import io
+import os
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Union
+
+from metamoth.artist import get_am_artist
+from metamoth.audio import is_wav_filename
+from metamoth.chunks import parse_into_chunks
+from metamoth.comments import get_am_comment
+from metamoth.enums import FileKind
+from metamoth.mediainfo import get_media_info
+from metamoth.metadata import AMMetadata, assemble_metadata
+from metamoth.parsing import CommentParser, MessageFormatError
+from metamoth.scan import DEFAULT_BATCH_SIZE, batched, map_batches
+
+__all__ = [
+    "TRIAGE_READ_SIZE",
+    "TriageResult",
+    "triage",
+    "triage_file",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+TRIAGE_READ_SIZE = 4096
+"""Number of bytes read from each file."""
+
+# Shared by all the batches triaged in a process.
+_comment_parser = CommentParser()
+
+
+@dataclass
+class TriageResult:
+    """Kind of a file, with its metadata if it is an AudioMoth recording."""
+
+    path: str
+    """Path to the file."""
+
+    kind: FileKind
+    """Kind of the file."""
+
+    metadata: Optional[AMMetadata] = None
+    """Metadata of AudioMoth recordings, None for other files."""
+
+    reason: Optional[str] = None
+    """Why a file is corrupt or is not an AudioMoth recording."""
+
+
+def _classify(
+    path: str,
+    header: bytes,
+    comment_parser: CommentParser,
+) -> TriageResult:
+    """Classify a file from its first bytes."""
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        if is_wav_filename(path) and header and not header.strip(b"\x00"):
+            return TriageResult(path, FileKind.CORRUPT, reason="Zeroed header")
+        return TriageResult(path, FileKind.NOT_WAV)
+
+    wav = io.BytesIO(header)
+    try:
+        riff = parse_into_chunks(wav)
+        media_info = get_media_info(wav, riff)
+    except (ValueError, KeyError, ZeroDivisionError) as error:
+        return TriageResult(
+            path,
+            FileKind.CORRUPT,
+            reason=f"{type(error).__name__}: {error}",
+        )
+
+    try:
+        comment = get_am_comment(wav, riff)
+        artist = get_am_artist(wav, riff)
+        comment_metadata = comment_parser.parse(comment)
+    except (ValueError, MessageFormatError) as error:
+        return TriageResult(path, FileKind.WAV, reason=str(error))
+
+    metadata = assemble_metadata(path, media_info, comment_metadata, artist)
+    return TriageResult(path, FileKind.AUDIOMOTH, metadata=metadata)
+
+
+def triage_file(
+    path: PathLike,
+    comment_parser: Optional[CommentParser] = None,
+) -> TriageResult:
+    """Classify a file with one open and one read.
+
+    Parameters
+    ----------
+    path : PathLike
+    comment_parser : CommentParser, optional
+        Parser of the comment string, see
+        :py:func:`metamoth.parse_metadata`.
+
+    Returns
+    -------
+    TriageResult
+    """
+    path = os.fspath(path)
+    try:
+        with open(path, "rb", buffering=0) as candidate:
+            header = candidate.read(TRIAGE_READ_SIZE)
+    except OSError as error:
+        return TriageResult(
+            path,
+            FileKind.CORRUPT,
+            reason=f"{type(error).__name__}: {error}",
+        )
+
+    return _classify(path, header, comment_parser or _comment_parser)
+
+
+def _triage_batch(paths: List[PathLike]) -> List[TriageResult]:
+    return [triage_file(path) for path in paths]
+
+
+def triage(
+    paths: Iterable[PathLike],
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    executor: str = "process",
+) -> Iterator[TriageResult]:
+    """Classify many files in parallel.
+
+    Parameters
+    ----------
+    paths : iterable of PathLike
+        Files to classify. Directories are not walked, see
+        :py:func:`metamoth.scan.iter_wav_files`.
+    workers : int, optional
+        Number of parallel workers. Defaults to the number of CPUs. With
+        one worker the files are classified in the calling process.
+    batch_size : int, optional
+        Number of files sent to a worker at once.
+    executor : str, optional
+        ``"process"`` (default) or ``"thread"``, see
+        :py:func:`metamoth.scan.scan`.
+
+    Yields
+    ------
+    result : TriageResult
+        The kind of each file, in the order of the paths.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        yield from map(triage_file, paths)
+        return
+
+    for results in map_batches(
+        _triage_batch,
+        batched(paths, batch_size),
+        workers,
+        executor,
+    ):
+        yield from results
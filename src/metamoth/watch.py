@@ -0,0 +1,385 @@
+"""Incrementally index recordings as they arrive in a directory.
+
+A :py:class:`Watcher` polls a directory tree for new WAV files, for example
+a landing directory that SD cards are synced into. Each poll only lists the
+directories whose modification time changed since they were last listed,
+so the cost of an idle poll is one ``stat`` call per directory.
+
+A file is only reported once its size and modification time did not change
+between two consecutive polls, so files that are still being copied are
+never parsed. Files whose change time is older than a persisted high-water
+mark were already indexed and are skipped without being opened.
+"""
+
+import json
+import os
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from metamoth.audio import is_wav_filename
+from metamoth.metadata import AMMetadata
+from metamoth.scan import ERROR_MODES, ScanError, parse_batch
+
+__all__ = [
+    "Watcher",
+    "watch",
+]
+
+PathLike = Union[os.PathLike, str]  # pylint: disable=no-member
+
+DEFAULT_INTERVAL_S = 5.0
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Directories modified this recently are listed again on the next poll, in
+# case files were added within the resolution of the filesystem clock.
+_RECENT_NS = 2_000_000_000
+
+Observation = Tuple[int, int, int]
+"""Size, modification time and change time of a file."""
+
+
+def _observe(stat: os.stat_result) -> Observation:
+    return (
+        stat.st_size,
+        stat.st_mtime_ns,
+        max(stat.st_mtime_ns, stat.st_ctime_ns),
+    )
+
+
+class Watcher:
+    """Find new, completely written WAV files in a directory tree.
+
+    Parameters
+    ----------
+    directory : PathLike
+        Root of the directory tree to watch.
+    state_path : PathLike, optional
+        File where the high-water mark and the listed directories are
+        persisted, so that restarting the watcher neither reports files
+        that were already indexed nor lists the whole tree again. If not
+        given, the state is kept in memory only.
+    max_attempts : int, optional
+        Number of polls in which a file that could not be parsed is
+        reported again, before it is given up.
+    """
+
+    def __init__(
+        self,
+        directory: PathLike,
+        state_path: Optional[PathLike] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        """Initialize the watcher and load the persisted state."""
+        self.directory = os.fspath(directory)
+        self.state_path = (
+            None if state_path is None else os.fspath(state_path)
+        )
+        self.max_attempts = max_attempts
+        self.high_water_mark_ns = 0
+        self._indexed: Dict[str, int] = {}
+        self._pending: Dict[str, Observation] = {}
+        self._failures: Dict[str, int] = {}
+        self._directories: Dict[str, Tuple[int, int]] = {}
+        self._load_state()
+
+    def _load_state(self) -> None:
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return
+
+        with open(self.state_path, "r", encoding="utf-8") as fp:
+            state = json.load(fp)
+
+        self.high_water_mark_ns = state["high_water_mark_ns"]
+        self._indexed = state["indexed"]
+        self._pending = {
+            path: tuple(observation)  # type: ignore
+            for path, observation in state.get("pending", {}).items()
+        }
+        self._directories = {
+            directory: tuple(times)  # type: ignore
+            for directory, times in state.get("directories", {}).items()
+        }
+        self._failures = state.get("failures", {})
+
+    def save_state(self) -> None:
+        """Persist the high-water mark to the state file.
+
+        The modification times of the listed directories and the pending
+        files are saved too, so that a restarted watcher only lists the
+        directories that changed.
+        """
+        if self.state_path is None:
+            return
+
+        temporary = f"{self.state_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as fp:
+            json.dump(
+                {
+                    "high_water_mark_ns": self.high_water_mark_ns,
+                    "indexed": self._indexed,
+                    "pending": self._pending,
+                    "directories": self._directories,
+                    "failures": self._failures,
+                },
+                fp,
+            )
+        os.replace(temporary, self.state_path)
+
+    def poll(self) -> List[str]:
+        """Return the files that are ready to be indexed.
+
+        Files are ready when they were already seen in the previous poll
+        with the same size and modification time. The returned files must
+        be passed to :py:meth:`mark_indexed` once processed, otherwise they
+        are reported again.
+
+        Returns
+        -------
+        paths : list of str
+            Paths of the files ready to be indexed, sorted.
+        """
+        ready = self._check_pending()
+
+        for directory in self._find_changed_directories():
+            self._list_directory(directory)
+
+        return sorted(ready)
+
+    def _check_pending(self) -> List[str]:
+        """Return the pending files whose size did not change."""
+        ready = []
+        for path, previous in list(self._pending.items()):
+            try:
+                current = _observe(os.stat(path))
+            except FileNotFoundError:
+                del self._pending[path]
+                self._failures.pop(path, None)
+                continue
+
+            if current == previous:
+                ready.append(path)
+            else:
+                # A modified file gets all its attempts again.
+                self._pending[path] = current
+                self._failures.pop(path, None)
+        return ready
+
+    def _find_changed_directories(self) -> List[str]:
+        """Return the directories whose contents may have changed."""
+        if not self._directories:
+            return [self.directory]
+
+        changed = []
+        for directory, (mtime_ns, listed_ns) in list(
+            self._directories.items()
+        ):
+            try:
+                current_ns = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                del self._directories[directory]
+                continue
+
+            if current_ns != mtime_ns or listed_ns - mtime_ns < _RECENT_NS:
+                changed.append(directory)
+        return changed
+
+    def _list_directory(self, directory: str) -> None:
+        """List a directory, recording new candidate files and folders."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+            iterator = os.scandir(directory)
+        except FileNotFoundError:
+            self._directories.pop(directory, None)
+            return
+
+        self._directories[directory] = (mtime_ns, time.time_ns())
+
+        new_directories = []
+        with iterator:
+            for entry in iterator:
+                if entry.name.startswith("."):
+                    # Temporary files of rsync and hidden folders.
+                    continue
+
+                if entry.is_dir():
+                    if entry.path not in self._directories:
+                        new_directories.append(entry.path)
+                    continue
+
+                if not is_wav_filename(entry.name):
+                    continue
+
+                path = entry.path
+                if path in self._pending or path in self._indexed:
+                    continue
+
+                try:
+                    observation = _observe(entry.stat())
+                except FileNotFoundError:
+                    continue
+
+                if observation[2] <= self.high_water_mark_ns:
+                    continue
+
+                self._pending[path] = observation
+
+        for new_directory in new_directories:
+            self._list_directory(new_directory)
+
+    def mark_indexed(self, paths: List[str]) -> None:
+        """Mark files as indexed and advance the high-water mark.
+
+        Parameters
+        ----------
+        paths : list of str
+            Files returned by :py:meth:`poll` that have been processed.
+        """
+        for path in paths:
+            self._failures.pop(path, None)
+            observation = self._pending.pop(path, None)
+            if observation is not None:
+                self._indexed[path] = observation[2]
+
+        if not self._indexed:
+            return
+
+        # All files up to the high-water mark must be indexed, so it can
+        # not move past a file that is still pending.
+        high_water_mark = max(self._indexed.values())
+        if self._pending:
+            high_water_mark = min(
+                high_water_mark,
+                min(observation[2] for observation in self._pending.values())
+                - 1,
+            )
+
+        if high_water_mark <= self.high_water_mark_ns:
+            return
+
+        self.high_water_mark_ns = high_water_mark
+        self._indexed = {
+            path: change_ns
+            for path, change_ns in self._indexed.items()
+            if change_ns > high_water_mark
+        }
+
+    def mark_failed(self, paths: List[str]) -> None:
+        """Mark files that could not be processed.
+
+        The files stay pending and are reported again by the next poll,
+        until they failed ``max_attempts`` times. They are then given up
+        and treated as indexed, so they do not hold back the high-water
+        mark.
+
+        Parameters
+        ----------
+        paths : list of str
+            Files returned by :py:meth:`poll` that could not be processed.
+        """
+        given_up = []
+        for path in paths:
+            failures = self._failures.get(path, 0) + 1
+            if failures < self.max_attempts:
+                self._failures[path] = failures
+            else:
+                given_up.append(path)
+
+        self.mark_indexed(given_up)
+
+    @property
+    def pending(self) -> Set[str]:
+        """Return the files waiting for their size to settle."""
+        return set(self._pending)
+
+
+def watch(
+    directory: PathLike,
+    state_path: Optional[PathLike] = None,
+    interval: float = DEFAULT_INTERVAL_S,
+    errors: str = "skip",
+    on_error: Optional[Callable[[ScanError], None]] = None,
+    max_polls: Optional[int] = None,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> Iterator[AMMetadata]:
+    """Parse new recordings as they appear in a directory.
+
+    This generator runs forever, unless ``max_polls`` is given. The
+    high-water mark is saved after each poll, once the consumer has
+    received all the metadata of that poll.
+
+    Parameters
+    ----------
+    directory : PathLike
+        Root of the directory tree to watch.
+    state_path : PathLike, optional
+        File where the high-water mark is persisted between runs.
+    interval : float, optional
+        Seconds to wait between polls.
+    errors : str, optional
+        ``"skip"`` (default) ignores files that cannot be parsed,
+        ``"raise"`` raises a :py:class:`ValueError`.
+    on_error : callable, optional
+        Called with a :py:class:`metamoth.scan.ScanError` for every file
+        that could not be parsed.
+    max_polls : int, optional
+        Stop after this number of polls.
+    max_attempts : int, optional
+        Number of polls in which a file that could not be parsed is
+        retried, see :py:class:`Watcher`.
+
+    Yields
+    ------
+    metadata : AMMetadata
+    """
+    if errors not in ERROR_MODES:
+        raise ValueError(
+            f"Unknown error mode {errors!r}, expected one of {ERROR_MODES}."
+        )
+
+    watcher = Watcher(
+        directory,
+        state_path=state_path,
+        max_attempts=max_attempts,
+    )
+    polls = 0
+
+    while True:
+        paths = watcher.poll()
+        failed = set()
+
+        for result in parse_batch(paths):
+            if not isinstance(result, ScanError):
+                yield result
+                continue
+
+            failed.add(result.path)
+
+            if on_error is not None:
+                on_error(result)
+
+            if errors == "raise":
+                raise ValueError(
+                    f"Could not parse {result.path}: "
+                    f"{result.error}: {result.message}"
+                )
+
+        # Failed files stay pending, and are retried by the next polls.
+        watcher.mark_failed(sorted(failed))
+        watcher.mark_indexed([path for path in paths if path not in failed])
+        watcher.save_state()
+
+        polls += 1
+        if max_polls is not None and polls >= max_polls:
+            return
+
+        time.sleep(interval)
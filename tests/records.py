@@ -0,0 +1,193 @@
+"""Functions to build metadata records for tests."""
+
+import datetime
+import os
+import struct
+from typing import Optional
+
+from metamoth.config import Config1_0, Config1_6_0
+from metamoth.enums import BatteryState, ExtendedBatteryState, RecordingState
+from metamoth.mediainfo import MediaInfo
+from metamoth.metadata import AMMetadata, assemble_metadata
+from metamoth.parsing import parse_comment
+
+from .firmwares import generate_comment_v1_0, generate_comment_v1_6_0
+
+COMMENT_LENGTH = 384
+
+
+def make_header(
+    comment: str,
+    samplerate_hz: int = 48000,
+    channels: int = 1,
+    samples: int = 48000,
+    artist: Optional[str] = None,
+) -> bytes:
+    """Build the header of an AudioMoth WAV file, up to the data chunk.
+
+    The comment is null padded to 384 bytes, as done by the AudioMoth
+    firmware.
+    """
+    fmt = struct.pack(
+        "<HHIIHH",
+        1,
+        channels,
+        samplerate_hz,
+        samplerate_hz * channels * 2,
+        channels * 2,
+        16,
+    )
+    encoded = comment.encode("utf-8")
+    length = max(COMMENT_LENGTH, len(encoded) + 4)
+    info = b"INFO" + b"ICMT" + struct.pack("<I", length)
+    info += encoded.ljust(length, b"\x00")
+
+    if artist is not None:
+        encoded = artist.encode("utf-8").ljust(32, b"\x00")
+        info += b"IART" + struct.pack("<I", len(encoded)) + encoded
+
+    data_size = samples * channels * 2
+    chunks = (
+        b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + b"LIST"
+        + struct.pack("<I", len(info))
+        + info
+        + b"data"
+        + struct.pack("<I", data_size)
+    )
+    return (
+        b"RIFF"
+        + struct.pack("<I", 4 + len(chunks) + data_size)
+        + (b"WAVE" + chunks)
+    )
+
+
+def write_recording(
+    path: "os.PathLike[str]",
+    comment: str,
+    samplerate_hz: int = 48000,
+    channels: int = 1,
+    samples: int = 48000,
+    artist: Optional[str] = None,
+) -> None:
+    """Write an AudioMoth WAV file with silent audio."""
+    header = make_header(
+        comment,
+        samplerate_hz=samplerate_hz,
+        channels=channels,
+        samples=samples,
+        artist=artist,
+    )
+    with open(path, "wb") as wav:
+        wav.write(header)
+        wav.write(bytes(samples * channels * 2))
+
+
+def _flac_block(block_type: int, data: bytes, last: bool = False) -> bytes:
+    header = (last << 31) | (block_type << 24) | len(data)
+    return struct.pack(">I", header) + data
+
+
+def make_flac(
+    comment: str,
+    samplerate_hz: int = 48000,
+    channels: int = 1,
+    samples: int = 48000,
+    artist: Optional[str] = None,
+    riff: bool = True,
+    vorbis: bool = False,
+) -> bytes:
+    """Build a FLAC file converted from an AudioMoth recording.
+
+    The comment is kept in preserved RIFF chunks, as done by ``flac
+    --keep-foreign-metadata``, and/or in a Vorbis comment. The metadata
+    blocks are followed by junk instead of encoded audio frames.
+    """
+    packed = (
+        (samplerate_hz << 44) | ((channels - 1) << 41) | (15 << 36) | samples
+    )
+    streaminfo = struct.pack(">HH3s3sQ", 4096, 4096, b"", b"", packed)
+    blocks = [
+        _flac_block(0, streaminfo + bytes(16)),
+        _flac_block(3, bytes(18)),
+    ]
+
+    if riff:
+        header = make_header(
+            comment,
+            samplerate_hz=samplerate_hz,
+            channels=channels,
+            samples=samples,
+            artist=artist,
+        )
+        blocks.append(_flac_block(2, b"riff" + header))
+
+    if vorbis:
+        entries = [f"COMMENT={comment}".encode("utf-8")]
+        if artist is not None:
+            entries.append(f"ARTIST={artist}".encode("utf-8"))
+        data = struct.pack("<I", 6) + b"vendor"
+        data += struct.pack("<I", len(entries))
+        for entry in entries:
+            data += struct.pack("<I", len(entry)) + entry
+        blocks.append(_flac_block(4, data))
+
+    blocks.append(_flac_block(1, bytes(64), last=True))
+    return b"fLaC" + b"".join(blocks) + b"\xff\xf8" + bytes(1000)
+
+
+def make_comment_1_6_0() -> str:
+    """Build a 1.6.0 comment with filter and amplitude threshold."""
+    return generate_comment_v1_6_0(
+        time=datetime.datetime(2022, 5, 1, 10, 30, 0),
+        serial_number=0x243B1F055B2BF663,
+        extended_battery_state=ExtendedBatteryState.AM_EXT_BAT_4V1,
+        config=Config1_6_0(
+            timezone_hours=-3,
+            timezone_minutes=0,
+            lower_filter_freq=8000,
+            higher_filter_freq=24000,
+            amplitude_threshold=200,
+            minimum_trigger_duration=5,
+        ),
+        recording_state=RecordingState.FILE_SIZE_LIMITED,
+        temperature=21.5,
+        deployment_id=None,
+        external_microphone=True,
+    )
+
+
+def make_comment_1_0() -> str:
+    """Build a 1.0 comment."""
+    return generate_comment_v1_0(
+        time=datetime.datetime(2018, 4, 6, 19, 17, 30),
+        serial_number=0x0FE081F80FE081F0,
+        battery_state=BatteryState.AM_BATTERY_4V5,
+        config=Config1_0(),
+    )
+
+
+def make_metadata_1_6_0(path: str = "recording.wav") -> AMMetadata:
+    """Build the metadata of a 1.6.0 recording with all fields set."""
+    comment = make_comment_1_6_0()
+    media_info = MediaInfo(
+        samplerate_hz=48000,
+        duration_s=60.0,
+        samples=2880000,
+        channels=1,
+    )
+    return assemble_metadata(path, media_info, parse_comment(comment), None)
+
+
+def make_metadata_1_0(path: str = "old.wav") -> AMMetadata:
+    """Build the metadata of a 1.0 recording with most fields unset."""
+    comment = make_comment_1_0()
+    media_info = MediaInfo(
+        samplerate_hz=192000,
+        duration_s=20.0,
+        samples=3840000,
+        channels=1,
+    )
+    return assemble_metadata(path, media_info, parse_comment(comment), None)
@@ -0,0 +1,90 @@
+"""Test the parsing of recordings inside archives."""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+from metamoth import parse_metadata
+from metamoth.archives import iter_archive_headers, scan_archive
+
+from .records import make_comment_1_0, make_comment_1_6_0, make_header
+
+SAMPLES = 480000
+
+
+@pytest.fixture
+def recordings():
+    """Return the contents of recordings and other files."""
+    return {
+        "site/1.WAV": make_header(make_comment_1_6_0(), samples=SAMPLES)
+        + bytes(2 * SAMPLES),
+        "site/2.wav": make_header(make_comment_1_0(), samples=SAMPLES)
+        + bytes(2 * SAMPLES),
+        "site/CONFIG.TXT": b"config",
+    }
+
+
+@pytest.mark.parametrize(
+    "compression",
+    [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED],
+)
+def test_scan_zip_archive(tmp_path, recordings, compression):
+    """Test that the members of zip archives are parsed in order."""
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w", compression=compression) as archive:
+        for name, data in recordings.items():
+            archive.writestr(name, data)
+
+    results = list(scan_archive(path))
+
+    assert [result.path for result in results] == [
+        str(path / "site" / "1.WAV"),
+        str(path / "site" / "2.wav"),
+    ]
+    assert [result.firmware_version for result in results] == ["1.6.0", "1.0"]
+    assert results[0].samples == SAMPLES
+
+    expected = tmp_path / "1.WAV"
+    expected.write_bytes(recordings["site/1.WAV"])
+    results[0].path = str(expected)
+    assert results[0] == parse_metadata(expected)
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz"])
+def test_scan_tar_archive_reads_only_headers(tmp_path, recordings, mode):
+    """Test that only the headers of tar members are read."""
+    path = tmp_path / "bundle.tar"
+    with tarfile.open(path, mode) as archive:
+        for name, data in recordings.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    headers = list(iter_archive_headers(path))
+
+    assert [name for name, _ in headers] == ["site/1.WAV", "site/2.wav"]
+    assert all(len(header) == 4096 for _, header in headers)
+    assert len(list(scan_archive(path))) == 2
+
+
+def test_scan_archive_errors(tmp_path, recordings):
+    """Test the error policies and the rejection of other files."""
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("broken.wav", b"RIFF")
+        for name, data in recordings.items():
+            archive.writestr(name, data)
+
+    with pytest.raises(ValueError):
+        list(scan_archive(path))
+
+    errors = []
+    results = list(scan_archive(path, errors="skip", on_error=errors.append))
+    assert len(results) == 2
+    assert [error.path for error in errors] == [str(path / "broken.wav")]
+
+    other = tmp_path / "notes.txt"
+    other.write_text("Not an archive")
+    with pytest.raises(ValueError):
+        list(iter_archive_headers(other))
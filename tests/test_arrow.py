@@ -0,0 +1,82 @@
+"""Test the arrow module."""
+
+import pytest
+
+from .records import make_metadata_1_0, make_metadata_1_6_0
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from metamoth.arrow import (  # noqa: E402
+    ParquetWriter,
+    get_schema,
+    iter_record_batches,
+    to_record_batch,
+    write_parquet,
+)
+
+
+def test_schema_flattens_nested_fields():
+    """Test that nested metadata is flattened into typed columns."""
+    schema = get_schema()
+
+    assert "frequency_filter" not in schema.names
+    assert "config" not in schema.names
+    assert schema.field("frequency_filter_type").type == pa.dictionary(
+        pa.int8(), pa.string()
+    )
+    assert schema.field("frequency_filter_lower_frequency_hz").type == (
+        pa.int64()
+    )
+    assert schema.field("amplitude_threshold_enabled").type == pa.bool_()
+    assert schema.field("datetime").type == pa.timestamp("s")
+    assert schema.field("gain").type == pa.dictionary(pa.int8(), pa.string())
+
+
+def test_to_record_batch():
+    """Test that metadata is converted into an Arrow record batch."""
+    batch = to_record_batch([make_metadata_1_6_0(), make_metadata_1_0()])
+
+    assert batch.num_rows == 2
+    assert batch.schema == get_schema()
+
+    rows = batch.to_pylist()
+    assert rows[0]["gain"] == "AM_GAIN_MEDIUM"
+    assert rows[0]["timezone"] == "-03:00"
+    assert rows[0]["frequency_filter_type"] == "BAND_PASS"
+    assert rows[0]["frequency_filter_lower_frequency_hz"] == 8000
+    assert rows[0]["amplitude_threshold_threshold"] == 200
+    assert rows[1]["frequency_filter_type"] is None
+    assert rows[1]["temperature_c"] is None
+
+
+def test_iter_record_batches_splits_records():
+    """Test that record batches have at most batch_size rows."""
+    records = [make_metadata_1_6_0(f"{i}.wav") for i in range(5)]
+    batches = list(iter_record_batches(records, batch_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+
+
+def test_write_parquet(tmp_path):
+    """Test that metadata can be written to Parquet in row groups."""
+    path = tmp_path / "metadata.parquet"
+    records = [make_metadata_1_6_0(f"{i}.wav") for i in range(5)]
+
+    assert write_parquet(records, path, row_group_size=2) == 5
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("path").to_pylist() == [f"{i}.wav" for i in range(5)]
+
+
+def test_parquet_writer_streams_batches(tmp_path):
+    """Test that the writer accepts records in several calls."""
+    path = tmp_path / "metadata.parquet"
+
+    with ParquetWriter(path) as writer:
+        writer.write([make_metadata_1_6_0()])
+        writer.write([make_metadata_1_0()])
+
+    assert writer.count == 2
+    assert pq.read_table(path).num_rows == 2
@@ -0,0 +1,115 @@
+"""Test the audit of truncated and corrupt WAV files."""
+
+import struct
+
+import pytest
+from metamoth.audit import audit, audit_file
+from metamoth.enums import AuditStatus
+
+from .records import make_comment_1_6_0, make_header
+
+SAMPLES = 1000
+
+
+def make_wav(extra_chunk: bytes = b"") -> bytes:
+    """Build a recording, with an extra chunk before the fmt chunk."""
+    header = make_header(make_comment_1_6_0(), samples=SAMPLES)
+    riff_size = struct.unpack("<I", header[4:8])[0] + len(extra_chunk)
+    return (
+        b"RIFF"
+        + struct.pack("<I", riff_size)
+        + b"WAVE"
+        + extra_chunk
+        + header[12:]
+        + bytes(2 * SAMPLES)
+    )
+
+
+def replace(data: bytes, old: bytes, new: bytes) -> bytes:
+    """Replace the first occurrence of old."""
+    assert old in data
+    return data.replace(old, new, 1)
+
+
+ICMT_SIZE = struct.pack("<I", 384)
+
+FILES = {
+    "ok": (make_wav(), AuditStatus.OK),
+    "padded": (make_wav(b"junk\x03\x00\x00\x00abc\x00"), AuditStatus.OK),
+    "truncated": (make_wav()[:-100], AuditStatus.TRUNCATED),
+    "trailing": (make_wav() + bytes(10), AuditStatus.SIZE_MISMATCH),
+    "zeroed": (bytes(1000), AuditStatus.ZEROED_HEADER),
+    "empty": (b"", AuditStatus.TRUNCATED),
+    "short": (b"RIFF\x00", AuditStatus.TRUNCATED),
+    "text": (b"Battery low", AuditStatus.NOT_WAV),
+    "no_padding": (
+        make_wav(b"junk\x03\x00\x00\x00abc"),
+        AuditStatus.MISSING_PADDING,
+    ),
+    "bad_id": (
+        replace(make_wav(), b"LIST", b"\x00\x01LS"),
+        AuditStatus.BAD_CHUNK,
+    ),
+    "bad_subchunk": (
+        replace(make_wav(), b"ICMT" + ICMT_SIZE, b"ICMT\x00\x03\x00\x00"),
+        AuditStatus.BAD_CHUNK,
+    ),
+    "zeroed_riff_size": (
+        b"RIFF" + bytes(4) + make_wav()[8:],
+        AuditStatus.SIZE_MISMATCH,
+    ),
+    "no_fmt": (
+        replace(make_wav(), b"fmt ", b"fmtx"),
+        AuditStatus.MISSING_CHUNK,
+    ),
+}
+
+
+@pytest.mark.parametrize("name", FILES)
+def test_audit_file_diagnoses_file(tmp_path, name):
+    """Test the status of valid and corrupt files."""
+    data, status = FILES[name]
+    path = tmp_path / f"{name}.WAV"
+    path.write_bytes(data)
+
+    result = audit_file(path)
+
+    assert result.path == str(path)
+    assert result.status == status
+    assert result.file_size == len(data)
+    assert (result.detail is None) == (status == AuditStatus.OK)
+
+
+def test_audit_file_reports_sizes(tmp_path):
+    """Test the declared data size of a truncated recording."""
+    path = tmp_path / "truncated.WAV"
+    path.write_bytes(make_wav()[:-100])
+
+    result = audit_file(path)
+
+    assert result.data_size == 2 * SAMPLES
+    assert str(2 * SAMPLES - 100) in result.detail
+
+
+def test_audit_file_reports_unreadable_files(tmp_path):
+    """Test that a missing file does not raise."""
+    result = audit_file(tmp_path / "missing.WAV")
+
+    assert result.status == AuditStatus.UNREADABLE
+    assert result.file_size is None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_audit_returns_results_in_order(tmp_path, workers):
+    """Test the diagnosis of many files, in the order of the paths."""
+    paths = []
+    for name, (data, _) in FILES.items():
+        paths.append(tmp_path / f"{name}.WAV")
+        paths[-1].write_bytes(data)
+
+    results = list(audit(paths, workers=workers, batch_size=3))
+
+    assert [result.path for result in results] == [str(p) for p in paths]
+    assert [result.status for result in results] == [
+        status for _, status in FILES.values()
+    ]
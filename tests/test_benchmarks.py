@@ -0,0 +1,87 @@
+"""Test the synthetic corpus and runner of the benchmarks."""
+
+import os
+
+from benchmarks import imports
+from benchmarks.corpus import FIRMWARE_VERSIONS, generate_comments
+from benchmarks.run import run
+from benchmarks.sparse import (
+    allocated_bytes,
+    generate_recordings,
+    write_recordings,
+)
+from metamoth import parse_metadata
+from metamoth.artist import get_audiomoth_id_from_artist
+from metamoth.parsing import parse_comment, parsers
+
+
+def test_corpus_covers_every_firmware_version():
+    """Test that the corpus contains parseable comments of every version.
+
+    Some comments are identical in consecutive versions, so they are not
+    always parsed as the version they were built for.
+    """
+    assert set(FIRMWARE_VERSIONS) == set(parsers)
+
+    seen = set()
+    for version, comment in generate_comments(400, seed=1):
+        parse_comment(comment)
+        seen.add(version)
+
+    assert seen == set(parsers)
+
+
+def test_run_returns_results_for_each_benchmark(tmp_path):
+    """Test that every benchmark reports throughput, latency and memory."""
+    results = run(sizes=[20], corpus_dir=str(tmp_path))
+
+    assert results["environment"]["metamoth_version"]
+    assert [result["benchmark"] for result in results["results"]] == [
+        "parse_comment",
+        "parse_into_chunks",
+        "parse_metadata",
+    ]
+    for result in results["results"]:
+        assert result["count"] == 20
+        assert result["throughput_per_s"] > 0
+        assert result["latency_us"]["p50"] <= result["latency_us"]["p99"]
+
+
+def test_sparse_recordings_are_valid_and_use_no_audio_blocks(tmp_path):
+    """Test that sparse recordings parse with their declared duration."""
+    paths = write_recordings(tmp_path, 16, duration_s=3600)
+
+    for path in paths:
+        metadata = parse_metadata(path)
+        assert os.path.getsize(path) > metadata.samples * 2
+        assert metadata.duration_s > 1000
+        assert allocated_bytes(path) < 64 * 1024
+
+
+def test_recordings_have_an_artist_on_the_versions_that_write_one():
+    """Test that 1.4.0, 1.4.2 and 1.6.0 recordings get a device ID."""
+    recordings = zip(
+        generate_comments(200, seed=3),
+        generate_recordings(200, seed=3),
+    )
+
+    for (version, _), (_, _, artist) in recordings:
+        if version not in ("1.4.0", "1.4.2", "1.6.0"):
+            assert artist is None
+            continue
+
+        assert artist is not None
+        device_id = get_audiomoth_id_from_artist(artist)
+        assert len(device_id) == 16
+        int(device_id, 16)
+
+
+def test_import_benchmark_times_a_new_interpreter():
+    """Test that the import time of the package is measured."""
+    results = imports.run(modules=["metamoth"], runs=2)
+
+    (result,) = results["results"]
+    assert result["benchmark"] == "import metamoth"
+    assert result["count"] == 2
+    assert result["latency_us"]["p50"] > 0
+    assert result["memory_per_record_bytes"] > 0
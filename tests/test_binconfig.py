@@ -0,0 +1,140 @@
+"""Test the binary configuration decoder."""
+
+import struct
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+from metamoth.binconfig import (
+    CONFIG_CLASSES,
+    config_size,
+    decode_config,
+    decode_configs,
+    encode_config,
+)
+from metamoth.config import Config1_4_0, Config1_8_0, StartStopPeriod
+from metamoth.enums import BatteryLevelDisplayType, GainSetting
+
+
+def test_decodes_a_packed_1_4_0_configuration():
+    """Test that the fields are read from the packed firmware struct."""
+    data = struct.pack(
+        "<IBBBBIBHHBB10HbBBbBIIHHH",
+        1600000000,  # time
+        3,  # gain
+        4,  # clock divider
+        16,  # acquisition cycles
+        1,  # oversample rate
+        48000,  # sample rate
+        8,  # sample rate divider
+        10,  # sleep duration
+        50,  # record duration
+        0,  # enable led
+        1,  # active start stop periods
+        *(0, 60, 120, 180, 0, 0, 0, 0, 0, 0),
+        -5,  # timezone hours
+        1,  # enable low voltage cutoff
+        0,  # disable battery level display
+        -30,  # timezone minutes
+        0,  # disable sleep record cycle
+        0,  # earliest recording time
+        0,  # latest recording time
+        1000,  # lower filter frequency
+        8000,  # higher filter frequency
+        250,  # amplitude threshold
+    )
+
+    config = decode_config(data, "1.4.0")
+
+    assert isinstance(config, Config1_4_0)
+    assert config.time == 1600000000
+    assert config.gain == 3
+    assert config.sample_rate == 48000
+    assert config.enable_led is False
+    assert config.start_stop_period[1] == StartStopPeriod(120, 180)
+    assert config.timezone_hours == -5
+    assert config.timezone_minutes == -30
+    assert config.enable_low_voltage_cutoff is True
+    assert config.higher_filter_freq == 8000
+    assert config.amplitude_threshold == 250
+    assert encode_config(config) == data
+
+
+@pytest.mark.parametrize("version", ["1.0", "1.4.0", "1.8.0"])
+def test_active_period_count_round_trips(version: str):
+    """Test that the number of active periods is kept, not a flag."""
+    data = encode_config(CONFIG_CLASSES[version](active_start_stop_periods=3))
+
+    config = decode_config(data, version)
+
+    assert config.active_start_stop_periods == 3
+    assert encode_config(config) == data
+
+
+@pytest.mark.parametrize("version", list(CONFIG_CLASSES))
+def test_default_configurations_round_trip(version: str):
+    """Test that every version encodes to its size and decodes back."""
+    config = CONFIG_CLASSES[version]()
+
+    data = encode_config(config)
+
+    assert len(data) == config_size(version)
+    assert decode_config(data, version) == config
+
+
+@given(
+    exponent=st.integers(-4, 3),
+    mantissa=st.integers(0, 15),
+    display=st.sampled_from(BatteryLevelDisplayType),
+    gain=st.sampled_from(GainSetting),
+    duration=st.integers(0, 63),
+)
+def test_bit_fields_round_trip(
+    exponent: int,
+    mantissa: int,
+    display: BatteryLevelDisplayType,
+    gain: GainSetting,
+    duration: int,
+):
+    """Test that the bit fields of the latest layout are independent."""
+    config = Config1_8_0(
+        gain=gain,
+        battery_level_display_type=display,
+        minimum_trigger_duration=duration,
+        amplitude_threshold_percentage_mantissa=mantissa,
+        amplitude_threshold_percentage_exponent=exponent,
+        frequency_trigger_threshold_percentage_exponent=-exponent - 1,
+        enable_daily_folders=True,
+    )
+
+    assert decode_config(encode_config(config), "1.8.0") == config
+
+
+def test_values_that_do_not_fit_are_rejected():
+    """Test that encoding does not silently truncate values."""
+    with pytest.raises(ValueError):
+        encode_config(Config1_8_0(minimum_trigger_duration=64))
+
+    with pytest.raises(ValueError):
+        encode_config(Config1_4_0(sleep_duration=70000))
+
+
+def test_decode_configs_in_one_pass():
+    """Test the batch decoding of concatenated and separate blobs."""
+    configs = [Config1_8_0(time=time, sleep_duration=5) for time in range(50)]
+    blobs = [encode_config(config) for config in configs]
+
+    assert decode_configs(b"".join(blobs), "1.8.0") == configs
+    assert decode_configs(iter(blobs), "1.8.0") == configs
+
+    with pytest.raises(ValueError):
+        decode_configs(b"".join(blobs)[:-1], "1.8.0")
+
+
+def test_short_data_and_unknown_versions_are_rejected():
+    """Test the errors of the single configuration decoder."""
+    with pytest.raises(ValueError):
+        decode_config(b"\x00" * 10, "1.4.0")
+
+    with pytest.raises(KeyError):
+        decode_config(b"\x00" * 100, "0.9")
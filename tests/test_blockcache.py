@@ -0,0 +1,94 @@
+"""Test the block cache."""
+
+import io
+import os
+import random
+
+from metamoth import parse_metadata
+from metamoth.blockcache import BlockCache, CachedFile, open_cached
+from metamoth.ranges import LocalRangeReader
+
+from .records import make_comment_1_6_0, write_recording
+
+
+class NamedBytesIO(io.BytesIO):
+    """Bytes in memory with a name, counting the reads."""
+
+    name = "memory"
+    reads = 0
+
+    def read(self, size=-1):
+        """Read and count the call."""
+        self.reads += 1
+        return super().read(size)
+
+
+def test_parse_reads_the_header_with_one_fetch(tmp_path):
+    """Test that the small reads of the parsers hit the cached block."""
+    path = tmp_path / "recording.WAV"
+    write_recording(path, make_comment_1_6_0())
+    cache = BlockCache()
+
+    metadata = parse_metadata(path, block_cache=cache)
+
+    assert metadata == parse_metadata(path)
+    assert cache.stats.fetches == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hits > 1
+
+    parse_metadata(path, block_cache=cache)
+    assert cache.stats.fetches == 1
+
+    with LocalRangeReader(path) as reader:
+        parse_metadata(reader, block_cache=cache)
+    assert reader.requests == 1
+
+
+def test_reads_match_the_file_at_any_position():
+    """Test reads that start and end anywhere in and across blocks."""
+    data = os.urandom(10_000)
+    cache = BlockCache(block_size=512, max_blocks_per_file=4)
+    cached = CachedFile(NamedBytesIO(data), cache)  # type: ignore
+    generator = random.Random(0)
+
+    for _ in range(500):
+        start = generator.randrange(0, 11_000)
+        size = generator.randrange(0, 2_000)
+        cached.seek(start)
+        assert cached.read(size) == data[start : start + size]
+        assert cached.tell() == min(start + size, max(start, len(data)))
+
+    assert len(cache) <= 4
+    assert cache.stats.hits > 0
+
+
+def test_blocks_are_evicted_per_file_and_globally():
+    """Test the per file and global bounds of the cache."""
+    cache = BlockCache(block_size=100, max_blocks_per_file=2, max_bytes=300)
+
+    for index in range(3):
+        cache.put("a", index, bytes(100))
+    assert cache.get("a", 0) is None
+    assert cache.get("a", 2) is not None
+
+    cache.put("b", 0, bytes(100))
+    cache.put("b", 1, bytes(100))
+    assert cache.nbytes == 300
+    assert cache.get("a", 1) is None
+    assert cache.stats.evictions == 2
+
+
+def test_modified_files_are_read_again(tmp_path):
+    """Test that the blocks of a modified file are not reused."""
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"a" * 100)
+    cache = BlockCache()
+
+    with open_cached(path, cache) as cached:
+        assert cached.read(4) == b"aaaa"
+
+    path.write_bytes(b"b" * 200)
+    with open_cached(path, cache) as cached:
+        assert cached.read(4) == b"bbbb"
+
+    assert cache.stats.fetches == 2
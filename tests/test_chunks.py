@@ -1,8 +1,15 @@
 """Test the chunks module."""
 
+import io
 import os
 
-from metamoth.chunks import parse_into_chunks
+import pytest
+from metamoth.chunks import (
+    Chunk,
+    parse_into_chunks,
+    read_info_texts,
+    read_text,
+)
 
 PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(PACKAGE_DIR, "data")
@@ -37,3 +44,68 @@ def test_parses_wavs_into_chunks():
     assert chunk.subchunks["data"].position == 184
     assert chunk.subchunks["data"].size == 7680000
     assert chunk.subchunks["data"].subchunks == {}
+
+
+def test_read_text_stops_at_the_first_null_byte():
+    """Test that the padding and anything after it is not returned."""
+    riff = io.BytesIO(b"ICMT\x20\x00\x00\x00" + b"Recorded\x00\x00garbage")
+    chunk = Chunk(chunk_id="ICMT", size=32, position=0)
+
+    assert read_text(riff, chunk, 28) == "Recorded"
+    assert read_text(riff, chunk, 4) == "Reco"
+
+
+def test_read_text_ignores_leading_padding():
+    """Test that null bytes before the text are skipped."""
+    riff = io.BytesIO(b"IART\x10\x00\x00\x00" + b"\x00\x00AudioMoth\x00")
+    chunk = Chunk(chunk_id="IART", size=16, position=0)
+
+    assert read_text(riff, chunk, 12) == "AudioMoth"
+
+
+def test_parses_the_header_without_the_audio_data():
+    """Test that parsing stops at the end of a truncated file."""
+    header = (
+        b"RIFF"
+        + (1000).to_bytes(4, "little")
+        + b"WAVE"
+        + b"fmt "
+        + (16).to_bytes(4, "little")
+        + bytes(16)
+        + b"data"
+        + (960).to_bytes(4, "little")
+        + bytes(10)
+    )
+
+    chunk = parse_into_chunks(io.BytesIO(header + b"LI"))
+
+    assert list(chunk.subchunks) == ["fmt ", "data"]
+    assert chunk.subchunks["data"].size == 960
+
+    with pytest.raises(ValueError):
+        parse_into_chunks(io.BytesIO(b"RIFF"))
+
+
+def test_read_info_texts_walks_list_subchunks():
+    """Test that the texts of the chunks of interest are returned."""
+    info = (
+        b"INFO"
+        + b"ICMT\x05\x00\x00\x00Hello\x00"
+        + b"IART\x0c\x00\x00\x00AudioMoth 12"
+    )
+    riff = (
+        b"RIFF"
+        + (4 + 8 + len(info)).to_bytes(4, "little")
+        + b"WAVE"
+        + b"LIST"
+        + len(info).to_bytes(4, "little")
+        + info
+    )
+    sizes = {"ICMT": 16, "IART": 9}
+
+    assert read_info_texts(riff, sizes) == {
+        "ICMT": "Hello",
+        "IART": "AudioMoth",
+    }
+    assert read_info_texts(info[4:], {"ICMT": 3}) == {"ICMT": "Hel"}
+    assert read_info_texts(info[4:10], sizes) == {}
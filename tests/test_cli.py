@@ -0,0 +1,106 @@
+"""Test the command line interface."""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from metamoth.cli import main
+
+from .records import make_comment_1_6_0, write_recording
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    """Create a directory with two recordings."""
+    directory = tmp_path / "recordings"
+    directory.mkdir()
+    write_recording(directory / "1.WAV", make_comment_1_6_0())
+    write_recording(directory / "2.WAV", make_comment_1_6_0())
+    return directory
+
+
+def test_scan_to_jsonl(recordings, capsys):
+    """Test that the metadata is written to stdout as JSON Lines."""
+    assert main(["scan", str(recordings), "--workers", "1"]) == 0
+
+    captured = capsys.readouterr()
+    rows = [json.loads(line) for line in captured.out.splitlines()]
+    assert [row["path"] for row in rows] == [
+        str(recordings / "1.WAV"),
+        str(recordings / "2.WAV"),
+    ]
+    assert "2 files scanned" in captured.err
+
+
+def test_scan_to_csv_with_fields(recordings, tmp_path):
+    """Test that selected fields are written as CSV, flattening objects."""
+    output = tmp_path / "metadata.csv"
+    status = main(
+        [
+            "scan",
+            str(recordings),
+            "--workers",
+            "2",
+            "--format",
+            "csv",
+            "--fields",
+            "path,gain,frequency_filter",
+            "--output",
+            str(output),
+            "--quiet",
+        ]
+    )
+    assert status == 0
+
+    with open(output, newline="") as fp:
+        rows = list(csv.DictReader(fp))
+
+    assert len(rows) == 2
+    assert list(rows[0]) == [
+        "path",
+        "gain",
+        "frequency_filter_type",
+        "frequency_filter_higher_frequency_hz",
+        "frequency_filter_lower_frequency_hz",
+    ]
+    assert rows[0]["frequency_filter_type"] == "BAND_PASS"
+
+
+def test_scan_reports_errors(recordings, capsys):
+    """Test that unparseable files are reported and the status is set."""
+    (recordings / "broken.wav").write_bytes(b"RIFF")
+
+    assert main(["scan", str(recordings), "-w", "1", "-q"]) == 1
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 2
+    assert "broken.wav" in captured.err
+
+    assert main(["scan", str(recordings), "-w", "1", "--errors", "skip"]) == 0
+    assert main(["scan", str(recordings), "-w", "1", "--errors", "raise"]) == 1
+
+
+def test_unknown_field(recordings):
+    """Test that unknown fields are rejected."""
+    with pytest.raises(SystemExit):
+        main(["scan", str(recordings), "--fields", "path,nope"])
+
+
+def test_scan_exits_cleanly_when_stdout_is_closed(recordings):
+    """Test that a closed pipe, e.g. to head, gives no traceback."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "metamoth.cli", "scan", str(recordings)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    process.stdout.close()
+
+    _, stderr = process.communicate(timeout=60)
+
+    assert process.returncode == 1
+    assert b"Traceback" not in stderr
+    assert b"BrokenPipeError" not in stderr
@@ -1,10 +1,19 @@
 """Test comments module."""
 
+import io
 import os
 
 import pytest
 from metamoth.chunks import parse_into_chunks
 from metamoth.comments import get_am_comment
+from metamoth.parsing import (
+    MAX_COMMENT_LENGTH,
+    MAX_COMMENT_SIZE,
+    MessageFormatError,
+    parse_comment,
+)
+
+from .records import make_header
 
 PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(PACKAGE_DIR, "data")
@@ -31,3 +40,25 @@ def test_get_comment_fails_for_non_audiomoth_file():
         with open(os.path.join(DATA_DIR, "non_am.wav"), "rb") as wav:
             chunk = parse_into_chunks(wav)
             get_am_comment(wav, chunk)
+
+
+def test_get_comment_bounds_the_read_of_huge_chunks():
+    """Test that a huge comment chunk is not read in full."""
+    wav = io.BytesIO(make_header("Recorded at " + "x" * 100000))
+    chunk = parse_into_chunks(wav)
+
+    comment = get_am_comment(wav, chunk)
+
+    assert len(comment) == MAX_COMMENT_SIZE
+
+
+def test_long_multibyte_comments_are_rejected_as_too_long():
+    """Test that a character cut by the bounded read is dropped."""
+    wav = io.BytesIO(make_header("Recorded at " + "\u20ac" * 100000))
+    chunk = parse_into_chunks(wav)
+
+    comment = get_am_comment(wav, chunk)
+
+    assert len(comment) > MAX_COMMENT_LENGTH
+    with pytest.raises(MessageFormatError, match="too long"):
+        parse_comment(comment)
@@ -0,0 +1,175 @@
+"""Test the parser of the CONFIG.TXT file."""
+
+import pytest
+from metamoth.config import Config1_5_0, Config1_8_0, StartStopPeriod
+from metamoth.configtxt import (
+    ConfigCache,
+    parse_config_txt,
+    read_config_txt,
+)
+from metamoth.enums import BatteryLevelDisplayType, GainSetting
+
+CONFIG_1_8_0 = """\
+Device ID                       : 24F319046020F53E
+Firmware                        : AudioMoth-Firmware-Basic (1.8.1)
+
+Time zone                       : UTC-5:30
+Sample rate (Hz)                : 48000
+Gain                            : Medium-High
+Sleep duration (s)              : 10
+Recording duration (s)          : 50
+Active recording periods        : 2
+
+Recording period 1              : 00:00 - 06:00 (UTC)
+Recording period 2              : 18:30 - 24:00 (UTC)
+
+Earliest recording time         : 2023-01-01 00:00:00 (UTC)
+Latest recording time           : ---------- --:--:--
+
+Filter                          : Band-pass (1.0kHz - 8.0kHz)
+Trigger type                    : Amplitude
+Threshold setting               : 0.5%
+Minimum trigger duration (s)    : 3
+
+Enable LED                      : No
+Enable low-voltage cut-off      : Yes
+Enable battery level indication : Yes (NiMH/LiPo voltage range)
+Always require acoustic chime   : No
+Use daily folder for WAV files  : Yes
+Disable 48Hz DC blocking filter : No
+Enable energy saver mode        : Yes
+Enable low gain range           : No
+Enable magnetic switch          : No
+Enable GPS time setting         : No
+"""
+
+
+def test_parses_the_settings_into_the_configuration():
+    """Test the mapping of every setting of a 1.8 configuration file."""
+    config = parse_config_txt(CONFIG_1_8_0)
+
+    assert isinstance(config, Config1_8_0)
+    assert config.timezone_hours == -5
+    assert config.timezone_minutes == -30
+    assert config.sample_rate == 384000
+    assert config.sample_rate_divider == 8
+    assert config.gain == GainSetting.AM_GAIN_MEDIUM_HIGH
+    assert config.sleep_duration == 10
+    assert config.record_duration == 50
+    assert config.active_start_stop_periods == 2
+    assert config.start_stop_period[:3] == [
+        StartStopPeriod(0, 360),
+        StartStopPeriod(1110, 1440),
+        StartStopPeriod(0, 0),
+    ]
+    assert config.earliest_recording_time == 1672531200
+    assert config.latest_recording_time == 0
+    assert config.lower_filter_freq == 10
+    assert config.higher_filter_freq == 80
+    assert config.enable_amplitude_threshold_percentage_scale is True
+    assert config.amplitude_threshold_percentage_mantissa == 5
+    assert config.amplitude_threshold_percentage_exponent == -1
+    assert config.amplitude_threshold == 164
+    assert config.minimum_trigger_duration == 3
+    assert config.enable_led is False
+    assert config.disable_battery_level_display is False
+    assert (
+        config.battery_level_display_type
+        == BatteryLevelDisplayType.NIMH_LIPO_BATTERY_VOLTAGE
+    )
+    assert config.enable_daily_folders is True
+    assert config.enable_energy_saver_mode is True
+
+
+@pytest.mark.parametrize(
+    "line,lower,higher",
+    [
+        ("Filter : -", 0, 0),
+        ("Filter : Low-pass (12.5kHz)", 65535, 125),
+        ("Filter : High-pass (8.0kHz)", 80, 65535),
+    ],
+)
+def test_filters(line: str, lower: int, higher: int):
+    """Test the firmware encoding of the filters."""
+    config = parse_config_txt(
+        f"Firmware : AudioMoth-Firmware-Basic (1.6.0)\n{line}\n"
+    )
+    assert (config.lower_filter_freq, config.higher_filter_freq) == (
+        lower,
+        higher,
+    )
+
+
+def test_older_versions_keep_only_their_fields():
+    """Test the settings missing from older configurations are dropped."""
+    config = parse_config_txt(
+        "Firmware : AudioMoth-Firmware-Basic (1.5.0)\n"
+        "Gain : Low\n"
+        "Threshold setting : -30 dB\n"
+        "Minimum trigger duration (s) : 2\n"
+        "Use daily folder for WAV files : Yes\n"
+    )
+
+    assert isinstance(config, Config1_5_0)
+    assert config.gain == 0
+    assert config.amplitude_threshold == 1036
+    assert config.minimum_amplitude_threshold_duration == 2
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Gain : Low\n",
+        "Firmware : AudioMoth-Firmware-Basic (0.9)\n",
+        "Firmware : AudioMoth-Firmware-Basic (1.8.0)\nGain : Loud\n",
+        "Firmware : AudioMoth-Firmware-Basic (1.8.0)\nEnable LED : Maybe\n",
+    ],
+)
+def test_invalid_files_are_rejected(text: str):
+    """Test that missing versions and unknown values raise errors."""
+    with pytest.raises(ValueError):
+        parse_config_txt(text)
+
+
+def test_cache_reads_each_folder_once(tmp_path, monkeypatch):
+    """Test that recordings of a folder share one configuration."""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "CONFIG.TXT").write_text(CONFIG_1_8_0)
+    reads = []
+
+    def counting_read(path):
+        reads.append(path)
+        return read_config_txt(path)
+
+    monkeypatch.setattr("metamoth.configtxt.read_config_txt", counting_read)
+    cache = ConfigCache()
+
+    first = cache.get(tmp_path / "a" / "1.WAV")
+    second = cache.get(tmp_path / "a" / "2.WAV")
+
+    assert first is second
+    assert isinstance(first, Config1_8_0)
+    assert cache.get(tmp_path / "3.WAV") is None
+    assert len(reads) == 2
+    assert len(cache) == 2
+
+
+def test_cache_finds_the_file_of_daily_folders(tmp_path):
+    """Test that daily folders use the file at the root of the card."""
+    card = tmp_path / "card"
+    for day in ["20230101", "20230102"]:
+        (card / day).mkdir(parents=True)
+    (card / "CONFIG.TXT").write_text(CONFIG_1_8_0)
+    (tmp_path / "CONFIG.TXT").write_text(CONFIG_1_8_0)
+    cache = ConfigCache(roots=[card])
+
+    first = cache.get(card / "20230101" / "1.WAV")
+    second = cache.get(card / "20230102" / "2.WAV")
+
+    assert isinstance(first, Config1_8_0)
+    assert first is second
+    assert len(cache) == 3
+
+    # The search stops at the root.
+    cache = ConfigCache(roots=[card / "20230101"])
+    assert cache.get(card / "20230101" / "1.WAV") is None
@@ -0,0 +1,81 @@
+"""Test the metadata of FLAC files converted from AudioMoth recordings."""
+
+import io
+
+import pytest
+from metamoth import parse_metadata
+from metamoth.flac import read_flac_metadata
+from metamoth.instrumentation import FLAC_STAGE, Profiler
+
+from .records import make_comment_1_6_0, make_flac, make_header
+
+ARTIST = "AudioMoth 243B1F055B2BF663"
+
+
+@pytest.mark.parametrize(
+    "riff,vorbis",
+    [(True, False), (False, True), (True, True)],
+)
+def test_reads_the_comment_and_stream_info(riff: bool, vorbis: bool):
+    """Test the comment is found in preserved chunks or Vorbis comments."""
+    comment = make_comment_1_6_0()
+    data = make_flac(
+        comment,
+        samplerate_hz=96000,
+        channels=2,
+        samples=192000,
+        artist=ARTIST,
+        riff=riff,
+        vorbis=vorbis,
+    )
+
+    metadata = read_flac_metadata(io.BytesIO(data))
+
+    assert metadata.comment == comment
+    assert metadata.artist == "243B1F055B2BF663"
+    assert metadata.media_info.samplerate_hz == 96000
+    assert metadata.media_info.channels == 2
+    assert metadata.media_info.samples == 192000
+    assert metadata.media_info.duration_s == 2.0
+
+
+def test_parse_metadata_matches_the_wav_file(tmp_path):
+    """Test that a converted recording has the metadata of the original."""
+    comment = make_comment_1_6_0()
+    wav_path = tmp_path / "recording.WAV"
+    flac_path = tmp_path / "recording.flac"
+    header = make_header(comment)
+    wav_path.write_bytes(header + bytes(96000))
+    flac_path.write_bytes(make_flac(comment))
+
+    wav = parse_metadata(wav_path)
+    flac = parse_metadata(flac_path)
+
+    assert flac.path == str(flac_path)
+    flac.path = wav.path
+    assert flac == wav
+
+
+def test_only_the_metadata_blocks_are_read(tmp_path):
+    """Test that the audio frames are never read."""
+    path = tmp_path / "recording.flac"
+    data = make_flac(make_comment_1_6_0())
+    path.write_bytes(data + bytes(10_000_000))
+    profiler = Profiler()
+
+    parse_metadata(path, profiler=profiler)
+
+    assert FLAC_STAGE in profiler.times_ns
+    assert profiler.io.bytes_read < 100_000
+
+
+def test_files_without_comment_are_rejected(tmp_path):
+    """Test the errors of files that are not AudioMoth recordings."""
+    path = tmp_path / "other.flac"
+    path.write_bytes(make_flac("", riff=False))
+
+    with pytest.raises(ValueError):
+        parse_metadata(path)
+
+    with pytest.raises(ValueError):
+        read_flac_metadata(io.BytesIO(b"fLaC\x80\x00\x00\x00"))
@@ -0,0 +1,115 @@
+"""Test the instrumentation of the parsing stages."""
+
+import pytest
+from metamoth import parse_metadata
+from metamoth.instrumentation import STAGES, FileProfile, Histogram, Profiler
+from metamoth.parsing import MessageFormatError
+from metamoth.scan import scan
+
+from .records import make_comment_1_6_0, write_recording
+
+
+def test_histogram_percentiles_are_close_to_exact():
+    """Test that percentiles are within the bucket resolution."""
+    histogram = Histogram()
+    for value in range(1, 10001):
+        histogram.add(value)
+
+    assert histogram.count == 10000
+    assert histogram.mean == pytest.approx(5000.5)
+    assert histogram.percentile(50) == pytest.approx(5000, rel=0.05)
+    assert histogram.percentile(99) == pytest.approx(9900, rel=0.05)
+    assert histogram.percentile(100) == 10000
+
+
+def test_histograms_can_be_merged():
+    """Test that merging adds the counts of both histograms."""
+    first, second = Histogram(), Histogram()
+    first.add(10)
+    second.add(1000)
+    first.merge(second)
+
+    assert first.count == 2
+    assert first.min == 10
+    assert first.max == 1000
+
+
+def test_file_profile_stages_add_up():
+    """Test that the time of a stage is summed over its blocks."""
+    profile = FileProfile(path="a.wav")
+
+    with profile.stage("parse_comment"):
+        pass
+    first = profile.times_ns["parse_comment"]
+    with profile.stage("parse_comment"):
+        sum(range(1000))
+
+    assert profile.times_ns["parse_comment"] > first
+    assert profile.bytes_read == {}
+
+
+def test_profiler_records_every_stage(tmp_path):
+    """Test that each stage of parse_metadata is timed."""
+    path = tmp_path / "1.WAV"
+    write_recording(path, make_comment_1_6_0(), artist="AudioMoth 1234")
+    profiles = []
+    profiler = Profiler(callback=profiles.append)
+
+    metadata = parse_metadata(path, profiler=profiler)
+
+    assert metadata == parse_metadata(path)
+    assert len(profiles) == 1
+    assert list(profiles[0].times_ns) == list(STAGES)
+    assert profiler.summary()["total"]["count"] == 1
+
+
+def test_profiler_counts_file_operations(tmp_path):
+    """Test that the system calls and bytes read are counted per file."""
+    path = tmp_path / "1.WAV"
+    write_recording(path, make_comment_1_6_0())
+    profiles = []
+    profiler = Profiler(callback=profiles.append)
+
+    parse_metadata(path, profiler=profiler)
+    parse_metadata(path, profiler=profiler)
+
+    stats = profiles[0].io
+    assert stats.files_opened == 1
+    assert stats.reads >= 1
+    assert stats.seeks >= 1
+    assert stats.bytes_read >= 44 + 384
+    assert sum(profiles[0].bytes_read.values()) == stats.bytes_read
+
+    assert profiler.io.files_opened == 2
+    assert profiler.io.reads == 2 * stats.reads
+    assert profiler.io_per_file["reads"].count == 2
+    assert "I/O per file" in profiler.format()
+
+
+def test_profiler_records_errors(tmp_path):
+    """Test that files that fail to parse are also recorded."""
+    path = tmp_path / "1.WAV"
+    write_recording(path, "Not an AudioMoth comment")
+    profiler = Profiler()
+
+    with pytest.raises(MessageFormatError):
+        parse_metadata(path, profiler=profiler)
+
+    assert profiler.files == 1
+    assert profiler.errors == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scan_aggregates_profiles(tmp_path, workers):
+    """Test that profiles are collected from the workers."""
+    for index in range(5):
+        write_recording(tmp_path / f"{index}.WAV", make_comment_1_6_0())
+    profiler = Profiler()
+
+    records = list(scan([tmp_path], workers=workers, profiler=profiler))
+
+    assert len(records) == 5
+    assert profiler.files == 5
+    assert profiler.times_ns["parse_comment"].count == 5
+    assert profiler.parsers.matches == {"1.6.0": 5}
+    assert "parse_comment" in profiler.format()
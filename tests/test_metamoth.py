@@ -3,6 +3,8 @@
 """Tests for `metamoth` package."""
 
 import os
+import subprocess
+import sys
 from datetime import datetime as dt
 from datetime import timezone as tz
 
@@ -34,3 +36,17 @@ def test_parse_metadata():
     assert metadata.samples == 3840000
     assert metadata.duration_s == 20.0
     assert metadata.recording_state == RecordingState.RECORDING_OKAY
+
+
+def test_import_is_lazy():
+    """Test that importing the package does not import the parsers."""
+    code = (
+        "import sys, metamoth; "
+        "assert 'metamoth.parsing' not in sys.modules; "
+        "assert 'parse_metadata' in dir(metamoth); "
+        "metamoth.parse_metadata; "
+        "assert 'metamoth.parsing' in sys.modules"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
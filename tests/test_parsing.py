@@ -6,8 +6,11 @@ from datetime import timedelta as td
 from datetime import timezone as tz
 from typing import Optional
 
+import pytest
+from benchmarks.corpus import generate_comments
 from hypothesis import given
 from hypothesis import strategies as st
+from metamoth import parsing
 from metamoth.config import (
     Config1_0,
     Config1_2_0,
@@ -23,7 +26,12 @@ from metamoth.enums import (
     RecordingState,
 )
 from metamoth.parsing import (
+    MAX_COMMENT_LENGTH,
+    CommentParser,
+    MessageFormatError,
+    ParserStats,
     db_to_amplitude,
+    parse_comment,
     parse_comment_version_1_0,
     parse_comment_version_1_0_1,
     parse_comment_version_1_2_0,
@@ -32,6 +40,7 @@ from metamoth.parsing import (
     parse_comment_version_1_4_0,
     parse_comment_version_1_4_2,
     parse_comment_version_1_6_0,
+    parsers,
     percentage_to_amplitude,
 )
 
@@ -45,6 +54,7 @@ from .firmwares import (
     generate_comment_v1_4_2,
     generate_comment_v1_6_0,
 )
+from .records import make_comment_1_0, make_comment_1_6_0
 
 
 @given(
@@ -623,3 +633,142 @@ def test_convert_amplitude_functions(slider: float):
     else:
         assert abs(amplitude - recovered_amplitude) < 2 * 10 ** (4 - exponent)
         assert abs(amplitude - recovered_percentage) < 2 * 10 ** (4 - exponent)
+
+
+def test_parse_comment_records_statistics():
+    """Test that the parsers tried and the matched version are recorded."""
+    stats = ParserStats()
+
+    parse_comment(make_comment_1_0(), stats=stats)
+    parse_comment(make_comment_1_6_0(), stats=stats)
+    with pytest.raises(MessageFormatError):
+        parse_comment("Recorded at noon", stats=stats)
+    with pytest.raises(MessageFormatError):
+        parse_comment("Not an AudioMoth comment", stats=stats)
+
+    assert stats.comments == 4
+    assert stats.matches == {"1.0": 1, "1.6.0": 1}
+    assert stats.unmatched == 2
+    assert stats.attempts_per_comment == {0: 1, 1: 1, len(parsers): 2}
+
+
+def test_comment_parser_tries_common_firmware_first():
+    """Test that the most frequent firmware moves to the front."""
+    parser = CommentParser()
+    comment = make_comment_1_6_0()
+
+    for _ in range(10):
+        parser.parse(comment)
+
+    assert parser.order[0] == "1.6.0"
+    assert parser.stats.attempts_per_comment[1] == 9
+    assert parser.parse(make_comment_1_0())["firmware_version"] == "1.0"
+
+
+def test_comment_parser_matches_parse_comment():
+    """Test that reordering never changes the parsed metadata."""
+    parser = CommentParser(decay_every=16)
+
+    for _, comment in generate_comments(2000, seed=5):
+        assert parser.parse(comment) == parse_comment(comment)
+
+
+def test_unmatched_comment_error_shows_the_comment():
+    """Test that the final error message describes the comment."""
+    with pytest.raises(MessageFormatError, match="Not an AudioMoth"):
+        parse_comment("Not an AudioMoth comment")
+
+    with pytest.raises(MessageFormatError, match="does not match"):
+        parse_comment_version_1_6_0(make_comment_1_0())
+
+
+def test_foreign_comments_are_rejected_before_matching():
+    """Test that no parser is tried on comments no firmware writes."""
+    parser = CommentParser()
+
+    with pytest.raises(MessageFormatError, match="does not start with"):
+        parser.parse("Not an AudioMoth comment")
+
+    comment = make_comment_1_6_0() + " " * MAX_COMMENT_LENGTH
+    with pytest.raises(MessageFormatError, match="too long"):
+        parser.parse(comment)
+
+    assert parser.stats.attempts_per_comment == {0: 2}
+    assert parser.stats.unmatched == 2
+
+
+@pytest.mark.parametrize(
+    "comment",
+    [
+        "Recorded at " + "1" * 100000,
+        "Recorded at 12:00:00 01/01/2020 (UTC" + "+" * 100000,
+        "Recorded at 12:00:00 01/01/2020 (UTC) by AudioMoth "
+        + "0" * 100000,
+    ],
+)
+def test_pathological_comments_are_rejected(comment: str):
+    """Test that long adversarial inputs fail without being matched."""
+    stats = ParserStats()
+
+    with pytest.raises(MessageFormatError, match="too long"):
+        parse_comment(comment, stats=stats)
+
+    assert stats.attempts_per_comment == {0: 1}
+
+
+@pytest.mark.parametrize(
+    "threshold,amplitude",
+    [("120", 120), ("10%", 3277), ("-20 dB", 3277)],
+)
+def test_single_pass_parse_of_configuration_sentences(
+    threshold: str,
+    amplitude: int,
+):
+    """Test the values captured by the single regular expression."""
+    comment = (
+        "Recorded at 10:00:00 01/01/2022 (UTC+1) during deployment "
+        "24E144036037ABF6 using external microphone at medium gain while "
+        "battery was 4.2V and temperature was 20.1C. Amplitude threshold "
+        f"was {threshold} with 2s minimum trigger duration. Low-pass filter "
+        "with frequency of 8.0kHz applied. Recording stopped due to "
+        "microphone change."
+    )
+
+    metadata = parse_comment_version_1_6_0(comment)
+
+    assert metadata.amplitude_threshold.threshold == amplitude
+    assert metadata.minimum_trigger_duration_s == 2
+    assert metadata.frequency_filter.type == FilterType.LOW_PASS
+    assert metadata.frequency_filter.higher_frequency_hz == 8000
+    assert metadata.recording_state == RecordingState.MICROPHONE_CHANGED
+    assert metadata.deployment_id == "24E144036037ABF6"
+    assert metadata.external_microphone
+
+
+def test_repeated_configurations_are_cached():
+    """Test that cached configurations still give independent metadata."""
+    # pylint: disable=protected-access
+    comment = (
+        "Recorded at 10:00:00 01/01/2022 (UTC) by AudioMoth 24E144036037ABF6"
+        " at medium gain while battery was 4.2V and temperature was 20.1C."
+        " Amplitude threshold was 10% with 2s minimum trigger duration."
+        " Band-pass filter with frequencies of 1.0kHz and 8.0kHz applied."
+    )
+    parsing._get_frequency_filter.cache_clear()
+    parsing._get_amplitude_threshold_1_6_0.cache_clear()
+
+    first = parse_comment(comment)
+    second = parse_comment(comment.replace("10:00:00", "10:01:00"))
+
+    for function in [
+        parsing._get_frequency_filter,
+        parsing._get_amplitude_threshold_1_6_0,
+    ]:
+        info = function.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    assert first["frequency_filter"] == second["frequency_filter"]
+    assert first["frequency_filter"] is not second["frequency_filter"]
+    assert second["frequency_filter"].lower_frequency_hz == 1000
+    assert first["amplitude_threshold"] is not second["amplitude_threshold"]
+    assert second["amplitude_threshold"].threshold == 3277
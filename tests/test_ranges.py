@@ -0,0 +1,122 @@
+"""Test the byte range readers."""
+
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from metamoth import parse_metadata
+from metamoth.ranges import (
+    HTTPRangeReader,
+    LocalRangeReader,
+    RangeFile,
+    RangeReader,
+)
+
+from .records import make_comment_1_6_0, write_recording
+
+
+class BytesRangeReader(RangeReader):
+    """Range reader of bytes in memory."""
+
+    def __init__(self, data: bytes):
+        super().__init__("memory")
+        self.data = data
+
+    def _read_range(self, start: int, size: int) -> bytes:
+        return self.data[start : start + size]
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serve the bytes of the server, honouring Range headers or not."""
+
+    def do_GET(self):  # noqa: N802 pylint: disable=invalid-name
+        """Return the requested range."""
+        data = self.server.data  # type: ignore
+        match = re.fullmatch(r"bytes=(\d+)-(\d+)", self.headers["Range"])
+        start, end = int(match.group(1)), int(match.group(2))
+
+        if not self.server.ranges:  # type: ignore
+            self.send_response(200)
+        elif start >= len(data):
+            self.send_response(416)
+            self.end_headers()
+            return
+        else:
+            data = data[start : end + 1]
+            self.send_response(206)
+
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        """Do not log the requests."""
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Write a recording with one minute of audio."""
+    path = tmp_path / "recording.WAV"
+    write_recording(path, make_comment_1_6_0(), samples=48000 * 60)
+    return path
+
+
+@pytest.fixture(params=[True, False], ids=["ranges", "no-ranges"])
+def server(request, recording):
+    """Serve the recording over HTTP."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.data = recording.read_bytes()  # type: ignore
+    server.ranges = request.param  # type: ignore
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_local_reader_parses_with_one_request(recording):
+    """Test the header of a recording is read in a single request."""
+    with LocalRangeReader(recording) as reader:
+        metadata = parse_metadata(reader)
+
+    assert reader.requests == 1
+    assert reader.bytes_read == 4096
+    assert metadata == parse_metadata(recording)
+
+
+def test_http_reader(server, recording):
+    """Test ranged reads over HTTP, with and without server support."""
+    host, port = server.server_address
+    url = f"http://{host}:{port}/recording.WAV"
+    reader = HTTPRangeReader(url, timeout=10)
+
+    metadata = parse_metadata(reader)
+
+    assert reader.requests == 1
+    assert metadata.path == url
+    metadata.path = str(recording)
+    assert metadata == parse_metadata(recording)
+    assert reader.read_range(10**9, 10) == b""
+
+
+def test_range_file_windows():
+    """Test that reads are served from the fetched windows."""
+    data = bytes(range(256)) * 100
+    reader = BytesRangeReader(data)
+    wav = RangeFile(reader, prefetch=1000)
+
+    assert wav.read(10) == data[:10]
+    wav.seek(990)
+    assert wav.read(10) == data[990:1000]
+    assert reader.requests == 1
+
+    assert wav.read(20) == data[1000:1020]
+    wav.seek(500)
+    assert wav.read(5000) == data[500:5500]
+    assert reader.requests == 3
+
+    wav.seek(len(data) - 10)
+    assert wav.read(100) == data[-10:]
+    assert wav.read(100) == b""
+    assert reader.requests == 4
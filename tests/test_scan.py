@@ -0,0 +1,136 @@
+"""Test the scan module."""
+
+import pytest
+from metamoth.scan import (
+    ScanError,
+    batched,
+    iter_wav_files,
+    map_batches,
+    parse_batch,
+    scan,
+)
+
+from .records import make_comment_1_0, make_comment_1_6_0, write_recording
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    """Create a directory tree with recordings and other files."""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    write_recording(tmp_path / "a" / "1.WAV", make_comment_1_6_0())
+    write_recording(tmp_path / "a" / "2.wav", make_comment_1_0())
+    write_recording(tmp_path / "b" / "3.WAV", make_comment_1_6_0())
+    (tmp_path / "b" / "CONFIG.TXT").write_text("config")
+    return tmp_path
+
+
+def test_iter_wav_files_walks_directories(recordings):
+    """Test that only WAV files are found, in sorted order."""
+    paths = list(iter_wav_files([recordings]))
+    assert paths == [
+        str(recordings / "a" / "1.WAV"),
+        str(recordings / "a" / "2.wav"),
+        str(recordings / "b" / "3.WAV"),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scan_parses_all_files(recordings, workers):
+    """Test that all recordings are parsed in order."""
+    results = list(scan([recordings], workers=workers, batch_size=1))
+    assert [result.path for result in results] == list(
+        iter_wav_files([recordings])
+    )
+    assert [result.firmware_version for result in results] == [
+        "1.6.0",
+        "1.0",
+        "1.6.0",
+    ]
+
+
+def test_scan_errors(recordings):
+    """Test the error handling policies."""
+    (recordings / "b" / "broken.wav").write_bytes(b"RIFF")
+
+    with pytest.raises(ValueError):
+        list(scan([recordings], workers=1))
+
+    errors = []
+    results = list(
+        scan([recordings], workers=1, errors="skip", on_error=errors.append)
+    )
+    assert len(results) == 3
+    assert len(errors) == 1
+    assert isinstance(errors[0], ScanError)
+    assert errors[0].path == str(recordings / "b" / "broken.wav")
+
+
+def test_parse_batch_returns_the_errors_in_order(recordings):
+    """Test that a file that cannot be parsed gives a ScanError."""
+    (recordings / "b" / "broken.wav").write_bytes(b"RIFF")
+    paths = [
+        str(recordings / "a" / "1.WAV"),
+        str(recordings / "b" / "broken.wav"),
+        str(recordings / "b" / "3.WAV"),
+    ]
+
+    results = parse_batch(paths)
+
+    assert [result.path for result in results] == paths
+    assert isinstance(results[1], ScanError)
+    assert results[1].error == "ValueError"
+    assert not isinstance(results[2], ScanError)
+
+
+def test_scan_shares_the_configuration_of_each_folder(recordings):
+    """Test that CONFIG.TXT is parsed once and shared by its recordings."""
+    (recordings / "a" / "CONFIG.TXT").write_text(
+        "Firmware : AudioMoth-Firmware-Basic (1.8.0)\nGain : High\n"
+    )
+
+    first, second, third = scan([recordings], workers=2, config=True)
+
+    assert first.config is second.config
+    assert first.config.gain.name == "AM_GAIN_HIGH"
+    assert third.config is None
+    assert first.config not in [
+        result.config for result in scan([recordings], workers=1)
+    ]
+
+
+def test_scan_finds_the_configuration_of_daily_folders(tmp_path):
+    """Test that recordings in daily folders get the card configuration."""
+    for day in ["20230101", "20230102"]:
+        folder = tmp_path / "card" / day
+        folder.mkdir(parents=True)
+        write_recording(folder / "1.WAV", make_comment_1_6_0())
+    (tmp_path / "card" / "CONFIG.TXT").write_text(
+        "Firmware : AudioMoth-Firmware-Basic (1.8.0)\n"
+        "Use daily folder for WAV files : Yes\n"
+    )
+    (tmp_path / "CONFIG.TXT").write_text(
+        "Firmware : AudioMoth-Firmware-Basic (1.8.0)\n"
+    )
+
+    first, second = scan([tmp_path / "card"], workers=1, config=True)
+
+    assert first.config is second.config
+    assert first.config.enable_daily_folders
+
+    (first,) = scan([tmp_path / "card" / "20230101"], workers=1, config=True)
+    assert first.config is None
+
+
+def test_map_batches_keeps_the_order_of_the_batches():
+    """Test that the results of the batches are yielded in order."""
+    batches = batched(range(100), 7)
+
+    results = list(map_batches(sum, batches, workers=3, executor="thread"))
+
+    assert len(results) == 15
+    assert results[0] == sum(range(7))
+    assert results[-1] == sum(range(98, 100))
+
+    with pytest.raises(ValueError):
+        list(map_batches(sum, [[1]], workers=2, executor="fork"))
@@ -0,0 +1,99 @@
+"""Test the serialization module."""
+
+import io
+import json
+
+from metamoth.enums import FilterType
+from metamoth.metadata import AMMetadata, FrequencyFilter
+from metamoth.serialization import (
+    from_dict,
+    from_json,
+    from_tuple,
+    get_field_plan,
+    read_jsonl,
+    to_dict,
+    to_json,
+    to_tuple,
+    write_jsonl,
+)
+
+from .records import make_metadata_1_0, make_metadata_1_6_0
+
+
+def test_parse_comment_keeps_nested_dataclasses():
+    """Test that nested metadata objects are not converted to dicts."""
+    metadata = make_metadata_1_6_0()
+    assert isinstance(metadata.frequency_filter, FrequencyFilter)
+    assert metadata.frequency_filter.type == FilterType.BAND_PASS
+
+
+def test_field_plan_is_cached():
+    """Test that the field plan is only built once per class."""
+    assert get_field_plan(AMMetadata) is get_field_plan(AMMetadata)
+
+
+def test_to_dict_produces_plain_values():
+    """Test that to_dict output can be dumped as JSON."""
+    data = to_dict(make_metadata_1_6_0())
+
+    assert data["datetime"] == "2022-05-01T10:30:00"
+    assert data["timezone"] == "-03:00"
+    assert data["gain"] == "AM_GAIN_MEDIUM"
+    assert data["recording_state"] == "FILE_SIZE_LIMITED"
+    assert data["frequency_filter"] == {
+        "type": "BAND_PASS",
+        "higher_frequency_hz": 24000,
+        "lower_frequency_hz": 8000,
+    }
+    assert data["frequency_trigger"] is None
+    assert json.loads(json.dumps(data)) == data
+
+
+def test_to_dict_with_field_selection():
+    """Test that to_dict only includes the requested fields."""
+    data = to_dict(make_metadata_1_6_0(), fields=["path", "gain"])
+    assert data == {"path": "recording.wav", "gain": "AM_GAIN_MEDIUM"}
+
+
+def test_config_is_not_serialized():
+    """Test that the CONFIG.TXT configuration is left out."""
+    metadata = make_metadata_1_6_0()
+    metadata.config = object()
+
+    assert "config" not in get_field_plan(AMMetadata).names
+    assert "config" not in to_dict(metadata)
+    assert from_tuple(to_tuple(metadata)) == metadata
+    assert from_tuple(to_tuple(metadata)).config is None
+
+
+def test_dict_round_trip():
+    """Test that from_dict inverts to_dict."""
+    for metadata in [make_metadata_1_6_0(), make_metadata_1_0()]:
+        assert from_dict(to_dict(metadata)) == metadata
+
+
+def test_json_round_trip():
+    """Test that from_json inverts to_json."""
+    for metadata in [make_metadata_1_6_0(), make_metadata_1_0()]:
+        assert from_json(to_json(metadata)) == metadata
+
+
+def test_tuple_round_trip():
+    """Test that from_tuple inverts to_tuple."""
+    metadata = make_metadata_1_6_0()
+    values = to_tuple(metadata)
+
+    assert len(values) == len(get_field_plan(AMMetadata).names)
+    assert from_tuple(values) == metadata
+
+
+def test_jsonl_round_trip():
+    """Test that records can be written to and read from JSON Lines."""
+    records = [make_metadata_1_6_0(), make_metadata_1_0()]
+    buffer = io.StringIO()
+
+    assert write_jsonl(records, buffer) == 2
+    assert len(buffer.getvalue().splitlines()) == 2
+
+    buffer.seek(0)
+    assert list(read_jsonl(buffer)) == records
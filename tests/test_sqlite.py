@@ -0,0 +1,86 @@
+"""Test the sqlite module."""
+
+import sqlite3
+
+from metamoth.sqlite import SQLiteSink
+
+from .records import make_metadata_1_0, make_metadata_1_6_0
+
+
+def test_sink_normalizes_records(tmp_path):
+    """Test that devices and configurations are stored once."""
+    path = tmp_path / "metadata.db"
+    records = [make_metadata_1_6_0(f"{i}.wav") for i in range(5)]
+    records.append(make_metadata_1_0())
+
+    with SQLiteSink(path, batch_size=2) as sink:
+        assert sink.write(records) == 6
+
+    assert sink.count == 6
+
+    connection = sqlite3.connect(path)
+    count = connection.execute("SELECT COUNT(*) FROM recordings").fetchone()
+    assert count == (6,)
+    count = connection.execute("SELECT COUNT(*) FROM devices").fetchone()
+    assert count == (2,)
+    count = connection.execute(
+        "SELECT COUNT(*) FROM configurations"
+    ).fetchone()
+    assert count == (2,)
+
+
+def test_sink_uses_wal_and_creates_indexes(tmp_path):
+    """Test that the database is in WAL mode and indexed after closing."""
+    path = tmp_path / "metadata.db"
+
+    with SQLiteSink(path) as sink:
+        sink.write([make_metadata_1_6_0()])
+        indexes = sink.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+            " AND name LIKE 'recordings_%'"
+        ).fetchall()
+        assert indexes == []
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    indexes = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+        " AND name LIKE 'recordings_%'"
+    ).fetchall()
+    assert len(indexes) == 5
+
+
+def test_metadata_view(tmp_path):
+    """Test that the metadata view joins the normalized tables."""
+    path = tmp_path / "metadata.db"
+
+    with SQLiteSink(path) as sink:
+        sink.write([make_metadata_1_6_0()])
+
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    row = connection.execute("SELECT * FROM metadata").fetchone()
+    assert row["path"] == "recording.wav"
+    assert row["audiomoth_id"] == "243b1f055b2bf663"
+    assert row["datetime"] == "2022-05-01T10:30:00"
+    assert row["gain"] == "AM_GAIN_MEDIUM"
+    assert row["timezone"] == "-03:00"
+    assert row["frequency_filter_type"] == "BAND_PASS"
+    assert row["frequency_filter_lower_frequency_hz"] == 8000
+
+
+def test_sink_appends_to_existing_database(tmp_path):
+    """Test that reopening a database reuses the stored ids."""
+    path = tmp_path / "metadata.db"
+
+    with SQLiteSink(path) as sink:
+        sink.write([make_metadata_1_6_0("a.wav")])
+
+    with SQLiteSink(path) as sink:
+        sink.write([make_metadata_1_6_0("b.wav"), make_metadata_1_0()])
+
+    connection = sqlite3.connect(path)
+    rows = connection.execute(
+        "SELECT path, device_id, configuration_id FROM recordings ORDER BY id"
+    ).fetchall()
+    assert rows == [("a.wav", 1, 1), ("b.wav", 1, 1), ("old.wav", 2, 2)]
@@ -0,0 +1,79 @@
+"""Test the forward-only stream parser."""
+
+import io
+import os
+
+import pytest
+from metamoth import parse_metadata
+from metamoth.stream import parse_stream
+
+from .records import make_comment_1_6_0, make_header
+
+ARTIST = "AudioMoth 243B1F055B2BF663"
+
+
+class TrickleStream(io.RawIOBase):
+    """Non-seekable stream returning at most a few bytes per read."""
+
+    def __init__(self, data: bytes, max_read: int = 7):
+        self.data = io.BytesIO(data)
+        self.max_read = max_read
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        """Return True, the stream is readable."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Read at most max_read bytes into the buffer."""
+        data = self.data.read(min(len(buffer), self.max_read))
+        buffer[: len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def test_matches_parse_metadata_and_stops_before_the_audio(tmp_path):
+    """Test the stream is left at the start of the audio data."""
+    header = make_header(make_comment_1_6_0(), samples=1000, artist=ARTIST)
+    audio = os.urandom(2000)
+    path = tmp_path / "recording.WAV"
+    path.write_bytes(header + audio)
+    stream = TrickleStream(header + audio)
+
+    metadata = parse_stream(stream, path=str(path))
+
+    assert stream.bytes_read == len(header)
+    assert stream.read() == audio
+    assert metadata == parse_metadata(path)
+
+
+def test_comment_after_the_audio_data():
+    """Test that the audio is skipped when the comment comes after it."""
+    header = make_header(make_comment_1_6_0(), samples=50000)
+    list_start = header.index(b"LIST")
+    data_start = header.index(b"data")
+    reordered = (
+        header[:list_start]
+        + header[data_start:]
+        + bytes(100000)
+        + header[list_start:data_start]
+    )
+
+    metadata = parse_stream(TrickleStream(reordered, max_read=4096))
+
+    assert metadata.samples == 50000
+    assert metadata.path == "<stream>"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"ID3\x03" + bytes(100),
+        make_header(make_comment_1_6_0())[:200],
+    ],
+)
+def test_invalid_streams_are_rejected(data: bytes):
+    """Test that streams that end before the metadata raise errors."""
+    with pytest.raises(ValueError):
+        parse_stream(io.BufferedReader(TrickleStream(data)))
@@ -0,0 +1,62 @@
+"""Test the triage of candidate files."""
+
+import pytest
+from metamoth import parse_metadata
+from metamoth.enums import FileKind
+from metamoth.triage import triage, triage_file
+
+from .records import make_comment_1_6_0, make_header, write_recording
+
+
+@pytest.fixture
+def candidates(tmp_path):
+    """Create recordings, other WAV files and junk."""
+    write_recording(tmp_path / "1.WAV", make_comment_1_6_0())
+    write_recording(tmp_path / "2.wav", "Not an AudioMoth comment")
+    (tmp_path / "3.WAV").write_bytes(bytes(1000))
+    (tmp_path / "4.WAV").write_bytes(make_header(make_comment_1_6_0())[:30])
+    (tmp_path / "log.txt").write_text("Battery low")
+    (tmp_path / "empty.wav").write_bytes(b"")
+    return tmp_path
+
+
+EXPECTED = {
+    "1.WAV": FileKind.AUDIOMOTH,
+    "2.wav": FileKind.WAV,
+    "3.WAV": FileKind.CORRUPT,
+    "4.WAV": FileKind.CORRUPT,
+    "log.txt": FileKind.NOT_WAV,
+    "empty.wav": FileKind.NOT_WAV,
+    "missing.WAV": FileKind.CORRUPT,
+}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_triage_classifies_files_in_order(candidates, workers):
+    """Test the kind of every file, in the order of the paths."""
+    paths = [candidates / name for name in EXPECTED]
+
+    results = list(triage(paths, workers=workers, batch_size=2))
+
+    assert [result.path for result in results] == [str(p) for p in paths]
+    assert [result.kind for result in results] == list(EXPECTED.values())
+    assert results[0].metadata == parse_metadata(paths[0])
+    assert all(result.metadata is None for result in results[1:])
+    assert results[2].reason == "Zeroed header"
+
+
+def test_triage_reads_each_file_once(candidates, monkeypatch):
+    """Test that a recording is opened and read only once."""
+    calls = []
+    original = open
+
+    def counting_open(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+
+    result = triage_file(candidates / "1.WAV")
+
+    assert result.kind == FileKind.AUDIOMOTH
+    assert len(calls) == 1
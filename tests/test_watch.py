@@ -0,0 +1,178 @@
+"""Test watching a directory for new recordings."""
+
+import json
+import os
+
+from metamoth.cli import main
+from metamoth.watch import Watcher, watch
+
+from .records import make_comment_1_6_0, write_recording
+
+
+def test_files_are_reported_once_their_size_is_stable(tmp_path):
+    """Test that new files are reported on the poll after they appear."""
+    write_recording(tmp_path / "1.WAV", make_comment_1_6_0())
+
+    watcher = Watcher(tmp_path)
+    assert watcher.poll() == []
+    assert watcher.pending == {str(tmp_path / "1.WAV")}
+
+    assert watcher.poll() == [str(tmp_path / "1.WAV")]
+
+
+def test_growing_files_are_not_reported(tmp_path):
+    """Test that files still being copied are not reported."""
+    path = tmp_path / "1.WAV"
+    write_recording(path, make_comment_1_6_0())
+
+    watcher = Watcher(tmp_path)
+    watcher.poll()
+
+    with open(path, "ab") as fp:
+        fp.write(b"\x00" * 1024)
+
+    assert watcher.poll() == []
+    assert watcher.poll() == [str(path)]
+
+
+def test_indexed_files_are_not_reported_again(tmp_path):
+    """Test that indexed files are skipped, also in new subdirectories."""
+    write_recording(tmp_path / "1.WAV", make_comment_1_6_0())
+
+    watcher = Watcher(tmp_path)
+    watcher.poll()
+    watcher.mark_indexed(watcher.poll())
+    assert watcher.poll() == []
+
+    (tmp_path / "day2").mkdir()
+    write_recording(tmp_path / "day2" / "2.WAV", make_comment_1_6_0())
+    (tmp_path / "notes.txt").write_text("not a recording")
+    (tmp_path / ".2.WAV.partial").write_bytes(b"")
+
+    watcher.poll()
+    assert watcher.poll() == [str(tmp_path / "day2" / "2.WAV")]
+
+
+def test_state_is_persisted(tmp_path):
+    """Test that a restarted watcher does not report indexed files."""
+    directory = tmp_path / "landing"
+    directory.mkdir()
+    state = tmp_path / "state.json"
+    write_recording(directory / "1.WAV", make_comment_1_6_0())
+
+    records = list(watch(directory, state_path=state, interval=0, max_polls=2))
+    assert [record.path for record in records] == [str(directory / "1.WAV")]
+
+    write_recording(directory / "2.WAV", make_comment_1_6_0())
+    records = list(watch(directory, state_path=state, interval=0, max_polls=2))
+    assert [record.path for record in records] == [str(directory / "2.WAV")]
+
+
+def test_watch_command_appends_to_output(tmp_path):
+    """Test that the watch command appends new metadata to the output."""
+    directory = tmp_path / "landing"
+    directory.mkdir()
+    output = tmp_path / "metadata.jsonl"
+    arguments = [
+        "watch",
+        str(directory),
+        "--state",
+        str(tmp_path / "state.json"),
+        "--interval",
+        "0",
+        "--max-polls",
+        "2",
+        "--output",
+        str(output),
+        "--quiet",
+    ]
+
+    write_recording(directory / "1.WAV", make_comment_1_6_0())
+    assert main(arguments) == 0
+
+    write_recording(directory / "2.WAV", make_comment_1_6_0())
+    (directory / "3.WAV").write_bytes(b"not a recording")
+    assert main(arguments) == 1
+    assert main([*arguments, "--errors", "skip"]) == 0
+
+    with open(output) as fp:
+        paths = [json.loads(line)["path"] for line in fp]
+
+    assert paths == [str(directory / "1.WAV"), str(directory / "2.WAV")]
+
+
+def test_restarted_watcher_only_lists_changed_directories(
+    tmp_path,
+    monkeypatch,
+):
+    """Test that a restart does not list the whole tree again."""
+    directory = tmp_path / "landing"
+    (directory / "day1").mkdir(parents=True)
+    (directory / "day2").mkdir()
+    state = tmp_path / "state.json"
+    write_recording(directory / "day1" / "1.WAV", make_comment_1_6_0())
+
+    watcher = Watcher(directory, state_path=state)
+    watcher.poll()
+    watcher.mark_indexed(watcher.poll())
+    watcher.save_state()
+
+    # Directories listed within the clock resolution are listed again.
+    monkeypatch.setattr("metamoth.watch._RECENT_NS", 0)
+    write_recording(directory / "day2" / "2.WAV", make_comment_1_6_0())
+
+    listed = []
+    original = os.scandir
+
+    def scandir(path):
+        listed.append(os.fspath(path))
+        return original(path)
+
+    monkeypatch.setattr("metamoth.watch.os.scandir", scandir)
+
+    watcher = Watcher(directory, state_path=state)
+    watcher.poll()
+    assert listed == [str(directory / "day2")]
+    assert watcher.poll() == [str(directory / "day2" / "2.WAV")]
+
+
+def test_failed_files_are_retried(tmp_path):
+    """Test that a file that failed is retried a bounded number of times."""
+    path = tmp_path / "1.WAV"
+    path.write_bytes(b"RIFF")
+
+    watcher = Watcher(tmp_path, max_attempts=2)
+    watcher.poll()
+
+    assert watcher.poll() == [str(path)]
+    watcher.mark_failed([str(path)])
+    assert watcher.high_water_mark_ns == 0
+
+    assert watcher.poll() == [str(path)]
+    watcher.mark_failed([str(path)])
+    assert watcher.poll() == []
+    assert watcher.high_water_mark_ns > 0
+
+
+def test_watch_retries_files_that_could_not_be_parsed(tmp_path):
+    """Test that a file fixed after a failure is indexed."""
+    path = tmp_path / "1.WAV"
+    path.write_bytes(b"RIFF")
+    state = tmp_path / "state.json"
+    errors = []
+
+    records = list(
+        watch(
+            tmp_path,
+            state_path=state,
+            interval=0,
+            on_error=errors.append,
+            max_polls=2,
+        )
+    )
+    assert records == []
+    assert [error.path for error in errors] == [str(path)]
+
+    write_recording(path, make_comment_1_6_0())
+    records = list(watch(tmp_path, state_path=state, interval=0, max_polls=2))
+    assert [record.path for record in records] == [str(path)]